@@ -1,10 +1,20 @@
 import pygame
-from chess import GameWindow, MainWindow, game_loop, analise_loop
+import shogi
+from engine import Engine
+from search_service import SearchService, ENGINE_EVENTS
+from pathlib import Path
+from archive import GameArchive, ARCHIVE_PATH, import_games
+from profiler import PROFILER
+from journal import GameJournal, JournalError, JOURNAL_PATH
+from chess import GameWindow, MainWindow, game_loop, analise_loop, engine_loop, ASSETS
 
 
-GAME_EVENTS = [pygame.K_n, pygame.K_y, pygame.MOUSEBUTTONDOWN, pygame.K_ESCAPE]
+GAME_EVENTS = [pygame.MOUSEBUTTONDOWN, pygame.KEYDOWN]
 
-ANALISE_EVENTS = [pygame.MOUSEBUTTONDOWN]
+ANALISE_EVENTS = [pygame.MOUSEBUTTONDOWN, pygame.MOUSEBUTTONUP, pygame.MOUSEMOTION]
+
+LEGACY_DIRS = ('Top10', 'History')  # Katalogi zapisów JSON sprzed archiwum, importowane przy jego utworzeniu
+IDLE_TIMEOUT = 1000  # Maksymalny czas (ms) oczekiwania na zdarzenie, gdy ekran się nie zmienia
 
 
 class App:
@@ -15,38 +25,105 @@ class App:
     obsługuje wydarzenia i zapewnia płynną logikę przełączania między różnymi stanami aplikacji.
 
     Attributes:
-        clock (pygame.time.Clock): Zegar kontrolujący odświeżanie ekranu.
-        screen (pygame.Surface): Powierzchnia głównego ekranu gry.
+        clock (pygame.time.Clock): Zegar ograniczający liczbę klatek do `target_fps` aktywnego okna.
+        screen (pygame.Surface): Powierzchnia głównego ekranu gry albo powierzchnia poza ekranem (`headless`).
+        headless (bool): Czy aplikacja rysuje na przekazanej powierzchni, bez okna i `pygame.display`.
         icon (pygame.Surface): Ikona aplikacji wyświetlana w pasku tytułu.
         main_window (MainWindow): Instancja klasy obsługującej główne menu.
         game (GameWindow or None): Instancja klasy obsługującej okno gry. Tworzona przy rozpoczęciu gry.
         analise (AnaliseWindow or None): Instancja klasy obsługującej okno analizy zapisanych gier.
         current_window (str): Aktualnie aktywne okno aplikacji. Możliwe wartości: "main", "game", "analise".
+        search_service (SearchService or None): Usługa wyszukiwania w tle, tworzona przy pierwszej grze z komputerem.
+        archive (GameArchive): Archiwum w jednym pliku, w którym zapisywana jest każda zakończona partia;
+            z niego menu odczytuje ranking i partie do analizy.
+        journal (GameJournal): Dziennik ruchów trwającej partii; niezakończona partia jest wznawiana przy starcie.
+        incremental (bool): Czy okna gry i analizy rysują tylko zmienione obszary ekranu.
 
     Methods:
+        open_archive():
+            Zwraca archiwum partii, otwierając je przy pierwszym użyciu (nowe archiwum importuje `LEGACY_DIRS`).
+        new_game(engine_color=None, state=None):
+            Tworzy okno nowej gry (z komputerem, jeśli podano jego kolor) i rozpoczyna dziennik;
+            ze stanem z dziennika (`state`) wznawia partię.
+        resume_game():
+            Wznawia niezakończoną partię z dziennika. Zwraca True, jeśli partia została wznowiona.
         operate_main_window(event):
             Obsługuje wydarzenia w głównym oknie aplikacji.
         operate_game_window(event):
             Obsługuje wydarzenia w oknie gry.
         operate_analize_window(event):
             Obsługuje wydarzenia w oknie analizy zapisanych gier.
+        active_window():
+            Zwraca obiekt aktualnie aktywnego okna.
+        wait_events():
+            Czeka na zdarzenia: w tempie `target_fps` podczas animacji, a w bezczynności do pierwszego zdarzenia.
         run():
             Uruchamia główną pętlę aplikacji.
         update():
             Aktualizuje ekran w zależności od aktualnie aktywnego okna.
     """
-    def __init__(self, current_window='main', icon_path='pictures/icon.jpg') -> None:
+    def __init__(self, current_window='main', icon_path='pictures/icon.jpg', incremental=True,
+                 archive_path=ARCHIVE_PATH, journal_path=JOURNAL_PATH, screen=None, legacy_dirs=LEGACY_DIRS) -> None:
         self.clock = pygame.time.Clock()
-        self.screen = pygame.display.set_mode((12 * 80, 9 * 80))
+        # Przekazana powierzchnia (np. z `offscreen.offscreen_surface`) zastępuje okno aplikacji
+        self.headless = screen is not None
+        self.screen = screen if self.headless else pygame.display.set_mode((12 * 80, 9 * 80))
+        ASSETS.preload()  # Obrazy tła wczytywane w tle
         self.icon = pygame.image.load(icon_path)
-        pygame.display.set_icon(self.icon)
+        if not self.headless:
+            pygame.display.set_icon(self.icon)
 
         # Inicjalizacja okna
-        self.main_window = MainWindow(self.screen)
+        self.incremental = incremental
+        self.archive_path = archive_path
+        self.legacy_dirs = legacy_dirs
+        self.archive = None
+        self.main_window = MainWindow(self.screen, incremental, archive=self.open_archive())
         self.game = False
         self.analise = False
+        self.search_service = None
+        self.journal = GameJournal(journal_path)
 
         self.current_window = current_window
+        self.drawn_window = None
+        if self.journal.exists() and self.resume_game():
+            self.current_window = 'game'
+
+    def open_archive(self):
+        if self.archive is None:
+            created = not Path(self.archive_path).exists()
+            self.archive = GameArchive(self.archive_path)
+            if created:
+                # Jednorazowy import zapisów JSON z katalogów używanych przed wprowadzeniem archiwum
+                import_games(self.archive, [path for path in self.legacy_dirs if Path(path).is_dir()])
+        return self.archive
+
+    def new_game(self, engine_color=None, state=None):
+        engine = None
+        if engine_color is not None:
+            if not self.search_service:
+                self.search_service = SearchService()
+            engine = Engine()
+        game = GameWindow(self.screen, self.incremental, engine=engine, engine_color=engine_color,
+                          search_service=self.search_service, archive=self.open_archive(), journal=self.journal)
+        if state is None:
+            self.journal.start(engine_color)
+        else:
+            # Wznowiona partia: dziennik jest zastępowany jednym zapisem atomowym razem z ruchami
+            # (bez wpisów cofnięć), więc przerwanie w trakcie wznawiania nie gubi partii
+            game.resume(state)
+            self.journal.start(engine_color, game.board.move_stack, state.elapsed, state.date)
+        return game
+
+    def resume_game(self):
+        try:
+            state = self.journal.read()
+        except (OSError, JournalError):
+            self.journal.discard()
+            return False
+        self.game = self.new_game(state.engine_color, state)
+        self.game.engine_move()
+        return True
 
     def operate_main_window(self, event):
         if self.current_window == "main":
@@ -56,6 +133,9 @@ class App:
 
                 if self.main_window.start_button.clicked(event.pos):
                     self.current_window = "game"
+                elif self.main_window.cpu_button.clicked(event.pos):
+                    self.game = self.new_game(engine_color=shogi.WHITE)
+                    self.current_window = "game"
                 elif self.main_window.top10_button.clicked(event.pos):
                     self.main_window.change_top10_status()
 
@@ -70,9 +150,11 @@ class App:
     def operate_game_window(self, event):
         if self.current_window == "game":
             if not self.game:
-                self.game = GameWindow(self.screen)
+                self.game = self.new_game()
             if event.type in GAME_EVENTS:
                 self.current_window, self.game = game_loop(window=self.game, event=event)
+            elif event.type in ENGINE_EVENTS:
+                self.current_window, self.game = engine_loop(window=self.game, event=event)
 
     def operate_analize_window(self, event):
         if self.current_window == 'analise':
@@ -80,30 +162,98 @@ class App:
                 self.current_window = analise_loop(window=self.analise, event=event)
                 self.current_window = self.current_window if self.current_window else 'analise'
 
+    def active_window(self):
+        if self.current_window == "main":
+            return self.main_window
+        elif self.current_window == "game":
+            return self.game or None
+        elif self.current_window == 'analise':
+            return self.analise or None
+        return None
+
+    def wait_events(self):
+        """
+        Zwraca zdarzenia do obsłużenia w następnej klatce.
+
+        Gdy aktywne okno wymaga ciągłego odświeżania (`needs_frames`), klatki są taktowane zegarem
+        z częstotliwością `target_fps` okna. W przeciwnym razie pętla śpi w `pygame.event.wait`
+        do pierwszego zdarzenia (także zdarzenia usługi wyszukiwania) lub najdłużej `IDLE_TIMEOUT` ms.
+        """
+        window = self.active_window()
+        if window is not None and window.needs_frames():
+            self.clock.tick(window.target_fps)
+            return pygame.event.get()
+
+        event = pygame.event.wait(IDLE_TIMEOUT)
+        self.clock.tick()  # Bez opóźnienia; tylko pomiar czasu klatki
+        if event.type == pygame.NOEVENT:
+            return []
+        return [event] + pygame.event.get()
+
     def run(self):
         running = True
         while running:
-            for event in pygame.event.get():
-                if event.type == pygame.QUIT:
-                    running = False
-                self.operate_main_window(event)
-                self.operate_game_window(event)
-                self.operate_analize_window(event)
+            events = self.wait_events()
+            PROFILER.begin_frame()
+            with PROFILER.phase('events'):
+                for event in events:
+                    if event.type == pygame.QUIT:
+                        running = False
+                    self.operate_main_window(event)
+                    self.operate_game_window(event)
+                    self.operate_analize_window(event)
 
             self.update()
+            PROFILER.end_frame()
+
+        if self.game and not self.game.game_over:
+            self.journal.flush(self.game.current_elapsed())  # Partię można wznowić po ponownym uruchomieniu
+        if self.search_service:
+            self.search_service.shutdown()
+        if self.archive is not None:
+            self.archive.close()
 
     def update(self):
+        # Zakończona gra wraca do menu po zniknięciu komunikatu o wyniku
+        if self.current_window == "game" and self.game and self.game.finished():
+            self.current_window, self.game = 'main', False
+
+        # Zbuforowane ruchy trafiają do dziennika najpóźniej po `JOURNAL_FLUSH_INTERVAL`, także gdy gracz myśli
+        if self.game and not self.game.game_over:
+            self.journal.flush_due(self.game.current_elapsed())
+
         # Rysowanie aktualnego okna
+        window = None
         if self.current_window == "main":
             self.main_window.draw_myself()
         elif self.current_window == "game" and self.game:
-            self.game.update_window()
+            window = self.game
         elif self.current_window == 'analise':
-            self.analise.update()
+            window = self.analise
+
+        if window:
+            # Po zmianie okna ekran zawiera obraz poprzedniego
+            if window is not self.drawn_window:
+                window.invalidate()
+            if window is self.game:
+                window.update_window()
+            else:
+                window.update()
+        self.drawn_window = window
+
+        # Nakładka profilera (FPS, czasy etapów), gdy profilowanie jest włączone
+        overlay = PROFILER.draw_overlay(self.screen)
+        if overlay and window is not None:
+            window.dirty_rects.append(overlay)
 
         # Aktualizacja ekranu
-        pygame.display.flip()
-        self.clock.tick(60)
+        with PROFILER.phase('display'):
+            if self.headless:
+                pass  # Klatka pozostaje na powierzchni `screen`
+            elif window is None:
+                pygame.display.flip()
+            elif window.dirty_rects:
+                pygame.display.update(window.dirty_rects)
 
 
 
@@ -0,0 +1,269 @@
+"""
+Archiwum partii w jednym pliku (dziennik tylko do dopisywania) z indeksem przesunięć.
+
+Plik danych (np. `games.db`) zawiera kolejne wpisy: długość (uint32) i zapis partii w formacie
+binarnym z `records.py`. Plik indeksu (`games.db.idx`) zawiera wpisy o stałym rozmiarze
+(przesunięcie, długość, czas gry, data, liczba ruchów), więc wpis partii o danym identyfikatorze
+jest odczytywany w czasie O(1), a sama partia przez `mmap` pliku danych.
+
+Przykład:
+    python archive.py Top10 History -a games.db
+"""
+import argparse
+import datetime
+import mmap
+import os
+import struct
+import sys
+import threading
+from pathlib import Path
+from records import (encode_record, decode_record, decode_header, decode_move, read_record, atomic_write, RecordError,
+                     BINARY_SUFFIX, BINARY_HEADER, BINARY_MOVE, DATE_FORMAT)
+
+
+ARCHIVE_PATH = 'games.db'
+INDEX_SUFFIX = '.idx'
+LENGTH = struct.Struct("<I")  # Długość wpisu w pliku danych
+# Przesunięcie, długość, czas gry, rok, miesiąc, dzień, godzina, minuta, sekunda, liczba ruchów
+INDEX_ENTRY = struct.Struct("<QIIHBBBBBI")
+
+
+class ArchiveError(Exception):
+    def __init__(self, error) -> None:
+        super().__init__(f"Game archive error: {error}")
+
+
+class GameArchive:
+    """
+    Archiwum partii w jednym pliku z indeksem według identyfikatora, czasu gry i daty.
+
+    Identyfikatorem partii jest jej numer w archiwum (0, 1, 2, ...).
+
+    Atrybuty:
+        path (Path): Ścieżka do pliku danych.
+        index_path (Path): Ścieżka do pliku indeksu.
+
+    Metody:
+        append(date, game_time, moves):
+            Dopisuje partię do archiwum i zwraca jej identyfikator.
+        read(game_id):
+            Zwraca (data, czas gry, lista ruchów) partii.
+        iter_moves(game_id):
+            Zwraca iterator ruchów partii (odczyt strumieniowy).
+        metadata(game_id):
+            Zwraca dane partii z indeksu, bez odczytu pliku danych.
+        game_time(game_id):
+            Zwraca czas gry partii z indeksu.
+        ids_by_time(reverse=True):
+            Zwraca identyfikatory partii posortowane po czasie gry.
+        ids_by_date(prefix):
+            Zwraca identyfikatory partii, których data zaczyna się od `prefix` (np. "2025-01").
+        close():
+            Zamyka mapowanie pliku danych.
+
+    Uwagi:
+        - Wpis jest dopisywany do pliku danych jednym wywołaniem `os.write` i utrwalany (`fsync`)
+          przed dopisaniem wpisu indeksu. Niedokończony wpis po awarii jest przy otwarciu
+          archiwum odcinany, a wpisy danych bez indeksu są indeksowane ponownie.
+        - Brakujący plik indeksu jest odtwarzany z pliku danych.
+    """
+    def __init__(self, path=ARCHIVE_PATH) -> None:
+        self.path = Path(path)
+        self.index_path = self.path.with_name(self.path.name + INDEX_SUFFIX)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._map = None
+        self._index = bytearray(self.index_path.read_bytes()) if self.index_path.exists() else bytearray()
+        self._recover()
+
+    def __len__(self):
+        return len(self._index) // INDEX_ENTRY.size
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def _entry(self, game_id):
+        if not 0 <= game_id < len(self):
+            raise ArchiveError(f"no game with id {game_id}")
+        return INDEX_ENTRY.unpack_from(self._index, game_id * INDEX_ENTRY.size)
+
+    def _data_end(self):
+        if not len(self):
+            return 0
+        offset, length = self._entry(len(self) - 1)[:2]
+        return offset + LENGTH.size + length
+
+    def _recover(self):
+        """
+        Przywraca spójność pliku danych i indeksu po przerwanym dopisywaniu.
+        """
+        data_size = self.path.stat().st_size if self.path.exists() else 0
+        index_valid = len(self._index) - len(self._index) % INDEX_ENTRY.size
+        del self._index[index_valid:]
+        while len(self) and self._data_end() > data_size:
+            del self._index[-INDEX_ENTRY.size:]
+
+        # Wpisy danych, których nie zdążono dopisać do indeksu
+        position = self._data_end()
+        new_entries = bytearray()
+        if position < data_size:
+            with self.path.open("rb") as fp:
+                fp.seek(position)
+                while True:
+                    header = fp.read(LENGTH.size)
+                    if len(header) < LENGTH.size:
+                        break
+                    (length,) = LENGTH.unpack(header)
+                    payload = fp.read(length)
+                    try:
+                        date, game_time, moves = decode_record(payload)
+                    except RecordError:
+                        break
+                    new_entries += self._pack_entry(position, length, date, game_time, len(moves))
+                    position += LENGTH.size + length
+            if position < data_size:
+                with self.path.open("r+b") as fp:
+                    fp.truncate(position)
+
+        self._index += new_entries
+        if not self._index and not self.index_path.exists():
+            return  # Puste archiwum - pliki powstaną przy pierwszym `append`
+        if self.index_path.exists() and self.index_path.stat().st_size == len(self._index) and not new_entries:
+            return
+        self._write_index()
+
+    def _write_index(self):
+        atomic_write(self.index_path, bytes(self._index))
+
+    @staticmethod
+    def _pack_entry(offset, length, date, game_time, moves_count):
+        moment = datetime.datetime.strptime(date, DATE_FORMAT)
+        return INDEX_ENTRY.pack(offset, length, int(game_time), moment.year, moment.month, moment.day,
+                                moment.hour, moment.minute, moment.second, moves_count)
+
+    @staticmethod
+    def _append_bytes(path, data):
+        fd = os.open(path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, 'O_BINARY', 0), 0o644)
+        try:
+            if os.write(fd, data) != len(data):
+                raise ArchiveError(f"short write to {path}")
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    def append(self, date, game_time, moves):
+        """
+        Dopisuje partię do archiwum.
+
+        Args:
+            date (str): Data gry w formacie "YYYY-MM-DD HH:MM:SS".
+            game_time (int): Czas gry w sekundach.
+            moves (iterable): Ruchy `shogi.Move`.
+
+        Returns:
+            int: Identyfikator dopisanej partii.
+        """
+        payload = encode_record(date, game_time, moves)
+        with self._lock:
+            offset = self._data_end()
+            moves_count = (len(payload) - BINARY_HEADER.size) // BINARY_MOVE.size
+            entry = self._pack_entry(offset, len(payload), date, game_time, moves_count)
+            self._append_bytes(self.path, LENGTH.pack(len(payload)) + payload)
+            self._append_bytes(self.index_path, entry)
+            self._index += entry
+            return len(self) - 1
+
+    def read(self, game_id):
+        """
+        Odczytuje partię o podanym identyfikatorze.
+
+        Returns:
+            tuple: (data, czas gry w sekundach, lista ruchów `shogi.Move`).
+        """
+        offset, length = self._entry(game_id)[:2]
+        end = offset + LENGTH.size + length
+        with self._lock:
+            with memoryview(self._mapping(end)) as view:
+                return decode_record(view[offset + LENGTH.size:end])
+
+    def iter_moves(self, game_id):
+        """
+        Zwraca iterator ruchów partii dekodowanych wprost z mapowania pliku, bez kopiowania całej partii.
+        """
+        offset, length = self._entry(game_id)[:2]
+        end = offset + LENGTH.size + length
+        with self._lock:
+            mapping = self._mapping(end)
+            decode_header(mapping[offset + LENGTH.size:offset + LENGTH.size + BINARY_HEADER.size])
+        for position in range(offset + LENGTH.size + BINARY_HEADER.size, end, BINARY_MOVE.size):
+            yield decode_move(BINARY_MOVE.unpack_from(mapping, position)[0])
+
+    def _mapping(self, end):
+        if self._map is None or len(self._map) < end:
+            # Archiwum urosło od ostatniego mapowania
+            self.close()
+            with self.path.open("rb") as fp:
+                self._map = mmap.mmap(fp.fileno(), 0, access=mmap.ACCESS_READ)
+        return self._map
+
+    def metadata(self, game_id):
+        """
+        Zwraca dane partii z indeksu: {"date": ..., "time": ..., "moves": liczba ruchów}.
+        """
+        _, _, game_time, year, month, day, hour, minute, second, moves_count = self._entry(game_id)
+        date = datetime.datetime(year, month, day, hour, minute, second).strftime(DATE_FORMAT)
+        return {"date": date, "time": game_time, "moves": moves_count}
+
+    def game_time(self, game_id):
+        return self._entry(game_id)[2]
+
+    def ids_by_time(self, reverse=True):
+        return sorted(range(len(self)), key=lambda game_id: self._entry(game_id)[2], reverse=reverse)
+
+    def ids_by_date(self, prefix=''):
+        ids = [game_id for game_id in range(len(self)) if self.metadata(game_id)["date"].startswith(prefix)]
+        return sorted(ids, key=lambda game_id: self._entry(game_id)[3:9])
+
+    def close(self):
+        if self._map is not None:
+            self._map.close()
+            self._map = None
+
+
+def import_games(archive, paths):
+    """
+    Dopisuje do archiwum partie z plików `.json` i `.shg` (także z katalogów).
+
+    Returns:
+        list: Pliki, których nie udało się wczytać.
+    """
+    failed = []
+    for path in map(Path, paths):
+        files = sorted(f for f in path.iterdir() if f.suffix in ('.json', BINARY_SUFFIX)) if path.is_dir() else [path]
+        for file in files:
+            try:
+                archive.append(*read_record(file))
+            except (OSError, RecordError, ValueError, TypeError, KeyError, AttributeError):
+                failed.append(file)
+    return failed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Import zapisanych partii do archiwum w jednym pliku.")
+    parser.add_argument("paths", nargs="*", default=["Top10", "History"], help="Pliki lub katalogi z zapisami gier.")
+    parser.add_argument("-a", "--archive", default=ARCHIVE_PATH, help="Plik archiwum.")
+    args = parser.parse_args(argv)
+
+    with GameArchive(args.archive) as archive:
+        failed = import_games(archive, args.paths)
+        print(f"{len(archive)} games in {archive.path}")
+    for file in failed:
+        print(f"Skipped {file}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
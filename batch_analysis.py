@@ -0,0 +1,212 @@
+"""
+Wsadowa analiza zapisanych partii bez okna Pygame.
+
+Partie są czytane strumieniowo (ruch po ruchu), więc w pamięci nie jest przechowywana cała partia.
+Domyślnie analizowane jest archiwum partii aplikacji (`games.db`); można też podać pliki `.json`
+i `.shg` lub katalogi z nimi. Pliki i zakresy identyfikatorów partii archiwum są analizowane
+równolegle w puli procesów.
+
+Przykład:
+    python batch_analysis.py games.db Top10 History -o report.csv
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+import shogi
+from archive import GameArchive, ArchiveError, ARCHIVE_PATH
+from positions import game_status, CHECKMATE
+from records import iter_record, RecordError, BINARY_SUFFIX
+
+
+REPORT_FIELDS = [
+    "file", "date", "time", "plies", "captures", "drops", "promotions",
+    "checks", "repetitions", "result", "error"
+]
+CHUNK_SIZE = 64  # Liczba plików (lub partii z archiwum) przekazywanych naraz do procesu roboczego
+# Błędy pojedynczej partii zapisywane w raporcie zamiast przerywania analizy
+GAME_ERRORS = (OSError, ArchiveError, RecordError, ValueError, TypeError, KeyError, AttributeError)
+ARCHIVE_SUFFIX = ".db"  # Archiwa partii (plik `archive.py`)
+
+
+def game_result(board):
+    """
+    Zwraca wynik partii na podstawie końcowej pozycji.
+
+    Returns:
+        str: "black", "white" (zwycięzca), "repetition", "stalemate" albo "unfinished".
+    """
+    status = game_status(board)
+    if status.result == CHECKMATE:
+        return "black" if status.winner == shogi.BLACK else "white"
+    if status.over:
+        return status.result  # REPETITION lub STALEMATE
+    return "unfinished"
+
+
+def analyse_moves(moves):
+    """
+    Odtwarza ruchy na planszy i zlicza statystyki partii.
+
+    Args:
+        moves (iterable): Ruchy `shogi.Move` w kolejności wykonania.
+
+    Returns:
+        dict: Statystyki partii (liczba półruchów, bić, dostawień, promocji, szachów,
+            powtórzonych pozycji oraz wynik).
+    """
+    board = shogi.Board()
+    stats = {"plies": 0, "captures": 0, "drops": 0, "promotions": 0, "checks": 0}
+    for move in moves:
+        if move.drop_piece_type:
+            stats["drops"] += 1
+        elif board.pieces[move.to_square]:
+            stats["captures"] += 1
+        if move.promotion:
+            stats["promotions"] += 1
+        board.push(move)
+        stats["plies"] += 1
+        if board.is_check():
+            stats["checks"] += 1
+
+    stats["repetitions"] = sum(1 for count in board.transpositions.values() if count > 1)
+    stats["result"] = game_result(board)
+    return stats
+
+
+def analyse_file(path):
+    """
+    Analizuje jeden plik z zapisem partii. Błędy są zapisywane w raporcie, a nie zgłaszane.
+    """
+    row = dict.fromkeys(REPORT_FIELDS, "")
+    row["file"] = str(path)
+    try:
+        date, game_time, moves = iter_record(path)
+        row.update(date=date, time=game_time)
+        row.update(analyse_moves(moves))
+    except GAME_ERRORS as e:
+        row["error"] = str(e)
+    return row
+
+
+def analyse_archive_range(path, start, stop):
+    """
+    Analizuje partie archiwum o identyfikatorach od `start` do `stop` (bez `stop`); zadanie procesu roboczego.
+
+    Ruchy są dekodowane strumieniowo z mapowania pliku. Błędy są zapisywane w raporcie, a nie zgłaszane.
+    """
+    rows = []
+    with GameArchive(path) as archive:
+        for game_id in range(start, stop):
+            row = dict.fromkeys(REPORT_FIELDS, "")
+            row["file"] = f"{path}#{game_id}"
+            try:
+                info = archive.metadata(game_id)
+                row.update(date=info["date"], time=info["time"])
+                row.update(analyse_moves(archive.iter_moves(game_id)))
+            except GAME_ERRORS as e:
+                row["error"] = str(e)
+            rows.append(row)
+    return rows
+
+
+def analyse_archive(path, executor=None):
+    """
+    Analizuje wszystkie partie z archiwum porcjami po `CHUNK_SIZE` identyfikatorów.
+
+    Args:
+        path (Path): Archiwum partii.
+        executor (ProcessPoolExecutor or None): Pula procesów dla porcji; None - analiza w bieżącym procesie.
+
+    Returns:
+        list: Wiersze raportu w kolejności identyfikatorów partii.
+    """
+    try:
+        # Otwarcie w procesie głównym przywraca spójność archiwum, zanim odczytają je procesy robocze
+        with GameArchive(path) as archive:
+            count = len(archive)
+    except (OSError, ArchiveError) as e:
+        return [dict(dict.fromkeys(REPORT_FIELDS, ""), file=str(path), error=str(e))]
+
+    ranges = [(start, min(start + CHUNK_SIZE, count)) for start in range(0, count, CHUNK_SIZE)]
+    if executor is None:
+        return [row for start, stop in ranges for row in analyse_archive_range(path, start, stop)]
+    futures = [executor.submit(analyse_archive_range, path, start, stop) for start, stop in ranges]
+    return [row for future in futures for row in future.result()]
+
+
+def find_games(paths):
+    """
+    Zwraca listę plików `.json` i `.shg` z podanych plików i katalogów.
+    """
+    files = []
+    for path in map(Path, paths):
+        if path.is_dir():
+            files.extend(sorted(f for f in path.iterdir() if f.suffix in (".json", BINARY_SUFFIX)))
+        else:
+            files.append(path)
+    return files
+
+
+def analyse_games(paths, workers=None):
+    """
+    Analizuje wszystkie partie równolegle w puli procesów.
+
+    Returns:
+        list: Wiersze raportu (słowniki) w kolejności plików; partie z archiwów na końcu.
+    """
+    files = find_games(paths)
+    archives = [path for path in files if path.suffix == ARCHIVE_SUFFIX]
+    files = [path for path in files if path.suffix != ARCHIVE_SUFFIX]
+    if workers == 1 or (len(files) < CHUNK_SIZE and not archives):
+        rows = [analyse_file(path) for path in files]
+        for path in archives:
+            rows.extend(analyse_archive(path))
+        return rows
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        rows = list(executor.map(analyse_file, files, chunksize=CHUNK_SIZE))
+        for path in archives:
+            rows.extend(analyse_archive(path, executor))
+    return rows
+
+
+def write_report(rows, output):
+    """
+    Zapisuje raport do pliku CSV lub JSON (według rozszerzenia) albo na standardowe wyjście.
+    """
+    if output is None:
+        writer = csv.DictWriter(sys.stdout, fieldnames=REPORT_FIELDS)
+        writer.writeheader()
+        writer.writerows(rows)
+        return
+
+    output = Path(output)
+    if output.suffix == ".json":
+        with output.open("w") as fp:
+            json.dump(rows, fp, indent=4)
+    else:
+        with output.open("w", newline="") as fp:
+            writer = csv.DictWriter(fp, fieldnames=REPORT_FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Analiza zapisanych partii Shogi bez okna gry.")
+    parser.add_argument("paths", nargs="*", default=[ARCHIVE_PATH],
+                        help="Archiwa partii, pliki lub katalogi z zapisami gier; domyślnie archiwum aplikacji.")
+    parser.add_argument("-o", "--output", help="Plik raportu (.csv lub .json); domyślnie CSV na standardowe wyjście.")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(), help="Liczba procesów roboczych.")
+    args = parser.parse_args(argv)
+
+    rows = analyse_games(args.paths, args.workers)
+    write_report(rows, args.output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,418 @@
+"""
+Testy wydajności najczęściej wykonywanych fragmentów `chess.py` (bez okna, na powierzchni poza ekranem).
+
+Wyniki są zapisywane w pliku JSON (np. jako wzorzec `benchmarks/baseline.json`), a polecenie `compare`
+porównuje medianę czasu każdego przypadku z wzorcem i zgłasza regresje.
+
+Przykład:
+    python benchmark.py run -o benchmarks/baseline.json
+    python benchmark.py run -o current.json
+    python benchmark.py compare benchmarks/baseline.json current.json --threshold 0.2
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+from pathlib import Path
+from chess import GameWindow, AnaliseWindow
+from diagrams import export_diagrams
+from leaderboard import Leaderboard
+from archive import GameArchive, LENGTH
+from offscreen import offscreen_surface
+from positions import PositionBoard
+from records import encode_record, write_json_record
+
+
+MIN_TIME = 0.2  # Minimalny łączny czas pomiaru jednego przypadku (s)
+MIN_ROUNDS = 5
+MAX_ROUNDS = 1000
+LEADERBOARD_SIZES = (10, 1000, 10000)  # Liczba partii w archiwum w testach rankingu
+THRESHOLD = 0.2  # Dopuszczalny wzrost mediany względem wzorca (20%)
+SEED = 2024
+POSITIONS = 50  # Liczba pozycji w teście `get_legal_moves`
+GAME_PLIES = 150  # Długość partii w testach zapisu i odtwarzania
+
+
+class BenchmarkError(Exception):
+    def __init__(self, error) -> None:
+        super().__init__(f"Benchmark error: {error}")
+
+
+def random_game(rng, plies=GAME_PLIES):
+    """
+    Zwraca planszę po losowej partii (najwyżej `plies` półruchów) z powtarzalnego generatora `rng`.
+
+    Plansza jest typu `PositionBoard`, jak w oknach aplikacji (klucz pozycji zapamiętany między ruchami).
+    """
+    board = PositionBoard()
+    for _ in range(plies):
+        moves = sorted(board.legal_moves, key=lambda move: move.usi())
+        if not moves:
+            break
+        board.push(rng.choice(moves))
+    return board
+
+
+def sample_positions(rng, count=POSITIONS):
+    """
+    Zwraca `count` pozycji z różnych faz losowych partii.
+    """
+    positions = []
+    while len(positions) < count:
+        board = random_game(rng, rng.randint(0, 120))
+        if not board.is_game_over():
+            positions.append(PositionBoard(board.sfen()))
+    return positions
+
+
+def write_archive(path, count, rng):
+    """
+    Tworzy archiwum `count` partii, zapisując plik danych jednorazowo (bez `fsync` dla każdej partii,
+    aby przygotowanie 10 000 partii trwało krótko); indeks odtwarza `GameArchive` przy otwarciu.
+    """
+    moves = random_game(rng, 40).move_stack
+    with path.open("wb") as fp:
+        for _ in range(count):
+            payload = encode_record("2025-01-01 12:00:00", rng.randint(1, 10 ** 6), moves)
+            fp.write(LENGTH.pack(len(payload)) + payload)
+    return GameArchive(path)
+
+
+# Przypadki testowe: funkcja przygotowuje dane i zwraca mierzoną funkcję
+# albo parę (mierzona funkcja, przygotowanie przed każdym wywołaniem).
+CASES = {}
+
+
+def case(name):
+    def decorator(factory):
+        CASES[name] = factory
+        return factory
+    return decorator
+
+
+@case("update_window_full")
+def bench_update_window_full(screen, tmp, rng):
+    window = GameWindow(screen)
+    window.board = random_game(rng, 40)
+    return window.update_window
+
+
+@case("update_window_incremental_idle")
+def bench_update_window_incremental_idle(screen, tmp, rng):
+    window = GameWindow(screen, incremental=True)
+    window.board = random_game(rng, 40)
+    window.update_window()
+    return window.update_window
+
+
+@case("update_window_incremental_move")
+def bench_update_window_incremental_move(screen, tmp, rng):
+    window = GameWindow(screen, incremental=True)
+    window.board = random_game(rng, 40)
+    move = sorted(window.board.legal_moves, key=lambda move: move.usi())[0]
+    window.update_window()
+
+    def frame():
+        # Każda klatka wykonuje albo cofa ten sam ruch
+        if window.board.move_stack and window.board.peek() == move:
+            window.board.pop()
+        else:
+            window.board.push(move)
+        window.update_window()
+    return frame
+
+
+@case("draw_pieces")
+def bench_draw_pieces(screen, tmp, rng):
+    window = GameWindow(screen)
+    window.board = random_game(rng, 40)
+    return window.draw_pieces
+
+
+@case("get_legal_moves")
+def bench_get_legal_moves(screen, tmp, rng):
+    window = GameWindow(screen)
+    positions = sample_positions(rng)
+    squares = [
+        [square for square in window.squares
+         if board.piece_at(square.id) and board.piece_at(square.id).color == board.turn]
+        for board in positions
+    ]
+
+    def legal_moves():
+        window.move_cache.clear()  # Pomiar bez pamięci podręcznej ruchów
+        for board, own_squares in zip(positions, squares):
+            window.board = board
+            for square in own_squares:
+                window.get_legal_moves(square)
+    return legal_moves
+
+
+@case("save_game_json")
+def bench_save_game_json(screen, tmp, rng):
+    window = GameWindow(screen)
+    window.board = random_game(rng)
+    window.elapsed_time = 600
+    return lambda: window.save_game(tmp / "saves")
+
+
+@case("save_game_binary")
+def bench_save_game_binary(screen, tmp, rng):
+    window = GameWindow(screen)
+    window.board = random_game(rng)
+    window.elapsed_time = 600
+    return lambda: window.save_game(tmp / "saves", binary=True)
+
+
+@case("load_game_json")
+def bench_load_game_json(screen, tmp, rng):
+    window = GameWindow(screen)
+    path = tmp / "game.json"
+    write_json_record(path, "2025-01-01 12:00:00", 600, random_game(rng).move_stack)
+    return lambda: window.load_game(path)
+
+
+@case("load_game_binary")
+def bench_load_game_binary(screen, tmp, rng):
+    window = GameWindow(screen)
+    window.board = random_game(rng)
+    window.elapsed_time = 600
+    path = window.save_game(tmp, binary=True)
+    return lambda: window.load_game(path)
+
+
+@case("analise_replay")
+def bench_analise_replay(screen, tmp, rng):
+    window = AnaliseWindow(screen, incremental=True)
+    path = tmp / "replay.json"
+    write_json_record(path, "2025-01-01 12:00:00", 600, random_game(rng).move_stack)
+
+    def replay():
+        window.load_game(path)
+        while window.needs_frames():
+            window.update()
+        for _ in range(len(window.cursor)):
+            window.make_move()
+            window.update()
+    return replay
+
+
+@case("analise_jump")
+def bench_analise_jump(screen, tmp, rng):
+    window = AnaliseWindow(screen)
+    path = tmp / "jump.json"
+    write_json_record(path, "2025-01-01 12:00:00", 600, random_game(rng).move_stack)
+    window.load_game(path)
+    while window.needs_frames():
+        window.load_more()
+    plies = [rng.randint(0, len(window.cursor)) for _ in range(100)]
+
+    def jumps():
+        for ply in plies:
+            window.jump_to(ply)
+    return jumps
+
+
+@case("export_diagrams_png")
+def bench_export_diagrams_png(screen, tmp, rng):
+    path = tmp / "diagrams.json"
+    write_json_record(path, "2025-01-01 12:00:00", 600, random_game(rng).move_stack)
+    return lambda: export_diagrams(path, tmp / "diagrams", workers=1)
+
+
+@case("export_diagrams_svg")
+def bench_export_diagrams_svg(screen, tmp, rng):
+    path = tmp / "diagrams.json"
+    write_json_record(path, "2025-01-01 12:00:00", 600, random_game(rng).move_stack)
+    return lambda: export_diagrams(path, tmp / "diagrams", fmt="svg", workers=1)
+
+
+def leaderboard_cases(size):
+    def update_leaderboard(screen, tmp, rng):
+        archive = write_archive(tmp / f"top_{size}.db", size, rng)
+        Leaderboard(archive).rebuild()  # Jednorazowe utworzenie pliku rankingu
+        window = GameWindow(screen, archive=archive)
+        game_ids = []
+
+        def setup():
+            # Nowa partia dopisana do archiwum (poza pomiarem)
+            window.elapsed_time = rng.randint(1, 10 ** 6)
+            game_ids.append(archive.append("2025-01-01 12:00:00", window.elapsed_time, []))
+        return (lambda: window.update_leaderboard(game_ids[-1]), setup)
+
+    def rebuild(screen, tmp, rng):
+        archive = write_archive(tmp / f"rebuild_{size}.db", size, rng)
+        return lambda: Leaderboard(archive).rebuild()
+
+    return {f"update_leaderboard[{size}]": update_leaderboard, f"leaderboard_rebuild[{size}]": rebuild}
+
+
+def measure(func, setup=None, min_time=MIN_TIME):
+    """
+    Mierzy czasy wywołań `func` (co najmniej `MIN_ROUNDS` razy, łącznie co najmniej `min_time` s).
+
+    Returns:
+        dict: Statystyki czasu jednego wywołania w sekundach: min, median, mean, stdev, rounds.
+    """
+    if setup:
+        setup()
+    func()  # Rozgrzewka
+    times = []
+    total = 0.0
+    while len(times) < MIN_ROUNDS or (total < min_time and len(times) < MAX_ROUNDS):
+        if setup:
+            setup()
+        start = time.perf_counter()
+        func()
+        elapsed = time.perf_counter() - start
+        times.append(elapsed)
+        total += elapsed
+    return {
+        "min": min(times),
+        "median": statistics.median(times),
+        "mean": statistics.fmean(times),
+        "stdev": statistics.stdev(times) if len(times) > 1 else 0.0,
+        "rounds": len(times),
+    }
+
+
+def run_benchmarks(names=None, sizes=LEADERBOARD_SIZES, min_time=MIN_TIME, progress=None):
+    """
+    Uruchamia wybrane przypadki testowe.
+
+    Args:
+        names (list or None): Podciągi nazw przypadków do uruchomienia; None - wszystkie.
+        sizes (iterable): Liczby partii w archiwum w testach rankingu.
+        min_time (float): Minimalny łączny czas pomiaru jednego przypadku.
+        progress (callable or None): Wywoływana z nazwą i wynikiem każdego przypadku.
+
+    Returns:
+        dict: Wyniki w formacie zapisywanym do pliku JSON.
+    """
+    cases = dict(CASES)
+    for size in sizes:
+        cases.update(leaderboard_cases(size))
+    if names:
+        cases = {name: factory for name, factory in cases.items() if any(part in name for part in names)}
+        if not cases:
+            raise BenchmarkError(f"no benchmarks match {names}")
+
+    screen = offscreen_surface()
+    results = {}
+    for name, factory in cases.items():
+        # Każdy przypadek ma własny katalog tymczasowy i generator o tym samym ziarnie
+        with tempfile.TemporaryDirectory() as tmp:
+            prepared = factory(screen, Path(tmp), random.Random(SEED))
+            func, setup = prepared if isinstance(prepared, tuple) else (prepared, None)
+            results[name] = measure(func, setup, min_time)
+        if progress:
+            progress(name, results[name])
+
+    return {
+        "date": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"),
+        "machine": {"python": platform.python_version(), "platform": platform.platform(),
+                    "processor": platform.processor(), "cpus": os.cpu_count()},
+        "benchmarks": results,
+    }
+
+
+def load_results(path):
+    try:
+        with Path(path).open("r") as fp:
+            data = json.load(fp)
+        return data["benchmarks"]
+    except (OSError, json.JSONDecodeError, KeyError, TypeError) as e:
+        raise BenchmarkError(f"{path}: {e}")
+
+
+def compare(baseline, current, threshold=THRESHOLD):
+    """
+    Porównuje mediany czasów z wzorcem.
+
+    Args:
+        baseline (dict): Wyniki wzorcowe {nazwa: statystyki}.
+        current (dict): Wyniki bieżące {nazwa: statystyki}.
+        threshold (float): Dopuszczalny względny wzrost mediany.
+
+    Returns:
+        list: Krotki (nazwa, mediana wzorca, mediana bieżąca, stosunek, status), gdzie status to
+            "regression", "improvement", "ok", "new" albo "missing".
+    """
+    rows = []
+    for name in sorted(baseline.keys() | current.keys()):
+        if name not in baseline:
+            rows.append((name, None, current[name]["median"], None, "new"))
+            continue
+        if name not in current:
+            rows.append((name, baseline[name]["median"], None, None, "missing"))
+            continue
+        before, after = baseline[name]["median"], current[name]["median"]
+        ratio = after / before if before else float("inf")
+        if ratio > 1 + threshold:
+            status = "regression"
+        elif ratio < 1 / (1 + threshold):
+            status = "improvement"
+        else:
+            status = "ok"
+        rows.append((name, before, after, ratio, status))
+    return rows
+
+
+def format_time(seconds):
+    if seconds is None:
+        return "-"
+    if seconds < 1e-3:
+        return f"{seconds * 1e6:.1f} us"
+    if seconds < 1:
+        return f"{seconds * 1e3:.2f} ms"
+    return f"{seconds:.2f} s"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Testy wydajności aplikacji Shogi.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    run_parser = commands.add_parser("run", help="Uruchom testy i zapisz wyniki.")
+    run_parser.add_argument("-o", "--output", help="Plik wyników JSON (np. benchmarks/baseline.json).")
+    run_parser.add_argument("-k", "--select", nargs="*", help="Uruchom tylko przypadki zawierające podane napisy.")
+    run_parser.add_argument("--sizes", nargs="*", type=int, default=list(LEADERBOARD_SIZES),
+                            help="Liczby partii w archiwum w testach rankingu.")
+    run_parser.add_argument("--min-time", type=float, default=MIN_TIME, help="Minimalny czas pomiaru przypadku (s).")
+
+    compare_parser = commands.add_parser("compare", help="Porównaj wyniki z wzorcem.")
+    compare_parser.add_argument("baseline", help="Plik wyników wzorcowych.")
+    compare_parser.add_argument("current", help="Plik wyników bieżących.")
+    compare_parser.add_argument("--threshold", type=float, default=THRESHOLD,
+                                help="Dopuszczalny względny wzrost mediany (0.2 = 20%%).")
+    args = parser.parse_args(argv)
+
+    try:
+        if args.command == "run":
+            def progress(name, stats):
+                print(f"{name:40} {format_time(stats['median']):>12}  ({stats['rounds']} rounds)")
+            data = run_benchmarks(args.select, args.sizes, args.min_time, progress)
+            if args.output:
+                output = Path(args.output)
+                output.parent.mkdir(parents=True, exist_ok=True)
+                output.write_text(json.dumps(data, indent=4))
+            return 0
+
+        rows = compare(load_results(args.baseline), load_results(args.current), args.threshold)
+    except BenchmarkError as e:
+        print(e, file=sys.stderr)
+        return 2
+
+    for name, before, after, ratio, status in rows:
+        change = f"{ratio:6.2f}x" if ratio is not None else "      -"
+        print(f"{name:40} {format_time(before):>12} {format_time(after):>12} {change}  {status}")
+    return 1 if any(row[4] == "regression" for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
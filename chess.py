@@ -5,7 +5,18 @@ import shogi
 import time
 import json
 import os
+import copy
 import datetime
+import threading
+from search_service import ENGINE_RESULT
+from positions import PositionBoard, position_key, game_status, CHECKMATE
+from profiler import profiled
+from leaderboard import Leaderboard, leaderboard_path, TOP_LIMIT
+from archive import ArchiveError
+from records import move_from_dict, open_record, MoveStream, STREAM_MOVES, write_json_record, write_binary_record, read_binary_record, RecordError, BINARY_SUFFIX
+import weakref
+from collections import OrderedDict
+from concurrent.futures import Future
 
 
 class SaveGameError(Exception):
@@ -33,6 +44,8 @@ BOARD_SIZE = 9
 LIGHT_COLOR = (240, 217, 181)
 DARK_COLOR = (181, 136, 99)
 LINE_COLOR = (0, 0, 0)
+CHECK_COLOR = (255, 102, 102)  # Lekki czerwony - król w szachu
+LEGAL_COLOR = (173, 216, 230)  # Lekki błękit - legalne pola wybranej figury
 
 # Kolory marginesu
 GREY = (200, 200, 200)
@@ -57,6 +70,331 @@ MARGINES_X = BOARD_SIZE * CELL_SIZE  # Początek marginesu w osi X
 MARGINES_X1 = MARGINES_X + 10 * CELL_SIZE  # Koniec marginesu w osi X
 ROW_SIZE = 8 * CELL_SIZE / 14  # Wysokość każdego wiersza marginesu
 
+# Pamięć podręczna napisów
+GLYPH_CACHE_SIZE = 512  # Maksymalna liczba przechowywanych wyrenderowanych napisów
+OUTLINE_COLOR = BLUE  # Kolor obwódki tekstu
+OUTLINE_WIDTH = 1  # Grubość obwódki tekstu w pikselach
+
+# Katalog eksportu partii do plików (`GameWindow.save_game`)
+EXPORT_DIR = 'exports'
+
+# Tempo odświeżania
+ACTIVE_FPS = 60  # Domyślna liczba klatek na sekundę podczas animacji i odmierzania czasu gry
+
+
+def piece_style(piece, turn):
+    """
+    Zwraca symbol, kolor tekstu i informację o obwódce dla figury (styl planszy, także w diagramach).
+
+    Args:
+        piece (shogi.Piece): Figura na polu.
+        turn (int): Kolor gracza wykonującego ruch; jego figury mają obwódkę.
+    """
+    # Ustaw kolor tekstu w zależności od koloru figury
+    text_color = BLACK if piece.color == shogi.BLACK else WHITE
+
+    # Obwódka dla figur gracza, który wykonuje ruch
+    with_outline = piece.color == turn
+    return piece.symbol(), text_color, with_outline
+
+
+# Widok planszy: płaska tablica 81 kodów figur w kolejności pól (id przycisków pól)
+WHITE_CODE = 16  # Kod figury białych: typ figury + WHITE_CODE; 0 - puste pole
+SQUARE_COLORS = [LIGHT_COLOR if (square // BOARD_SIZE + square % BOARD_SIZE) % 2 == 0 else DARK_COLOR
+                 for square in shogi.SQUARES]
+PIECE_STYLES = [
+    {piece_type + color * WHITE_CODE: piece_style(shogi.Piece(piece_type, color), turn)
+     for color in shogi.COLORS for piece_type in shogi.PIECE_TYPES}
+    for turn in shogi.COLORS
+]  # PIECE_STYLES[gracz na ruchu][kod figury] -> wynik `piece_style`
+
+
+def piece_codes(board):
+    """
+    Zwraca listę 81 kodów figur planszy (0 - puste pole, typ figury, typ figury + WHITE_CODE dla białych).
+    """
+    white = board.occupied[shogi.WHITE]
+    return [piece_type + WHITE_CODE if piece_type and white & shogi.BB_SQUARES[square] else piece_type
+            for square, piece_type in enumerate(board.pieces)]
+
+
+def square_at(pos):
+    """
+    Zwraca id pola planszy pod punktem `pos` (w pikselach) albo None poza planszą.
+    """
+    x, y = pos
+    if 0 <= x < BOARD_SIZE * CELL_SIZE and 0 <= y < BOARD_SIZE * CELL_SIZE:
+        return int(y // CELL_SIZE) * BOARD_SIZE + int(x // CELL_SIZE)
+    return None
+
+
+class GlyphCache:
+    """
+    Współdzielona pamięć podręczna czcionek i wyrenderowanych napisów.
+
+    Czcionki są tworzone raz dla każdej kombinacji (nazwa, rozmiar, pogrubienie), a gotowe
+    powierzchnie z tekstem (łącznie z obwódką) są przechowywane pod kluczem
+    (tekst, czcionka, rozmiar, kolor, obwódka) i usuwane według zasady LRU.
+
+    Atrybuty:
+        max_size (int): Maksymalna liczba przechowywanych napisów.
+        fonts (dict): Słownik utworzonych czcionek.
+        glyphs (OrderedDict): Wyrenderowane napisy w kolejności ostatniego użycia.
+
+    Uwagi:
+        Obiekty `pygame.font.Font` tracą ważność po `pygame.quit()`, dlatego pamięć jest
+        czyszczona automatycznie przy zamykaniu Pygame.
+    """
+    def __init__(self, max_size=GLYPH_CACHE_SIZE) -> None:
+        self.max_size = max_size
+        self.fonts = {}
+        self.glyphs = OrderedDict()
+        self._quit_hook = False
+
+    def get_font(self, font_type='Arial', font_size=24, bold=True):
+        """
+        Zwraca czcionkę z pamięci podręcznej, tworząc ją przy pierwszym użyciu.
+        """
+        key = (font_type, font_size, bold)
+        font = self.fonts.get(key)
+        if font is None:
+            if not self._quit_hook:
+                # Funkcje zarejestrowane w Pygame są wywoływane tylko raz
+                pygame.register_quit(self.clear)
+                self._quit_hook = True
+            font = pygame.font.SysFont(font_type, font_size, bold=bold)
+            self.fonts[key] = font
+        return font
+
+    def render(self, text, font_type='Arial', font_size=24, color=BLACK, outline=False, bold=True):
+        """
+        Zwraca powierzchnię z napisem, renderując ją tylko przy braku w pamięci.
+
+        Args:
+            text (str): Tekst do wyrenderowania.
+            font_type (str): Nazwa czcionki.
+            font_size (int): Rozmiar czcionki.
+            color (tuple): Kolor tekstu (R, G, B).
+            outline (bool): Czy dodać obwódkę wokół tekstu.
+            bold (bool): Czy użyć pogrubionej czcionki.
+
+        Returns:
+            pygame.Surface: Gotowa do narysowania powierzchnia z tekstem.
+        """
+        key = (text, font_type, font_size, tuple(color), outline, bold)
+        surface = self.glyphs.get(key)
+        if surface is not None:
+            self.glyphs.move_to_end(key)
+            return surface
+
+        font = self.get_font(font_type, font_size, bold)
+        text_surface = font.render(text, True, color)
+        if outline:
+            # Obwódka i tekst składane raz w jedną powierzchnię
+            outline_surface = font.render(text, True, OUTLINE_COLOR)
+            width, height = text_surface.get_size()
+            surface = pygame.Surface((width + 2 * OUTLINE_WIDTH, height + 2 * OUTLINE_WIDTH), pygame.SRCALPHA)
+            for dx in range(-OUTLINE_WIDTH, OUTLINE_WIDTH + 1):
+                for dy in range(-OUTLINE_WIDTH, OUTLINE_WIDTH + 1):
+                    if dx != 0 or dy != 0:  # Nie rysuj środka wielokrotnie
+                        surface.blit(outline_surface, (OUTLINE_WIDTH + dx, OUTLINE_WIDTH + dy))
+            surface.blit(text_surface, (OUTLINE_WIDTH, OUTLINE_WIDTH))
+        else:
+            surface = text_surface
+
+        self.glyphs[key] = surface
+        if len(self.glyphs) > self.max_size:
+            self.glyphs.popitem(last=False)
+        return surface
+
+    def clear(self):
+        """
+        Usuwa wszystkie czcionki i napisy z pamięci podręcznej.
+        """
+        self.fonts.clear()
+        self.glyphs.clear()
+        self._quit_hook = False
+
+
+GLYPH_CACHE = GlyphCache()
+
+
+class AssetManager:
+    """
+    Menedżer obrazów aplikacji (tła, ikony).
+
+    Obrazy są wczytywane z dysku tylko raz, konwertowane do formatu ekranu (`convert()`),
+    a ich przeskalowane wersje są przechowywane pod kluczem (ścieżka, rozmiar). Wczytywanie
+    można rozpocząć w tle przy starcie aplikacji, aby pierwsza klatka nie czekała na dysk.
+
+    Atrybuty:
+        images (dict): Obrazy w formacie ekranu, kluczem jest ścieżka.
+        scaled_images (dict): Przeskalowane obrazy, kluczem jest (ścieżka, rozmiar).
+
+    Uwagi:
+        - Dekodowanie plików odbywa się w wątku w tle, natomiast `convert()` zawsze
+          w wątku głównym, ponieważ wymaga ustawionego trybu ekranu.
+        - Każdy wczytywany w tle plik ma własny `Future`: pierwsze użycie obrazu czeka tylko na ten
+          plik, a jeśli wątek jeszcze go nie zaczął, obraz jest wczytywany od razu w wątku głównym.
+        - Obrazy użyte przed utworzeniem ekranu są zwracane bez konwersji i konwertowane
+          przy pierwszym użyciu po `pygame.display.set_mode`.
+    """
+    def __init__(self) -> None:
+        self.images = {}
+        self.scaled_images = {}
+        self._pending = {}
+        self._unconverted = {}
+        self._unconverted_scaled = set()
+        self._quit_hook = False
+
+    def preload(self, directory='pictures', pattern='*.jpg'):
+        """
+        Rozpoczyna wczytywanie obrazów z katalogu w wątku w tle.
+        """
+        queue = []
+        for path in sorted(Path(directory).glob(pattern)):
+            path = str(path)
+            if path not in self.images and path not in self._pending:
+                self._pending[path] = Future()
+                queue.append((path, self._pending[path]))
+        threading.Thread(target=self._load_all, args=(queue,), daemon=True).start()
+
+    @staticmethod
+    def _load_all(queue):
+        for path, future in queue:
+            if not future.set_running_or_notify_cancel():
+                continue  # Obraz został już wczytany w wątku głównym
+            try:
+                future.set_result(pygame.image.load(path))
+            except (pygame.error, FileNotFoundError) as e:
+                future.set_exception(e)
+
+    def _load(self, path):
+        future = self._pending.pop(path, None)
+        if future is not None and not future.cancel():
+            try:
+                return future.result()  # Plik jest właśnie dekodowany w tle
+            except (pygame.error, FileNotFoundError):
+                pass  # Błąd zostanie zgłoszony przez wczytanie poniżej
+        return pygame.image.load(path)
+
+    def image(self, path):
+        """
+        Zwraca obraz w formacie ekranu, wczytując go przy pierwszym użyciu.
+        """
+        path = str(Path(path))
+        surface = self.images.get(path)
+        if surface is not None:
+            return surface
+
+        surface = self._unconverted.pop(path, None)
+        if surface is None:
+            surface = self._load(path)
+            if not self._quit_hook:
+                pygame.register_quit(self.clear)
+                self._quit_hook = True
+        if pygame.display.get_surface() is None:
+            self._unconverted[path] = surface  # Konwersja po utworzeniu ekranu
+            return surface
+        surface = surface.convert()
+        self.images[path] = surface
+        return surface
+
+    def scaled(self, path, size):
+        """
+        Zwraca obraz przeskalowany do podanego rozmiaru.
+        """
+        key = (str(Path(path)), tuple(size))
+        surface = self.scaled_images.get(key)
+        if surface is None or (key in self._unconverted_scaled and pygame.display.get_surface() is not None):
+            surface = pygame.transform.scale(self.image(path), size)
+            self.scaled_images[key] = surface
+            if key[0] in self.images:
+                self._unconverted_scaled.discard(key)
+            else:
+                self._unconverted_scaled.add(key)
+        return surface
+
+    def clear(self):
+        """
+        Usuwa wszystkie obrazy z pamięci.
+        """
+        self.images.clear()
+        self.scaled_images.clear()
+        self._unconverted.clear()
+        self._unconverted_scaled.clear()
+        self._quit_hook = False
+
+
+ASSETS = AssetManager()
+
+# Pamięć podręczna ruchów
+MOVE_CACHE_SIZE = 256  # Maksymalna liczba zapamiętanych pozycji
+
+# Nakładka z pytaniem o promocję, na środku planszy
+PROMPT_RECT = pygame.Rect(0, 0, 5 * CELL_SIZE, 2 * CELL_SIZE)
+PROMPT_RECT.center = (BOARD_SIZE * CELL_SIZE // 2, SCREEN_HEIGHT // 2)
+PROMPT_BUTTON_SIZE = 2 * CELL_SIZE - 20, CELL_SIZE // 2
+PROMOTE_POS = PROMPT_RECT.x + 20, PROMPT_RECT.bottom - CELL_SIZE // 2 - 20
+KEEP_POS = PROMPT_RECT.right - 20 - PROMPT_BUTTON_SIZE[0], PROMOTE_POS[1]
+
+
+class MoveCache:
+    """
+    Pamięć podręczna legalnych ruchów kluczowana haszem Zobrista pozycji.
+
+    Dla każdej pozycji ruchy są generowane raz i grupowane według pola początkowego
+    oraz typu dostawianej figury. Pozycje są usuwane według zasady LRU, a ponieważ
+    kluczem jest sama pozycja, wpisy pozostają ważne po cofnięciu i ponowieniu ruchów.
+
+    Atrybuty:
+        max_size (int): Maksymalna liczba zapamiętanych pozycji.
+        positions (OrderedDict): Słownik {hasz: (ruchy według pola, dostawienia według typu)}.
+    """
+    def __init__(self, max_size=MOVE_CACHE_SIZE) -> None:
+        self.max_size = max_size
+        self.positions = OrderedDict()
+
+    def _entry(self, board):
+        key = position_key(board)
+        entry = self.positions.get(key)
+        if entry is not None:
+            self.positions.move_to_end(key)
+            return entry
+
+        by_origin, by_drop = {}, {}
+        for move in board.legal_moves:
+            if move.drop_piece_type:
+                by_drop.setdefault(move.drop_piece_type, []).append(move)
+            else:
+                by_origin.setdefault(move.from_square, []).append(move)
+        entry = by_origin, by_drop
+
+        self.positions[key] = entry
+        if len(self.positions) > self.max_size:
+            self.positions.popitem(last=False)
+        return entry
+
+    def from_square(self, board, square):
+        """
+        Zwraca legalne ruchy figury stojącej na polu `square`.
+        """
+        return self._entry(board)[0].get(square, [])
+
+    def drops(self, board, piece_type):
+        """
+        Zwraca legalne dostawienia figury danego typu z ręki gracza.
+        """
+        return self._entry(board)[1].get(piece_type, [])
+
+    def is_legal(self, board, move):
+        if move.drop_piece_type:
+            return move in self.drops(board, move.drop_piece_type)
+        return move in self.from_square(board, move.from_square)
+
+    def clear(self):
+        self.positions.clear()
+
 
 class GameWindow:
     """
@@ -70,8 +408,9 @@ class GameWindow:
         squares (list): Lista pól planszy reprezentowanych jako obiekty klasy Button.
         board_size (int): Rozmiar planszy (domyślnie 9x9).
         screen (pygame.Surface): Powierzchnia renderowania Pygame.
-        board (shogi.Board): Obiekt planszy Shogi z biblioteką shogi.
+        board (PositionBoard): Plansza Shogi z kluczem pozycji aktualizowanym przy każdym ruchu.
         king_square (Button or None): Pole, na którym znajduje się król (jeśli jest w szachu).
+        piece_codes (list): Kody figur na 81 polach planszy (`piece_codes`), odświeżane po zmianie pozycji.
         selected_piece (shogi.Piece or None): Wybrana figura do wykonania ruchu.
         legal_moves (list or bool): Lista pól, na które figura może się ruszyć.
         selected_square (Button or None): Wybrane pole na planszy.
@@ -84,10 +423,29 @@ class GameWindow:
         back_button (Button or None): Przycisk powrotu do menu głównego.
         selected_captured_button (Button or None): Wybrany przycisk reprezentujący figurę na marginesie.
         message (str or None): Aktualny komunikat wyświetlany użytkownikowi.
+        message_style (tuple): Rozmiar czcionki i kolor komunikatu.
+        message_expires (int or None): Chwila (`pygame.time.get_ticks`, ms) zniknięcia komunikatu;
+            None - komunikat wyświetlany do odwołania.
+        move_cache (MoveCache): Pamięć podręczna legalnych ruchów dla odwiedzonych pozycji.
+        promotion_prompt (tuple or None): Pola (skąd, dokąd) ruchu czekającego na decyzję o promocji.
+        promote_button (Button): Przycisk promocji w nakładce z pytaniem o promocję.
+        keep_button (Button): Przycisk rezygnacji z promocji w nakładce z pytaniem o promocję.
+        engine (engine.Engine or None): Silnik przeciwnika komputerowego (None w grze dwóch graczy).
+        engine_color (int): Kolor, którym gra silnik (shogi.BLACK lub shogi.WHITE).
+        engine_info (engine.SearchResult or None): Wynik (lub postęp) ostatniego wyszukiwania silnika.
+        search_service (SearchService or None): Usługa wyszukiwania w tle; bez niej silnik liczy synchronicznie.
+        thinking (bool): Flaga wskazująca, że silnik szuka ruchu w tle.
+        archive (archive.GameArchive or None): Archiwum, w którym zapisywana jest każda zakończona partia
+            (None - partia nie jest zapisywana).
+        journal (journal.GameJournal or None): Dziennik ruchów trwającej partii (wznawianie po awarii).
         add_mode (bool): Tryb dodawania figur na planszę.
+        status (positions.GameStatus): Stan gry (w toku, mat, powtórzenie, pat, zwycięzca) wyznaczany po każdym ruchu.
         game_over (bool): Flaga wskazująca, czy gra została zakończona.
         start_time (float or None): Czas rozpoczęcia gry.
         end_time (float or None): Czas zakończenia gry.
+        incremental (bool): Tryb renderowania przyrostowego (tylko zmienione pola i wiersze marginesu).
+        dirty_rects (list): Obszary ekranu zmienione w ostatniej klatce, do `pygame.display.update`.
+        target_fps (int): Liczba klatek na sekundę, gdy okno wymaga ciągłego odświeżania (`needs_frames`).
 
     Metody:
         - Zarządzanie planszą (tworzenie, rysowanie, aktualizowanie).
@@ -101,13 +459,16 @@ class GameWindow:
         Klasa współpracuje z biblioteką Pygame do renderowania interfejsu i biblioteką Shogi
         do zarządzania logiką gry. Wymaga poprawnie zainicjalizowanego środowiska Pygame.
     """
-    def __init__(self, screen) -> None:
+    def __init__(self, screen, incremental=False, engine=None, engine_color=shogi.WHITE, search_service=None,
+                 archive=None, journal=None) -> None:
         self.squares = []
         self.board_size = 9
         self.screen = screen
-        self.board = shogi.Board()
+        self.board = PositionBoard()
 
         self.king_square = None
+        self.piece_codes = [shogi.NONE] * len(shogi.SQUARES)
+        self._codes_key = None
         self.selected_piece = None
         self.legal_moves = False
         self.selected_square = None
@@ -121,17 +482,56 @@ class GameWindow:
         self.selected_captured_button = None
 
         self.message = None
+        self.message_style = (48, WHITE)
+        self.message_expires = None
+        self.move_cache = MoveCache()
+
+        # Nakładka z pytaniem o promocję (nie blokuje pętli gry)
+        self.promotion_prompt = None
+        self.promote_button = Button(*PROMOTE_POS, *PROMPT_BUTTON_SIZE, 'PROMOTE', GRAY)
+        self.keep_button = Button(*KEEP_POS, *PROMPT_BUTTON_SIZE, 'KEEP', GRAY)
+        self._rendered_prompt = None
+
+        # Przeciwnik komputerowy
+        self.engine = engine
+        self.engine_color = engine_color
+        self.engine_info = None
+        self.search_service = search_service
+        self.engine_search_id = None
+        self.thinking = False
+        self.archive = archive
+        self.journal = journal
 
         self.add_mode = False
+        self.status = game_status(self.board)
         self.game_over = False
         self.start_time = None
         self.end_time = None
+
+        # Renderowanie przyrostowe
+        self.incremental = incremental
+        self.dirty_rects = []
+        self.target_fps = ACTIVE_FPS
+        self._full_redraw = True
+        self._rendered_squares = {}
+        self._rendered_rows = {}
+        self._rendered_hud = None
+        self._caption = None
+
         self.create_board()
         self.create_margines()
         self.create_margin_buttons()
 
     def set_screen(self, new_screen):
         self.screen = new_screen
+        self.invalidate()
+
+    def invalidate(self):
+        """
+        Wymusza pełne przerysowanie okna (i tytułu) w następnej klatce.
+        """
+        self._full_redraw = True
+        self._caption = None
 
     def draw_board_lines(self):
         for i in range(self.board_size + 1):
@@ -147,21 +547,45 @@ class GameWindow:
                 self.squares.append(button)
         self.draw_board_lines()
 
-    def update_board(self):
-        for square in self.squares:
-            # Resetuj kolor pola do domyślnego
-            default_color = LIGHT_COLOR if (square.id // self.board_size + square.id % self.board_size) % 2 == 0 else DARK_COLOR
-            square.set_color(default_color)
+    def highlights(self):
+        """
+        Zwraca słownik {id pola: kolor} podświetlonych pól: króla w szachu i legalnych pól wybranej figury.
+        """
+        colors = {}
+        if self.king_square is not None:
+            colors[self.king_square.id] = CHECK_COLOR
+        if self.legal_moves:
+            for square in self.legal_moves:
+                colors[square.id] = LEGAL_COLOR
+        return colors
+
+    def square_color(self, square, highlights=None):
+        """
+        Zwraca kolor pola z uwzględnieniem podświetlenia szachu i legalnych ruchów.
 
-            # Podświetlenie pola króla w szachu
-            if square == self.king_square:
-                color = (255, 102, 102)  # Lekki czerwony
-                square.set_color(color)
+        Args:
+            square (Button): Pole planszy.
+            highlights (dict or None): Wynik `highlights()` obliczony raz dla całej klatki.
+        """
+        if highlights is None:
+            highlights = self.highlights()
+        return highlights.get(square.id, SQUARE_COLORS[square.id])
 
-            # Podświetlenie legalnych pól, jeśli są ustawione
-            if self.legal_moves and square in self.legal_moves:
-                color = (173, 216, 230)  # Lekki błękit
-                square.set_color(color)
+    def update_piece_codes(self):
+        """
+        Odświeża kody figur (`piece_codes`), jeśli pozycja zmieniła się od ostatniego wywołania.
+        """
+        key = position_key(self.board)
+        if key != self._codes_key:
+            self.piece_codes = piece_codes(self.board)
+            self._codes_key = key
+        return self.piece_codes
+
+    @profiled()
+    def update_board(self):
+        highlights = self.highlights()
+        for square in self.squares:
+            square.set_color(self.square_color(square, highlights))
 
             # Rysowanie pola (bez tekstu)
             if not square.text:
@@ -176,57 +600,48 @@ class GameWindow:
         """
         king_square = self.board.king_squares[self.board.turn]  # Znajdź pole króla aktualnego gracza
         if self.board.is_attacked_by(self.board.turn ^ 1, king_square):  # Sprawdź, czy król jest atakowany
-            for square in self.squares:
-                if square.id == king_square:
-                    king_square = square
-            return king_square
+            return self.squares[king_square]  # Pola planszy są ułożone według id
         return None
 
+    def piece_style(self, piece):
+        """
+        Zwraca symbol, kolor tekstu i informację o obwódce dla figury.
+        """
+        return piece_style(piece, self.board.turn)
+
+    @profiled()
     def draw_pieces(self):
         """
         Rysuje figury na planszy i resetuje pola bez figur.
         """
+        codes = self.update_piece_codes()
+        styles = PIECE_STYLES[self.board.turn]
         for square in self.squares:
             # Reset tekstu na polach
             square.set_text(None)
 
-            # Pobierz figurę z planszy na odpowiednim polu
-            piece = self.board.piece_at(square.id)
-            if piece:
-                # Ustaw kolor tekstu w zależności od koloru figury
-                text_color = BLACK if piece.color == shogi.BLACK else WHITE
-                symbol = piece.symbol()  # Symbol figury
+            # Kod figury na odpowiednim polu
+            code = codes[square.id]
+            if code:
+                symbol, text_color, with_outline = styles[code]
                 square.set_text(symbol)
 
-                # Wybór obwódki w zaleności od ruchu gracza
-                if self.board.turn == shogi.WHITE:
-                    if text_color == WHITE:
-                        with_outline = True
-                    else:
-                        with_outline = False
-                else:
-                    if text_color == BLACK:
-                        with_outline = True
-                    else:
-                        with_outline = False
-
                 # Rysowanie pola z odpowiednim kolorem tekstu
                 square.draw(self.screen, font_size=CELL_SIZE // 2, text_color=text_color, with_outline=with_outline)
             else:
                 # Rysowanie pustego pola
                 square.draw(self.screen, BLACK)
 
+    @profiled()
     def get_legal_moves(self, square):
         """
         Zwraca listę pól, na które wybrana figura może się ruszyć.
         """
-        square = square.id
-        moves = list(self.board.legal_moves)  # Wszystkie możliwe ruchy
-        legal_squares_ids = [
-            move.to_square for move in moves if move.from_square == square
-        ]
+        moves = self.move_cache.from_square(self.board, square.id)  # Ruchy figury z pamięci podręcznej
+        legal_squares_ids = sorted({move.to_square for move in moves})
 
-        legal_squares = [square for square in self.squares if square.id in legal_squares_ids]
+        # Pola planszy są ułożone według id
+        legal_squares = [self.squares[square_id] for square_id in legal_squares_ids]
         self.legal_moves = legal_squares
         return legal_squares
 
@@ -235,9 +650,8 @@ class GameWindow:
         return y < 9 * CELL_SIZE and x < 9 * CELL_SIZE
 
     def clicked_square(self, pos):
-        for square in self.squares:
-            if square.clicked(pos):
-                return square
+        square_id = square_at(pos)
+        return None if square_id is None else self.squares[square_id]
 
     def find_piece(self, square):
         """Znajduje figurę o na odpowiednim polu"""
@@ -249,8 +663,8 @@ class GameWindow:
 
     def make_move(self, from_square, to_square):
         move = shogi.Move(from_square.id, to_square.id, self.promotion)
-        if move in self.board.legal_moves:
-            self.board.push(move)
+        if self.move_cache.is_legal(self.board, move):
+            self.push_move(move)
 
     def set_promotion(self, value):
         self.promotion = value
@@ -266,30 +680,84 @@ class GameWindow:
             return square // BOARD_SIZE in [6, 7, 8]  # Trzy ostatnie rzędy dla białych
         return False
 
-    def ask_for_promotion_gui(self):
+    def open_promotion_prompt(self, from_square, to_square):
         """
-        Wyświetla okno dialogowe z pytaniem o promocję.
+        Wstrzymuje ruch do czasu wyboru w nakładce: promocja albo pozostawienie figury.
         """
-        font = pygame.font.SysFont("Arial", 24)
-        question = font.render("Promote piece? (Y/N)", True, (25, 255, 255))
-        self.screen.blit(question, (SCREEN_WIDTH // 2 - question.get_width() // 2, SCREEN_HEIGHT // 2 - question.get_height() // 2))
-        pygame.display.flip()
+        self.promotion_prompt = (from_square, to_square)
 
-        while True:
-            for event in pygame.event.get():
-                if event.type == pygame.KEYDOWN:
-                    if event.key == pygame.K_y:
-                        return True
-                    elif event.key == pygame.K_n:
-                        return False
+    def promotion_choice(self, event):
+        """
+        Odczytuje wybór z nakładki promocji (kliknięcie przycisku lub klawisze Y/N).
+
+        Returns:
+            bool or None: True (promocja), False (bez promocji) albo None, gdy nie wybrano.
+        """
+        if event.type == pygame.MOUSEBUTTONDOWN:
+            if self.promote_button.clicked(event.pos):
+                return True
+            if self.keep_button.clicked(event.pos):
+                return False
+        elif event.type == pygame.KEYDOWN:
+            if event.key == pygame.K_y:
+                return True
+            if event.key == pygame.K_n:
+                return False
+        return None
+
+    def resolve_promotion(self, promote):
+        """
+        Zamyka nakładkę promocji i wykonuje wstrzymany ruch.
+        """
+        from_square, to_square = self.promotion_prompt
+        self.promotion_prompt = None
+        self.invalidate()  # Nakładka zasłaniała planszę
+        self.promotion = promote
+        self.complete_move(from_square, to_square)
+
+    def draw_promotion_prompt(self):
+        """
+        Rysuje nakładkę z pytaniem o promocję, jeśli jest otwarta, a ekran pod nią się zmienił.
+        """
+        if not self.promotion_prompt:
+            self._rendered_prompt = None
+            return
+        if self._rendered_prompt == self.promotion_prompt and not self.dirty_rects:
+            return
+
+        pygame.draw.rect(self.screen, BEIGE, PROMPT_RECT)
+        pygame.draw.rect(self.screen, BLACK, PROMPT_RECT, 2)
+        question = GLYPH_CACHE.render("Promote piece?", font_size=24, color=BLACK, bold=False)
+        self.screen.blit(question, question.get_rect(center=(PROMPT_RECT.centerx, PROMPT_RECT.y + CELL_SIZE // 2)))
+        self.promote_button.draw(self.screen, font_size=20)
+        self.keep_button.draw(self.screen, font_size=20)
+        if self.screen.get_rect() not in self.dirty_rects:
+            self.dirty_rects.append(PROMPT_RECT.copy())
+        self._rendered_prompt = self.promotion_prompt
+
+    def complete_move(self, from_square, to_square):
+        """
+        Wykonuje ruch gracza z `from_square` na `to_square` i czyści zaznaczenie.
+        """
+        self.make_move(from_square, to_square)
+        if not self.start_time:
+            self.start_time = time.time()
+
+        # Sprawdź czy król jest atakowany
+        self.king_square = self.get_king_square_in_check()
+        self.undone_moves.clear()
+
+        # Wyłącz podświetlenie po ruchu
+        self.selected_piece = None
+        self.selected_square = None
+        self.legal_moves = False
 
     def draw_margines(self):
         """
         Rysuje linie marginesu po prawej stronie planszy shogi z podziałem na rzędy.
         """
 
-        font = pygame.font.SysFont("Arial", 14, bold=True)
-        text = font.render('↓Captured pieces↓', True, BLACK)
+        text = GLYPH_CACHE.render('↓Captured pieces↓', font_size=14, color=BLACK)
         self.screen.blit(text, (MARGINES_X + 18, CELL_SIZE - 20))
 
         # Górna i dolna linia marginesu
@@ -372,13 +840,33 @@ class GameWindow:
 
     def set_message(self, message=None, font_size=48, color=WHITE, timex=3000):
         """
-        Wyświetla komunikat.
+        Ustawia komunikat wyświetlany w kolejnych klatkach (nie blokuje pętli gry).
+
+        Args:
+            message (str or None): Treść komunikatu (None usuwa bieżący komunikat).
+            font_size (int): Rozmiar czcionki.
+            color (tuple): Kolor tekstu.
+            timex (int or None): Czas wyświetlania w milisekundach; None - do odwołania.
         """
         self.message = message
-        if self.message:
-            font = pygame.font.SysFont("Arial", font_size, bold=True)
-            text_surface = font.render(message, True, color)  # Biały tekst
-            text_rect = text_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
+        self.message_style = (font_size, color)
+        self.message_expires = pygame.time.get_ticks() + timex if message and timex is not None else None
+
+    def expire_message(self):
+        """
+        Usuwa komunikat, którego czas wyświetlania minął.
+        """
+        if self.message and self.message_expires is not None and pygame.time.get_ticks() >= self.message_expires:
+            self.message = None
+            self.message_expires = None
+
+    def render_message(self):
+        """
+        Zwraca powierzchnię i prostokąt bieżącego komunikatu (wyśrodkowanego na ekranie).
+        """
+        font_size, color = self.message_style
+        text_surface = GLYPH_CACHE.render(self.message, font_size=font_size, color=color)
+        text_rect = text_surface.get_rect(center=(SCREEN_WIDTH // 2, SCREEN_HEIGHT // 2))
         return text_surface, text_rect
 
 
@@ -391,9 +879,14 @@ class GameWindow:
         :param selected_square: Wybrane pole (resetuje po cofnięciu ruchu)
         :return: Zaktualizowane zmienne gry
         """
+        self.cancel_engine()
         if self.board.move_stack:
-            move = self.board.pop()  # Cofnij ostatni ruch
+            move = self.pop_move()  # Cofnij ostatni ruch
             self.undone_moves.append(move)  # Zapisz cofnięty ruch
+
+            # W grze z komputerem cofnij również jego ruch
+            if self.is_engine_turn() and self.board.move_stack:
+                self.undone_moves.append(self.pop_move())
         else:
             self.set_message("No moves to undo!", timex=1000)
 
@@ -412,7 +905,11 @@ class GameWindow:
         """
         if self.undone_moves:
             move = self.undone_moves.pop()  # Pobierz ostatni cofnięty ruch
-            self.board.push(move)  # Przywróć ruch na planszy
+            self.push_move(move)  # Przywróć ruch na planszy
+
+            # W grze z komputerem przywróć również jego ruch
+            if self.is_engine_turn() and self.undone_moves:
+                self.push_move(self.undone_moves.pop())
         else:
             self.set_message('No moves to redo', timex=1000)
 
@@ -421,9 +918,105 @@ class GameWindow:
         self.king_square = self.get_king_square_in_check()
 
 
-    def draw_captured_pieces(self):
+    def push_move(self, move):
         """
-        Rysuje zbite figury (czarnych lub białych) wraz z ich liczbą na marginesie.
+        Wykonuje ruch na planszy i dopisuje go do dziennika partii.
+        """
+        self.board.push(move)
+        self.status = game_status(self.board)
+        if self.journal is not None:
+            self.journal.push(move, self.current_elapsed())
+
+    def pop_move(self):
+        """
+        Cofa ruch na planszy i dopisuje cofnięcie do dziennika partii.
+        """
+        move = self.board.pop()
+        self.status = game_status(self.board)
+        if self.journal is not None:
+            self.journal.pop(self.current_elapsed())
+        return move
+
+    def current_elapsed(self):
+        return time.time() - self.start_time if self.start_time else 0
+
+    def resume(self, state):
+        """
+        Odtwarza partię z dziennika (np. po awarii lub zamknięciu okna w trakcie gry).
+
+        Args:
+            state (journal.JournalState): Stan partii odczytany z dziennika.
+        """
+        for move in state.moves:
+            if not self.move_cache.is_legal(self.board, move):
+                break  # Uszkodzony dziennik - wznów od ostatniej poprawnej pozycji
+            self.board.push(move)
+        self.status = game_status(self.board)
+        if state.moves:
+            self.start_time = time.time() - state.elapsed
+        self.king_square = self.get_king_square_in_check()
+
+    def is_engine_turn(self):
+        return self.engine is not None and self.board.turn == self.engine_color
+
+    def engine_move(self):
+        """
+        Wykonuje ruch przeciwnika komputerowego, jeśli jest jego kolej.
+
+        Returns:
+            bool: True, jeśli silnik wykonał ruch.
+        """
+        if self.thinking or not self.is_engine_turn() or self.status.over:
+            return False
+
+        if self.search_service:
+            # Wynik przyjdzie jako zdarzenie ENGINE_RESULT
+            self.engine_search_id = self.search_service.start(self.board)
+            self.thinking = True
+            return False
+
+        self.engine_info = self.engine.search(self.board)
+        if self.engine_info.move is None:
+            return False
+        self.push_move(self.engine_info.move)
+        self.king_square = self.get_king_square_in_check()
+        return True
+
+    def on_engine_event(self, event):
+        """
+        Obsługuje zdarzenia usługi wyszukiwania (postęp i wynik).
+
+        Returns:
+            bool: True, jeśli silnik wykonał ruch.
+        """
+        if not self.thinking or event.search_id != self.engine_search_id:
+            return False  # Wynik anulowanego wyszukiwania
+
+        self.engine_info = event
+        if event.type != ENGINE_RESULT:
+            return False
+
+        self.thinking = False
+        if event.move is None:
+            return False
+        self.push_move(shogi.Move.from_usi(event.move))
+        self.king_square = self.get_king_square_in_check()
+        return True
+
+    def cancel_engine(self):
+        """
+        Anuluje wyszukiwanie trwające w tle.
+        """
+        if self.thinking:
+            self.search_service.cancel()
+            self.thinking = False
+
+    def captured_rows(self):
+        """
+        Ustawia teksty przycisków marginesu na podstawie zbitych figur.
+
+        Returns:
+            list: Lista par (przycisk marginesu, kolor tekstu) dla wierszy ze zbitymi figurami.
         """
         # Dane graczy
         players = [
@@ -431,18 +1024,22 @@ class GameWindow:
             {"color": shogi.WHITE, "buttons_offset": 0, "text_color": WHITE},
         ]
 
-        # Rysowanie dla każdego gracza
+        rows = []
         for player in players:
             pieces = self.convert_captured_to_symbols(self.get_captured(player["color"]))
-            if pieces:
-                for i, (symbol, count) in enumerate(pieces.items()):
-                    button_id = i + player["buttons_offset"]
-                    for button in self.margin_captured_buttons:
-                        if button.id == button_id:
-                            # button.set_color(GREY)
-                            button.set_text(f'{symbol} x {count}')
-                            button.draw(self.screen, text_color=player["text_color"])
+            for i, (symbol, count) in enumerate(pieces.items()):
+                button = self.margin_captured_buttons[i + player["buttons_offset"]]
+                button.set_text(f'{symbol} x {count}')
+                rows.append((button, player["text_color"]))
+        return rows
 
+    @profiled()
+    def draw_captured_pieces(self):
+        """
+        Rysuje zbite figury (czarnych lub białych) wraz z ich liczbą na marginesie.
+        """
+        for button, text_color in self.captured_rows():
+            button.draw(self.screen, text_color=text_color)
 
     def get_captured(self, color):
         """
@@ -489,8 +1086,8 @@ class GameWindow:
 
         # Wykonaj ruch dostawienia figury na planszę
         move = shogi.Move(from_square=None, to_square=self.selected_square.id, promotion=False, drop_piece_type=self.selected_piece)
-        if self.board.is_legal(move):
-            self.board.push(move)
+        if self.move_cache.is_legal(self.board, move):
+            self.push_move(move)
             return True
         else:
             self.set_message("illegal move - try something else")
@@ -507,26 +1104,44 @@ class GameWindow:
             else:
                 elapsed_time = 0  # Wyświetla 00:00 przed pierwszym ruchem
             self.elapsed_time = elapsed_time
-            minutes, seconds = divmod(int(elapsed_time), 60)
-            pygame.display.set_caption(f'SHOGI-GAME {minutes:02}:{seconds:02}')
-        else:
-            minutes, seconds = divmod(int(self.elapsed_time), 60)
-            pygame.display.set_caption(f'SHOGI-GAME {minutes:02}:{seconds:02}')
+        minutes, seconds = divmod(int(self.elapsed_time), 60)
+        caption = f'SHOGI-GAME {minutes:02}:{seconds:02}'
+        if self.thinking:
+            # Postęp wyszukiwania: głębokość, liczba węzłów i najlepszy wariant
+            caption += ' | CPU thinking'
+            if self.engine_info and getattr(self.engine_info, 'search_id', None) == self.engine_search_id:
+                pv = ' '.join(self.engine_info.pv)
+                caption += f': depth {self.engine_info.depth}, {self.engine_info.nodes} nodes, {pv}'
+        elif self.engine_info:
+            # Wydajność silnika: głębokość i liczba węzłów na sekundę
+            caption += f' | CPU depth {self.engine_info.depth}, {self.engine_info.nps} nps'
+        self.set_caption(caption)
+
+    def set_caption(self, caption):
+        """
+        Ustawia tytuł okna tylko wtedy, gdy się zmienił.
+        """
+        if caption != self._caption:
+            pygame.display.set_caption(caption)
+            self._caption = caption
 
     def if_game_over(self):
         self.game_over = True
-        if self.board.is_checkmate():
-            if self.board.turn == shogi.WHITE:
+        if self.status.result == CHECKMATE:
+            if self.status.winner == shogi.BLACK:
                 self.set_message('BLACK WON!', color=BLACK, timex=3000)
             else:
                 self.set_message('WHITE WON!', color=WHITE, timex=3000)
-        elif self.board.is_fourfold_repetition():
+        elif self.status.over:
+            # Powtórzenie pozycji (sennichite) albo brak legalnych ruchów bez szachu
             self.set_message('Stalemate!', color=BLACK, timex=3000)
-        if self.board.is_stalemate():
-            self.set_message("Stalemate!", color=BLACK, time=3000)
-        self.save_game()
-        self.rename_files()
-        self.get_message()
+        if self.archive is not None:
+            # Archiwum jest jedynym miejscem zapisu partii; plik JSON powstaje tylko przy eksporcie (`save_game`)
+            date_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
+            game_id = self.archive.append(date_time, self.elapsed_time, self.board.move_stack)
+            self.update_leaderboard(game_id)
+        if self.journal is not None:
+            self.journal.discard()  # Partia zapisana - dziennik nie jest już potrzebny
 
     def choose_piece_drop(self, button):
         symbol = button.text[:-4]
@@ -537,11 +1152,18 @@ class GameWindow:
 
 
     def bg_image(self, path="pictures/gamewindow_image.jpg"):
-        bg_image = pygame.image.load(path)
-        bg_image = pygame.transform.scale(bg_image, (SCREEN_WIDTH, SCREEN_HEIGHT))
+        bg_image = ASSETS.scaled(path, (SCREEN_WIDTH, SCREEN_HEIGHT))
         self.screen.blit(bg_image, (9*CELL_SIZE, 0))
 
+    @profiled()
     def update_window(self):
+        self.expire_message()
+        if self.incremental:
+            self.render_incremental()
+            self.draw_promotion_prompt()
+            self.calculate_time()
+            return
+
         self.screen.fill((149, 165, 166))
         self.bg_image()
         self.draw_margines()
@@ -551,35 +1173,150 @@ class GameWindow:
         self.update_board()
         self.calculate_time()
         self.get_message()
+        self.dirty_rects = [self.screen.get_rect()]
+        self.draw_promotion_prompt()
 
+    def square_state(self, square, highlights=None):
+        """
+        Ustawia kolor i tekst pola na podstawie planszy i zwraca stan potrzebny do jego narysowania.
 
-    def save_game(self, directory='Top10/'):
+        Args:
+            square (Button): Pole planszy.
+            highlights (dict or None): Wynik `highlights()` obliczony raz dla całej klatki.
+
+        Returns:
+            tuple: (kolor pola, symbol figury, kolor tekstu, obwódka).
+
+        Uwagi:
+            Korzysta z `piece_codes`, które trzeba wcześniej odświeżyć (`update_piece_codes`).
+        """
+        square.set_color(self.square_color(square, highlights))
+        code = self.piece_codes[square.id]
+        if code:
+            symbol, text_color, with_outline = PIECE_STYLES[self.board.turn][code]
+        else:
+            symbol, text_color, with_outline = None, BLACK, False
+        square.set_text(symbol)
+        return square.color, symbol, text_color, with_outline
+
+    def draw_square(self, square, state):
+        """
+        Rysuje pojedyncze pole planszy razem z liniami siatki, które na nie przypadają.
+        """
+        _, _, text_color, with_outline = state
+        square.draw(self.screen, font_size=CELL_SIZE // 2, text_color=text_color, with_outline=with_outline)
+        clip = self.screen.get_clip()
+        self.screen.set_clip(square)
+        self.draw_board_lines()
+        self.screen.set_clip(clip)
+
+    def draw_margin_rows(self, rows, area=None):
+        """
+        Rysuje tło marginesu i wiersze zbitych figur, opcjonalnie tylko w obszarze `area`.
+
+        Args:
+            rows (dict): Słownik {id wiersza: (tekst, kolor tekstu, kolor tła)}.
+            area (pygame.Rect or None): Obszar przycinania; None oznacza cały margines.
+        """
+        clip = self.screen.get_clip()
+        if area:
+            self.screen.set_clip(area)
+        self.bg_image()
+        self.draw_margines()
+        for row_id, (_, text_color, _) in rows.items():
+            self.margin_captured_buttons[row_id].draw(self.screen, text_color=text_color)
+        self.draw_board_lines()
+        self.screen.set_clip(clip)
+
+    def margin_row_rect(self, button):
+        """
+        Zwraca obszar ekranu zajmowany przez wiersz marginesu wraz z liniami podziału.
+        """
+        return pygame.Rect(MARGINES_X, button.top - 1, SCREEN_WIDTH - MARGINES_X, button.height + 3)
+
+    @profiled()
+    def render_incremental(self, show_message=True):
+        """
+        Rysuje tylko pola, wiersze marginesu i komunikaty zmienione od poprzedniej klatki.
+
+        Zmienione obszary są zapisywane w `dirty_rects`. Pierwsza klatka oraz każda zmiana
+        komunikatu wymuszają pełne przerysowanie okna.
+
+        Args:
+            show_message (bool): Czy wyświetlać komunikaty (`message`) na planszy.
+        """
+        self.dirty_rects = []
+
+        hud = (self.message, *self.message_style) if show_message and self.message else None
+        if hud != self._rendered_hud:
+            self._full_redraw = True
+
+        # Kolor wybranego przycisku zbitej figury
+        if self.selected_captured_button:
+            self.selected_captured_button.set_color(GREY if self.add_mode else None)
+
+        self.update_piece_codes()
+        highlights = self.highlights()
+        squares = {square.id: self.square_state(square, highlights) for square in self.squares}
+        rows = {
+            button.id: (button.text, text_color, button.color)
+            for button, text_color in self.captured_rows()
+        }
+
+        if self._full_redraw:
+            self.screen.fill((149, 165, 166))
+            self.draw_margin_rows(rows)
+            self.draw_margin_buttons()
+            for square in self.squares:
+                self.draw_square(square, squares[square.id])
+            if hud:
+                self.screen.blit(*self.render_message())
+            self.dirty_rects.append(self.screen.get_rect())
+        else:
+            for square in self.squares:
+                if squares[square.id] != self._rendered_squares.get(square.id):
+                    self.draw_square(square, squares[square.id])
+                    self.dirty_rects.append(pygame.Rect(square))
+
+            for button in self.margin_captured_buttons:
+                if rows.get(button.id) != self._rendered_rows.get(button.id):
+                    area = self.margin_row_rect(button)
+                    self.draw_margin_rows(rows, area)
+                    self.dirty_rects.append(area)
+
+        self._rendered_squares = squares
+        self._rendered_rows = rows
+        self._rendered_hud = hud
+        self._full_redraw = False
+
+
+    def save_game(self, directory=EXPORT_DIR, binary=False):
+        """
+        Eksportuje partię do pliku JSON lub, gdy `binary` jest ustawione, w zwartym formacie binarnym (.shg).
+
+        Zakończone partie są zapisywane w archiwum (`archive`); plik powstaje tylko przy eksporcie.
+
+        :return: Ścieżka do zapisanego pliku.
+        """
         directory = Path(directory)
         directory.mkdir(parents=True, exist_ok=True)
 
         date_time = datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        data = {
-            "date": date_time,
-            "time": int(self.elapsed_time),
-            "moves": [
-                {
-                    "from": move.from_square,
-                    "to": move.to_square,
-                    "promo": move.promotion,
-                    "dropped_type": move.drop_piece_type
-                } for move in self.board.move_stack
-            ]
-        }
+        if binary:
+            file_path = directory / f'game_{date_time.replace(":", "-")}{BINARY_SUFFIX}'
+            write_binary_record(file_path, date_time, self.elapsed_time, self.board.move_stack)
+            return file_path
 
+        # Zapis atomowy: przerwany zapis nie zostawi uciętego pliku JSON
         file_path = directory / f'game_{date_time.replace(":", "-")}.json'
-        with file_path.open("w") as file:
-            json.dump(data, file, indent=4)
+        write_json_record(file_path, date_time, self.elapsed_time, self.board.move_stack)
+        return file_path
 
     def load_game(self, path):
         """
-        Wczytuje partię z pliku JSON.
+        Wczytuje partię z pliku JSON lub z pliku w formacie binarnym (.shg).
 
-        :param path: Ścieżka do pliku z zapisem w formacie JSON.
+        :param path: Ścieżka do pliku z zapisem w formacie JSON lub binarnym.
         """
         try:
             # Użycie Path do obsługi ścieżek
@@ -588,6 +1325,11 @@ class GameWindow:
             if not file_path.exists():
                 raise FileNotFoundError(f"Plik '{path}' nie istnieje.")
 
+            if file_path.suffix == BINARY_SUFFIX:
+                date, game_time, moves = read_binary_record(file_path)
+                self.game = Game(date, game_time, moves)
+                return
+
             with file_path.open("r") as fp:
                 # Wczytaj dane z pliku JSON
                 data = json.load(fp)
@@ -603,14 +1345,7 @@ class GameWindow:
             date = data["date"]
 
             # Pobierz listę ruchów
-            moves = [
-                shogi.Move(
-                    from_square=move.get("from"),
-                    to_square=move.get("to"),
-                    promotion=move.get("promo"),
-                    drop_piece_type=move.get("dropped_type")
-                ) for move in data["moves"]
-            ]
+            moves = [move_from_dict(move) for move in data["moves"]]
 
             # Utwórz obiekt gry
             self.game = Game(date, game_time, moves)
@@ -621,78 +1356,43 @@ class GameWindow:
             raise LoadGameError(f"Błąd dekodowania JSON: {e}")
         except KeyError as e:
             raise LoadGameError(f"Brak klucza w danych JSON: {e}")
+        except RecordError as e:
+            raise LoadGameError(f"Błąd zapisu binarnego: {e}")
         except Exception as e:
             raise LoadGameError(f"Nieoczekiwany błąd: {e}")
 
 
-    def rename_files(self, dir='Top10', history_dir='History', top_limit=10):
+    def update_leaderboard(self, game_id, top_limit=TOP_LIMIT):
         """
-        Zmienia nazwy plików w katalogu 'Top10' i przenosi nadmiarowe do katalogu 'History'.
-        :param dir: Katalog z zapisanymi grami.
-        :param history_dir: Katalog na pliki przeniesione do historii.
-        :param top_limit: Maksymalna liczba najlepszych gier w katalogu.
-        """
-        dir_path = Path(dir)
-        history_path = Path(history_dir)
-
-        # Upewnij się, że katalogi istnieją
-        dir_path.mkdir(parents=True, exist_ok=True)
-        history_path.mkdir(parents=True, exist_ok=True)
-
-        # Przebuduj nazwy plików na numerowane
-        self._normalize_file_names(dir_path)
+        Dodaje partię z archiwum do rankingu najlepszych gier.
 
-        # Wczytaj gry i sortuj po czasie
-        games = self._load_and_sort_games(dir_path)
-
-        # Przypisz nowe nazwy do gier
-        self._assign_top_filenames(games, dir_path, history_path, top_limit)
-
-    def _normalize_file_names(self, dir_path):
-        """
-        Zmienia nazwy plików w katalogu na numerowane (0.json, 1.json, ...).
+        Partia, która wypadła z rankingu, pozostaje w archiwum; żaden plik nie jest przenoszony.
+        :param game_id: Identyfikator partii w archiwum (`archive`).
+        :param top_limit: Liczba gier w rankingu.
+        :return: Identyfikatory partii, które wypadły z rankingu.
         """
-        all_files = sorted([f for f in dir_path.iterdir() if f.suffix == ".json"])
-        for count, file in enumerate(all_files):
-            file.rename(dir_path / f"{count}.json")
+        evicted = Leaderboard(self.archive, top_limit).add(game_id, self.elapsed_time)
+        GameLibrary.notify_changed(self.archive.path)
+        return evicted
 
-    def _load_and_sort_games(self, dir_path):
+    def get_message(self):
+        if self.message:
+            # Rysowanie komunikatu na ekranie
+            self.screen.blit(*self.render_message())
+
+    def needs_frames(self):
         """
-        Wczytuje gry z plików JSON w katalogu i sortuje je po czasie gry (malejąco).
-        :return: Lista posortowanych gier.
+        Sprawdza, czy okno wymaga kolejnych klatek bez czekania na zdarzenia
+        (biegnący czas gry, silnik w trakcie wyszukiwania lub komunikat z czasem wyświetlania).
         """
-        games = []
-        for file in dir_path.iterdir():
-            if file.suffix == ".json":
-                self.load_game(file)  # Wczytaj grę
-                self.game.set_filename(file.name)  # Ustaw bieżącą nazwę pliku w obiekcie gry
-                games.append(self.game)
-        return sorted(games, key=lambda game: game.time, reverse=True)
+        clock_running = self.start_time is not None and not self.game_over
+        return clock_running or self.thinking or self.message_expires is not None
 
-    def _assign_top_filenames(self, games, dir_path, history_path, top_limit):
+    def finished(self):
         """
-        Przypisuje nowe nazwy plikom na podstawie rankingu i przenosi nadmiarowe pliki do historii.
+        Sprawdza, czy zakończoną grę można zamknąć (komunikat o wyniku zniknął lub został kliknięty).
         """
-        for n, game in enumerate(games, start=1):
-            old_filename = dir_path / game.get_filename()
-            if n <= top_limit:
-                # Nazwij pliki jako TOP 1, TOP 2, ...
-                new_filename = dir_path / f"TOP {n}.json"
-            else:
-                # Przenieś nadmiarowe pliki do katalogu History
-                history_index = len(list(history_path.glob("*.json"))) + 1
-                new_filename = history_path / f"game{history_index}.json"
-            game.set_filename(new_filename.name)
-            old_filename.rename(new_filename)
-
-    def get_message(self):
-        if self.message:
-            text_surface, text_rect = self.set_message(self.message)
-            # Rysowanie komunikatu na ekranie
-            self.screen.blit(text_surface, text_rect)
-        if self.board.is_game_over():
-            pygame.display.flip()
-            pygame.time.wait(3000)
+        return self.game_over and not self.message
 
 
 class Game:
@@ -720,7 +1420,7 @@ class Game:
         - Przeznaczona do użycia w systemach zapisów i analiz gier Shogi.
     """
     def __init__(self, date, time, moves=None) -> None:
-        self.moves = moves if moves else []
+        self.moves = moves if moves is not None else []
         self.date = date
         self.time = time
         self.filename = None
@@ -732,6 +1432,112 @@ class Game:
         return self.filename
 
 
+# Odtwarzanie zapisanych gier
+REPLAY_SNAPSHOT_EVERY = 16  # Co ile półruchów zapamiętywać stan planszy
+SLIDER_POS = MARGINES_X + 10, 51  # Pasek osi czasu pod przyciskami cofania i ponawiania
+SLIDER_SIZE = SCREEN_WIDTH - MARGINES_X - 20, 10
+
+
+class ReplayCursor:
+    """
+    Kursor odtwarzania zapisanej gry po niezmiennej liście ruchów.
+
+    Krok do przodu i do tyłu kosztuje jeden `push`/`pop`. Skok do dowolnego półruchu korzysta
+    z kopii planszy zapamiętywanych co `snapshot_every` półruchów, więc wymaga najwyżej
+    `snapshot_every` ruchów od najbliższej kopii.
+
+    Atrybuty:
+        moves (tuple or MoveStream): Ruchy gry (`shogi.Move`), które nie są modyfikowane.
+            Dla `MoveStream` ruchy są wczytywane z pliku dopiero, gdy kursor do nich dojdzie.
+        board (PositionBoard): Plansza w pozycji po `ply` półruchach.
+        ply (int): Liczba wykonanych półruchów.
+        snapshot_every (int): Odstęp między zapamiętanymi pozycjami.
+        snapshots (dict): Słownik {półruch: kopia planszy}.
+        prepared (int): Liczba półruchów, dla których `prepare` zapamiętał już pozycje.
+    """
+    def __init__(self, moves, snapshot_every=REPLAY_SNAPSHOT_EVERY) -> None:
+        self.moves = moves if isinstance(moves, MoveStream) else tuple(moves)
+        self.snapshot_every = snapshot_every
+        self.board = PositionBoard()
+        self.ply = 0
+        self.snapshots = {0: copy.deepcopy(self.board)}
+        self.prepared = 0
+        self._prepare_board = None  # Plansza przejścia `prepare` w pozycji po `prepared` półruchach
+
+    def __len__(self):
+        # Dla wczytywanej strumieniowo gry: liczba ruchów znanych bez czytania reszty pliku
+        if isinstance(self.moves, MoveStream):
+            return self.moves.available
+        return len(self.moves)
+
+    def forward(self):
+        """
+        Wykonuje następny ruch. Zwraca False, jeśli gra się skończyła.
+        """
+        try:
+            move = self.moves[self.ply]
+        except IndexError:
+            return False
+        self.board.push(move)
+        self.ply += 1
+        if self.ply % self.snapshot_every == 0 and self.ply not in self.snapshots:
+            self.snapshots[self.ply] = copy.deepcopy(self.board)
+        return True
+
+    def back(self):
+        """
+        Cofa ostatni ruch. Zwraca False na początku gry.
+        """
+        if self.ply == 0:
+            return False
+        self.board.pop()
+        self.ply -= 1
+        return True
+
+    def jump(self, ply):
+        """
+        Ustawia planszę w pozycji po `ply` półruchach.
+        """
+        ply = max(0, min(ply, len(self)))
+        if ply <= self.ply and self.ply - ply <= self.snapshot_every:
+            while self.ply > ply:
+                self.back()
+        elif not (self.ply < ply and ply - self.ply <= self.snapshot_every):
+            # Start od najbliższej zapamiętanej pozycji (lub bieżącej, jeśli jest bliżej)
+            base = max(snapshot for snapshot in self.snapshots if snapshot <= ply)
+            if not base <= self.ply <= ply:
+                self.board = copy.deepcopy(self.snapshots[base])
+                self.ply = base
+        while self.ply < ply:
+            self.forward()
+
+    def done_moves(self):
+        return list(self.moves[:self.ply])
+
+    def prepare(self, limit=None):
+        """
+        Zapamiętuje pozycje co `snapshot_every` półruchów dla znanych ruchów gry.
+
+        Przejście jest kontynuowane od miejsca, w którym skończyło poprzednie wywołanie, więc gra
+        wczytywana strumieniowo może być przygotowywana porcjami (po jednej na klatkę).
+
+        Args:
+            limit (int or None): Najwyższa liczba ruchów do wykonania; None - wszystkie znane ruchy.
+
+        Returns:
+            bool: True, jeśli zostały ruchy bez przygotowanych pozycji.
+        """
+        end = len(self) if limit is None else min(len(self), self.prepared + limit)
+        if self._prepare_board is None:
+            self._prepare_board = copy.deepcopy(self.snapshots[0])
+        while self.prepared < end:
+            self._prepare_board.push(self.moves[self.prepared])
+            self.prepared += 1
+            if self.prepared % self.snapshot_every == 0 and self.prepared not in self.snapshots:
+                self.snapshots[self.prepared] = copy.deepcopy(self._prepare_board)
+        return self.prepared < len(self)
+
+
 class AnaliseWindow(GameWindow):
     """
     Klasa reprezentująca okno analizy zapisanej gry w Shogi.
@@ -744,50 +1550,157 @@ class AnaliseWindow(GameWindow):
         backed_moves (list): Lista cofniętych ruchów.
         board (shogi.Board): Obiekt planszy Shogi z biblioteką shogi.
         game (Game or None): Obiekt reprezentujący zapisaną grę, w tym jej ruchy.
+        cursor (ReplayCursor): Kursor odtwarzania ruchów gry `game`.
+        timeline (Slider): Suwak osi czasu pozwalający przejść do dowolnego półruchu.
+        dragging (bool): Flaga wskazująca, że suwak jest przeciągany.
 
     Metody:
         make_move():
             Wykonuje kolejny ruch z listy zapisanych ruchów w analizowanej grze.
         back_move():
-            Cofa ostatni wykonany ruch, przywracając go do listy ruchów w grze.
+            Cofa ostatni wykonany ruch.
+        jump_to(ply):
+            Przechodzi do pozycji po podanej liczbie półruchów.
+        draw_timeline():
+            Rysuje suwak osi czasu, jeśli zmieniła się pozycja.
+        load_game(path):
+            Otwiera zapis gry strumieniowo; pierwsza pozycja jest dostępna od razu.
+        load_archived(archive, game_id):
+            Otwiera partię zapisaną w archiwum.
+        load_more():
+            Wczytuje kolejną porcję ruchów gry i zapamiętuje dla niej pozycje suwaka osi czasu.
+        needs_frames():
+            Sprawdza, czy gra jest jeszcze wczytywana lub przygotowywana (kolejne porcje w kolejnych klatkach).
 
     Uwagi:
         - Klasa wykorzystuje funkcjonalność biblioteki `shogi` do obsługi logiki gry.
-        - Ruchy są przechowywane w atrybucie `game.moves`, a ich stan jest dynamicznie modyfikowany
-          podczas wykonywania lub cofania ruchów.
+        - Ruchy w atrybucie `game.moves` nie są modyfikowane; pozycję wyznacza kursor odtwarzania.
         - W celu użycia tej klasy należy załadować zapis gry do atrybutu `game`.
     """
-    def __init__(self, screen) -> None:
-        super().__init__(screen)
-        self.done_moves = []
+    def __init__(self, screen, incremental=False) -> None:
+        super().__init__(screen, incremental)
         self.backed_moves = []
-        self.board = shogi.Board()
+        self.board = PositionBoard()
         self.game = None
+        self._cursor = None
+        self._cursor_game = None
+
+        self.timeline = Slider(*SLIDER_POS, *SLIDER_SIZE)
+        self.dragging = False
+        self._rendered_timeline = None
+
+    @property
+    def cursor(self):
+        # Kursor jest tworzony dla każdej nowo przypisanej gry
+        if self._cursor is None or self._cursor_game is not self.game:
+            self._cursor = ReplayCursor(self.game.moves if self.game else [])
+            if not isinstance(self._cursor.moves, MoveStream):
+                self._cursor.prepare()  # Gra w pamięci: pozycje dla suwaka liczone raz po wczytaniu
+            self._cursor_game = self.game
+            self.board = self._cursor.board
+        return self._cursor
+
+    @property
+    def done_moves(self):
+        return self.cursor.done_moves()
+
+    def load_game(self, path):
+        """
+        Otwiera zapis gry (JSON lub binarny) jako `MoveStream`; ruchy są wczytywane w miarę odtwarzania.
+
+        :param path: Ścieżka do pliku z zapisem gry.
+        """
+        try:
+            moves = open_record(path)
+        except FileNotFoundError as e:
+            raise LoadGameError(f"Nie znaleziono pliku: {e}")
+        except RecordError as e:
+            raise LoadGameError(f"Błąd zapisu gry: {e}")
+        except Exception as e:
+            raise LoadGameError(f"Nieoczekiwany błąd: {e}")
+        self.game = Game(moves.date, moves.time, moves)
+
+    def load_archived(self, archive, game_id):
+        """
+        Otwiera partię z archiwum (`archive.GameArchive`) po jej identyfikatorze.
+        """
+        try:
+            date, game_time, moves = archive.read(game_id)
+        except (ArchiveError, RecordError) as e:
+            raise LoadGameError(f"Błąd archiwum partii: {e}")
+        self.game = Game(date, game_time, moves)
+
+    def load_more(self):
+        """
+        Wczytuje kolejną porcję ruchów gry JSON i zapamiętuje dla niej pozycje suwaka (raz na klatkę),
+        aż suwak osi czasu obejmie całą grę.
+        """
+        if self._loading():
+            self.game.moves.load(STREAM_MOVES)
+        if self.game:
+            self.cursor.prepare(STREAM_MOVES)
+
+    def _loading(self):
+        moves = self.game.moves if self.game else None
+        return isinstance(moves, MoveStream) and moves.count is None and not moves.complete
+
+    def needs_frames(self):
+        return bool(self.game) and (self._loading() or self.cursor.prepared < len(self.cursor))
 
     def make_move(self):
         """
         Wykonuje kolejny ruch z listy.
         """
-        if self.game.moves:
-            move = self.game.moves.pop(0)  # Pobiera pierwszy ruch
-            self.board.push(move)  # Wykonuje ruch na planszy
-            self.done_moves.append(move)  # Dodaje ruch do listy
-        else:
-            pass
+        self.cursor.forward()
 
     def back_move(self):
         """
         Cofnięcie ostatniego ruchu.
         """
-        if self.done_moves:
-            move = self.done_moves.pop()  # Pobiera ostatni ruch
-            self.board.pop()  # Cofnięcie ruchu na planszy
-            self.game.moves.insert(0, move)  # Dodaje cofnięty ruch na początek
-        else:
-            pass
+        self.cursor.back()
+
+    def jump_to(self, ply):
+        """
+        Przechodzi do pozycji po `ply` półruchach.
+        """
+        if ply != self.cursor.ply:
+            self.cursor.jump(ply)
+            self.board = self.cursor.board  # Skok mógł odtworzyć planszę z kopii
 
+    def draw_timeline(self):
+        """
+        Rysuje suwak osi czasu i aktualny półruch w tytule okna, jeśli się zmieniły.
+        """
+        state = self.cursor.ply, len(self.cursor)
+        full_redraw = self.screen.get_rect() in self.dirty_rects
+        if state == self._rendered_timeline and not full_redraw:
+            return
+
+        area = self.timeline.inflate(0, 4)
+        clip = self.screen.get_clip()
+        self.screen.set_clip(area)
+        self.bg_image()
+        self.draw_margines()
+        self.draw_margin_buttons()
+        self.timeline.draw(self.screen, *state)
+        self.screen.set_clip(clip)
+        if not full_redraw:
+            self.dirty_rects.append(area)
 
+        if self.game:
+            minutes, seconds = divmod(int(self.game.time), 60)
+            self.set_caption(f'Game {minutes:02}:{seconds:02} | move {state[0]}/{state[1]}')
+        self._rendered_timeline = state
+
+
+    @profiled('analise_update')
     def update(self):
+        self.load_more()
+        if self.incremental:
+            self.render_incremental(show_message=False)
+            self.draw_timeline()
+            return
+
         self.screen.fill((149, 165, 166))
         self.bg_image()
         self.draw_margines()
@@ -795,6 +1708,37 @@ class AnaliseWindow(GameWindow):
         self.draw_margin_buttons()
         self.draw_pieces()
         self.update_board()
+        self.dirty_rects = [self.screen.get_rect()]
+        self.draw_timeline()
+
+
+class Slider(pygame.Rect):
+    """
+    Klasa reprezentująca poziomy suwak (np. oś czasu analizowanej gry).
+
+    Metody:
+        value_at(x, maximum):
+            Zwraca wartość z zakresu 0..maximum odpowiadającą położeniu x.
+        draw(surface, value, maximum):
+            Rysuje pasek i uchwyt suwaka w położeniu odpowiadającym wartości.
+        clicked(pos):
+            Sprawdza, czy podana pozycja kliknięcia znajduje się na suwaku.
+    """
+    KNOB_WIDTH = 6
+
+    def value_at(self, x, maximum):
+        fraction = (x - self.left) / max(1, self.width)
+        return round(min(1.0, max(0.0, fraction)) * maximum)
+
+    def draw(self, surface, value, maximum):
+        pygame.draw.line(surface, BLACK, (self.left, self.centery), (self.right, self.centery), 2)
+        fraction = value / maximum if maximum else 0
+        x = self.left + round(fraction * (self.width - self.KNOB_WIDTH))
+        pygame.draw.rect(surface, PURPLE, (x, self.top, self.KNOB_WIDTH, self.height))
+
+    def clicked(self, pos):
+        # Nieco większy obszar ułatwia złapanie cienkiego suwaka
+        return self.inflate(0, 6).collidepoint(pos)
 
 
 class Button(pygame.Rect):
@@ -866,40 +1810,15 @@ class Button(pygame.Rect):
         else:
             pygame.draw.rect(surface, BLACK, self, width=2)
 
-        # Rysowanie tekstu
+        # Rysowanie tekstu (z obwódką lub bez) z pamięci podręcznej
         if self.text:
-            font = pygame.font.SysFont(font_type, font_size, bold=True)
-
-            if with_outline:
-                outline_color = BLUE # Kolor obwódki (czarny)
-                outline_width = 1
-
-                # Renderowanie tekstu z obwódką
-                outline_surface = font.render(self.text, True, outline_color)
-                text_surface = font.render(self.text, True, text_color)
-
-                # Pozycjonowanie tekstu
-                text_rect = text_surface.get_rect(center=self.center)
-                outline_rect = outline_surface.get_rect(center=self.center)
-
-                # Rysowanie obwódki wokół tekstu
-                for dx in range(-outline_width, outline_width + 1):
-                    for dy in range(-outline_width, outline_width + 1):
-                        if dx != 0 or dy != 0:  # Nie rysuj środka wielokrotnie
-                            surface.blit(outline_surface, outline_rect.move(dx, dy))
-
-                # Rysowanie głównego tekstu
-                surface.blit(text_surface, text_rect)
-            else:
-                # Renderowanie tekstu bez obwódki
-                text_surface = font.render(self.text, True, text_color)
-                text_rect = text_surface.get_rect(center=self.center)
-                surface.blit(text_surface, text_rect)
+            text_surface = GLYPH_CACHE.render(self.text, font_type, font_size, text_color, with_outline)
+            text_rect = text_surface.get_rect(center=self.center)
+            surface.blit(text_surface, text_rect)
 
     def draw_date(self, surface, date, text_color=BLACK, font_size=24):
         text_pos = self.bottomright
-        font = pygame.font.SysFont("Arial", font_size, bold=True)
-        text_surface = font.render(date, True, text_color)
+        text_surface = GLYPH_CACHE.render(date, font_size=font_size, color=text_color)
         text_rect = text_surface.get_rect(center=text_pos)
         surface.blit(text_surface, text_rect)
 
@@ -928,6 +1847,85 @@ class Button(pygame.Rect):
         return f"{self.id} {self.text}"
 
 
+class GameLibrary:
+    """
+    Indeks partii wyświetlanych w menu: ranking partii z archiwum (`archive.GameArchive`).
+
+    Lista partii jest budowana raz i odświeżana tylko wtedy, gdy archiwum urosło, zmienił się
+    plik rankingu albo aplikacja zgłosi zmianę (`notify_changed`). Metadane partii
+    (data, czas trwania, liczba ruchów) pochodzą z indeksu archiwum i są zapamiętywane;
+    menu opisuje nimi przyciski, a kolejność `game_ids` to malejący czas gry z tych metadanych.
+
+    Atrybuty:
+        archive (GameArchive): Archiwum partii.
+        size (int): Liczba partii w rankingu.
+        game_ids (list): Identyfikatory partii w kolejności rankingu.
+
+    Metody:
+        refresh(force=False):
+            Odświeża listę partii, jeśli archiwum lub ranking się zmieniły. Zwraca True przy zmianie.
+        invalidate():
+            Wymusza odświeżenie przy następnym wywołaniu `refresh`.
+        metadata(game_id):
+            Zwraca słownik z datą, czasem trwania i liczbą ruchów partii.
+        notify_changed(path):
+            Oznacza indeksy archiwum o danej ścieżce jako nieaktualne (np. po zapisie partii).
+    """
+    _instances = weakref.WeakSet()
+
+    def __init__(self, archive, size=TOP_LIMIT) -> None:
+        self.archive = archive
+        self.size = size
+        self.game_ids = []
+        self._version = None
+        self._stale = True
+        self._metadata = {}
+        GameLibrary._instances.add(self)
+
+    @classmethod
+    def notify_changed(cls, path):
+        path = Path(path)
+        for library in cls._instances:
+            if library.archive.path == path:
+                library.invalidate()
+
+    def invalidate(self):
+        self._stale = True
+
+    def refresh(self, force=False):
+        """
+        Odświeża listę partii tylko wtedy, gdy archiwum lub ranking się zmieniły.
+
+        Returns:
+            bool: True, jeśli lista partii mogła się zmienić.
+        """
+        try:
+            mtime = leaderboard_path(self.archive).stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        version = (len(self.archive), mtime)
+
+        if not (force or self._stale or version != self._version):
+            return False
+
+        self._version = version
+        self._stale = False
+        self.game_ids = Leaderboard(self.archive, self.size).ranking()
+        return True
+
+    def metadata(self, game_id):
+        """
+        Zwraca metadane partii z indeksu archiwum, zapamiętane przy pierwszym użyciu.
+
+        Returns:
+            dict: Słownik z kluczami "date", "time" i "moves" (liczba ruchów).
+        """
+        info = self._metadata.get(game_id)
+        if info is None:
+            info = self._metadata[game_id] = self.archive.metadata(game_id)
+        return info
+
+
 class MainWindow:
     """
     Klasa reprezentująca główne okno aplikacji (menu startowe).
@@ -939,13 +1937,20 @@ class MainWindow:
         screen (pygame.Surface): Powierzchnia renderowania Pygame.
         screen_size (tuple): Rozmiar ekranu w pikselach.
         start_button (Button): Przycisk startu gry.
+        cpu_button (Button): Przycisk startu gry z przeciwnikiem komputerowym.
         top10_button (Button): Przycisk wyświetlający listę zapisanych gier.
         top10_clicked (bool): Flaga wskazująca, czy lista zapisanych gier została kliknięta.
-        game_buttons (list): Lista przycisków reprezentujących zapisane gry.
+        game_buttons (list): Lista przycisków reprezentujących zapisane gry (w kolejności rankingu).
+        game_ids (list): Identyfikatory partii w archiwum odpowiadające kolejnym przyciskom z `game_buttons`.
+        library (GameLibrary or None): Indeks partii z archiwum (None - menu bez archiwum, bez listy gier).
+        incremental (bool): Tryb renderowania przyrostowego dla otwieranych okien analizy.
+        target_fps (int): Liczba klatek na sekundę, gdy okno wymaga ciągłego odświeżania.
 
     Metody:
         create_start():
             Tworzy przycisk startu gry z wycentrowaną pozycją.
+        create_cpu():
+            Tworzy przycisk gry z komputerem pod przyciskiem startu.
         create_top10():
             Tworzy przycisk "Top 10" w lewym górnym rogu.
         bg_image(path="pictures/background.jpg"):
@@ -955,29 +1960,38 @@ class MainWindow:
         change_top10_status():
             Przełącza stan listy "Top 10" między widoczną a ukrytą.
         update_game_buttons():
-            Aktualizuje listę przycisków zapisanych gier.
-        create_game_buttons(path='Top10'):
-            Tworzy przyciski dla zapisanych gier znajdujących się w katalogu `Top10`.
+            Aktualizuje listę przycisków zapisanych gier, jeśli archiwum lub ranking się zmieniły.
+        create_game_buttons():
+            Tworzy przyciski dla partii z rankingu archiwum.
+        game_label(rank, game_id):
+            Zwraca napis przycisku partii: miejsce w rankingu, czas gry i liczbę ruchów (`GameLibrary.metadata`).
         calculate_game_button_size():
             Oblicza wymiary przycisków dla zapisanych gier.
         open_saved_games(pos):
             Otwiera zapisane gry po kliknięciu na odpowiedni przycisk.
         draw_myself():
             Rysuje elementy okna głównego, takie jak tło, przyciski oraz lista "Top 10", jeśli jest widoczna.
+        needs_frames():
+            Menu jest statyczne - odświeżane tylko po zdarzeniach.
 
     Uwagi:
         - Klasa wymaga zainicjalizowanego środowiska Pygame.
-        - Zapisane gry muszą znajdować się w katalogu `Top10` w formacie JSON.
-        - Przyciski są rysowane dynamicznie w zależności od dostępnych plików zapisanych gier.
+        - Zapisane gry są odczytywane z archiwum partii (`archive.GameArchive`), a nie z plików w katalogu.
+        - Przyciski są rysowane dynamicznie w zależności od partii w rankingu.
     """
 
-    def __init__(self, screen) -> None:
+    def __init__(self, screen, incremental=False, archive=None) -> None:
         self.screen = screen
+        self.incremental = incremental
+        self.target_fps = ACTIVE_FPS
         self.screen_size = self.screen.get_size()
         self.start_button = self.create_start()
+        self.cpu_button = self.create_cpu()
         self.top10_button = self.create_top10()
 
         self.top10_clicked = False
+        self.library = GameLibrary(archive) if archive is not None else None
+        self.game_ids = []
         self.game_buttons = self.create_game_buttons()
 
     def create_start(self):
@@ -986,14 +2000,17 @@ class MainWindow:
         y = (screen_height - 50) // 2
         return Button(x, y, 200, 50, 'START', GRAY)
 
+    def create_cpu(self):
+        x, y = self.start_button.x, self.start_button.bottom + 20
+        return Button(x, y, 200, 50, 'VS CPU', GRAY)
+
     def create_top10(self):
         x = self.screen_size[0]//30
         y = self.screen_size[1]//30
         return Button(x, y, 200, 50, 'Top 10', GRAY)
 
     def bg_image(self, path="pictures/background.jpg"):
-        bg_image = pygame.image.load(path)
-        bg_image = pygame.transform.scale(bg_image, self.screen_size)
+        bg_image = ASSETS.scaled(path, self.screen_size)
         self.screen.blit(bg_image, (0, 0))
 
     def start_game(self):
@@ -1006,49 +2023,75 @@ class MainWindow:
         self.top10_clicked = not self.top10_clicked
 
     def update_game_buttons(self):
-        self.game_buttons = self.create_game_buttons()
+        # Przyciski są przebudowywane tylko po zmianie archiwum lub rankingu
+        if self.library is not None and self.library.refresh():
+            self.game_buttons = self.create_game_buttons()
 
-    def create_game_buttons(self, path='Top10'):
+    def create_game_buttons(self):
         game_buttons = []
-        all_files = [f for f in os.listdir(path) if f.endswith(".json")]
+        self.game_ids = []
+        if self.library is None:
+            return game_buttons
+        self.library.refresh()
         width, height = self.calculate_game_button_size()
         y = 3*self.top10_button.y
-        for filename in all_files:
+        for rank, game_id in enumerate(self.library.game_ids, start=1):
             y += 2*self.top10_button.y
-            button_name = f'{filename.removesuffix(".json")}'
             x = self.top10_button.centerx - 3*self.top10_button.x
-            button = Button(x, y, width, height, button_name, GRAY)
+            button = Button(x, y, width, height, self.game_label(rank, game_id), GRAY)
             game_buttons.append(button)
+            self.game_ids.append(game_id)
         return game_buttons
 
+    def game_label(self, rank, game_id):
+        # Czas gry i liczba ruchów z indeksu archiwum (bez odczytu partii)
+        info = self.library.metadata(game_id)
+        minutes, seconds = divmod(int(info["time"]), 60)
+        moves = f'{info["moves"]} move' + ('' if info["moves"] == 1 else 's')
+        return f'TOP {rank}  {minutes:02}:{seconds:02}  {moves}'
+
     def calculate_game_button_size(self):
         width, hight = 200, 50
-        width = (width + 20)//2
         hight = hight//2
         return width, hight
 
     def open_saved_games(self, pos):
         analise = None
-        for button in self.game_buttons:
+        for button, game_id in zip(self.game_buttons, self.game_ids):
             if button.clicked(pos):
-                path = f'Top10/{button.text}.json'
-                analise = AnaliseWindow(self.screen)
-                analise.load_game(path)
+                analise = AnaliseWindow(self.screen, self.incremental)
+                analise.load_archived(self.library.archive, game_id)
         return analise
 
 
 
+    @profiled()
     def draw_myself(self):
         self.bg_image()
         self.top10_button.draw(self.screen, text_color=WHITE)
         self.start_button.draw(self.screen)
+        self.cpu_button.draw(self.screen)
         if self.top10_clicked:
             self.update_game_buttons()
             for button in self.game_buttons:
                 button.draw(self.screen, font_size=14)
 
+    def needs_frames(self):
+        return False
+
 
 def analise_loop(window, event):
+    # Przeciąganie suwaka osi czasu
+    if event.type == pygame.MOUSEBUTTONDOWN and window.timeline.clicked(event.pos):
+        window.dragging = True
+    if event.type == pygame.MOUSEBUTTONUP:
+        window.dragging = False
+    if window.dragging:
+        window.jump_to(window.timeline.value_at(event.pos[0], len(window.cursor)))
+        return
+    if event.type != pygame.MOUSEBUTTONDOWN:
+        return
+
     if window.margin_buttons[0].clicked(event.pos):
         window.back_move()
     elif window.margin_buttons[1].clicked(event.pos):
@@ -1062,11 +2105,31 @@ def game_loop(
         event
             ) -> tuple:
 
-    window.message = None
+    if window.promotion_prompt:
+        # Otwarta nakładka promocji - pozostałe kliknięcia są ignorowane
+        promote = window.promotion_choice(event)
+        if promote is None:
+            return 'game', window
+        window.resolve_promotion(promote)
+        if window.engine_move() and not window.start_time:
+            window.start_time = time.time()
+        return finish_turn(window)
+
+    if event.type != pygame.MOUSEBUTTONDOWN:
+        return 'game', window
+
+    window.set_message(None)
 
     if window.back_button.clicked(event.pos):
+        window.cancel_engine()
+        if window.journal is not None:
+            window.journal.discard()  # Partia porzucona
         return 'main', False
 
+    if window.thinking:
+        # Komputer szuka ruchu - plansza czeka na jego odpowiedź
+        return 'game', window
+
     if not window.game_over:
         if not window.add_mode:
             square = window.clicked_square(event.pos)
@@ -1089,23 +2152,12 @@ def game_loop(
                     # Sprawdź, czy wymagana jest promocja
                     window.promotion = False
                     if window.is_in_promotion_zone(square, window.selected_piece.color) and not window.selected_piece.is_promoted() and window.selected_piece.piece_type not in [shogi.KING, shogi.GOLD]:
-                        window.promotion = window.ask_for_promotion_gui()
+                        # Ruch zostanie wykonany po wyborze w nakładce
+                        window.open_promotion_prompt(window.selected_square, square)
+                        return 'game', window
 
                     # Wykonaj ruch
-                    window.make_move(window.selected_square, square)
-
-                    if not window.start_time:
-                        window.start_time = time.time()
-
-                    # Sprawdź czy król jest atakowany
-                    window.king_square = window.get_king_square_in_check()
-
-                    window.undone_moves.clear()
-
-                    # Wyłącz podświetlenie po ruchu
-                    window.selected_piece = None
-                    window.selected_square = None
-                    window.legal_moves = False
+                    window.complete_move(window.selected_square, square)
                 else:
                     # Reset, jeśli kliknięto pole spoza legalnych ruchów
                     window.selected_piece = None
@@ -1143,9 +2195,34 @@ def game_loop(
         if window.margin_buttons[1].clicked(event.pos):
             window.redo_last_move()
 
-    if window.board.is_game_over() and not window.game_over:
+        # Odpowiedź przeciwnika komputerowego
+        if window.engine_move() and not window.start_time:
+            window.start_time = time.time()
+
+    return finish_turn(window)
+
+
+def finish_turn(window):
+    """
+    Kończy grę po ostatnim ruchu (zapis) albo pozostaje w oknie gry.
+
+    Okno zakończonej gry pozostaje otwarte, dopóki wyświetlany jest komunikat o wyniku;
+    powrót do menu następuje po jego zniknięciu (`GameWindow.finished`).
+    """
+    if window.status.over and not window.game_over:
         window.if_game_over()
+    if window.finished():
         return 'main', False
-    else:
-        return 'game', window
+    return 'game', window
 
+
+def engine_loop(
+        window: GameWindow,
+        event
+            ) -> tuple:
+    """
+    Obsługuje zdarzenia usługi wyszukiwania w oknie gry z komputerem.
+    """
+    if window.on_engine_event(event) and not window.start_time:
+        window.start_time = time.time()
+    return finish_turn(window)
@@ -0,0 +1,359 @@
+"""
+Eksport diagramów planszy (PNG lub SVG) dla każdej pozycji zapisanej gry.
+
+Diagram zawiera planszę w stylu `GameWindow` (kolory pól, symbole figur) oraz figury w ręku
+obu graczy: białego nad planszą, czarnego pod nią. Stronę wykonującą ruch oznacza znacznik
+w jej pasie figur w ręku (w kolorze obwódki figur z okna gry), a nie obwódka figur, więc
+wygląd pola zależy tylko od kodu figury (`piece_codes`).
+Obrazy PNG są rysowane na powierzchni poza ekranem: napisy figur pochodzą z `GLYPH_CACHE`,
+a kolejne pozycje przerysowują tylko pola, których kod figury się zmienił, oraz pasy figur
+w ręku. Pozycje są dzielone na porcje eksportowane równolegle w puli procesów.
+
+Przykład:
+    python diagrams.py "Top10/TOP 1.json" -o diagrams --format svg --plies 0 50 100
+"""
+import argparse
+import os
+import struct
+import sys
+import zlib
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+import pygame
+import shogi
+from chess import (Button, piece_style, piece_codes, PIECE_STYLES, WHITE_CODE, BOARD_SIZE, LIGHT_COLOR,
+                   DARK_COLOR, LINE_COLOR, GRAY, BLACK, WHITE, OUTLINE_COLOR, OUTLINE_WIDTH)
+from offscreen import offscreen_surface
+from records import read_record, RecordError
+
+
+DIAGRAM_CELL = 48  # Rozmiar pola diagramu w pikselach
+DIAGRAM_FORMATS = ('png', 'svg')
+PNG_COMPRESSION = 1  # Poziom kompresji zlib; diagramy mają jednolite kolory, więc wyższy poziom niewiele daje
+CHUNK_PLIES = 50  # Liczba pozycji w jednym zadaniu puli procesów
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+ZLIB_HEADER = b"\x78\x01"  # Nagłówek strumienia zlib (deflate, okno 32 KiB, szybka kompresja)
+DEFLATE_END = b"\x03\x00"  # Pusty ostatni blok deflate zamykający połączone fragmenty
+TURN_COLOR = OUTLINE_COLOR  # Znacznik strony wykonującej ruch (kolor obwódki jej figur w oknie gry)
+
+# Styl figury na diagramie według kodu figury (`piece_codes`): symbol i kolor, bez obwódki
+DIAGRAM_STYLES = {code: piece_style(shogi.Piece(code % WHITE_CODE, code // WHITE_CODE), None)
+                  for code in PIECE_STYLES[shogi.BLACK]}
+
+
+class DiagramError(Exception):
+    def __init__(self, error) -> None:
+        super().__init__(f"Cannot export diagrams: {error}")
+
+
+def hand_text(board, color):
+    """
+    Zwraca opis figur w ręku gracza w stylu marginesu `GameWindow` (np. "p x 2  l x 1").
+    """
+    return '  '.join(f'{shogi.PIECE_SYMBOLS[piece]} x {count}'
+                     for piece, count in board.pieces_in_hand[color].items())
+
+
+def hex_color(color):
+    return '#{:02x}{:02x}{:02x}'.format(*color)
+
+
+def png_rows(surface):
+    """
+    Zwraca piksele powierzchni jako wiersze obrazu PNG (RGBA, każdy wiersz poprzedzony bajtem filtra 0).
+    """
+    width, height = surface.get_size()
+    # RGBA odpowiada układowi pikseli 32-bitowej powierzchni, więc konwersja jest niemal kopią pamięci
+    raw = memoryview(pygame.image.tobytes(surface, 'RGBA'))
+    stride = width * 4
+    # Wiersze są wycinane bez kopiowania
+    return b'\x00' + b'\x00'.join([raw[y * stride:(y + 1) * stride] for y in range(height)])
+
+
+def png_image(size, idat):
+    """
+    Składa plik PNG (RGBA) o rozmiarze `size` z gotowego strumienia zlib danych obrazu.
+    """
+    def chunk(kind, data):
+        return struct.pack('>I', len(data)) + kind + data + struct.pack('>I', zlib.crc32(kind + data))
+
+    width, height = size
+    return (PNG_SIGNATURE + chunk(b'IHDR', struct.pack('>IIBBBBB', width, height, 8, 6, 0, 0, 0))
+            + chunk(b'IDAT', idat) + chunk(b'IEND', b''))
+
+
+def encode_png(surface, level=PNG_COMPRESSION):
+    """
+    Koduje powierzchnię jako PNG (RGBA, bez filtrów) z szybką kompresją zlib.
+    """
+    return png_image(surface.get_size(), zlib.compress(png_rows(surface), level))
+
+
+def deflate_segment(data, level=PNG_COMPRESSION):
+    """
+    Kompresuje dane jako samodzielny fragment strumienia deflate (bez odwołań do wcześniejszych danych),
+    zakończony na granicy bajtu; fragmenty można łączyć w dowolnej kolejności (`ZLIB_HEADER`, `DEFLATE_END`).
+    """
+    compressor = zlib.compressobj(level, zlib.DEFLATED, -zlib.MAX_WBITS)
+    return compressor.compress(data) + compressor.flush(zlib.Z_FULL_FLUSH)
+
+
+class BoardDiagram:
+    """
+    Diagram pozycji: plansza 9x9 i figury w ręku obu graczy.
+
+    Atrybuty:
+        cell_size (int): Rozmiar pola w pikselach.
+        size (tuple): Rozmiar diagramu (szerokość, wysokość).
+        surface (pygame.Surface or None): Powierzchnia diagramu PNG (tworzona przy pierwszym `draw`).
+
+    Uwagi:
+        Diagram PNG jest kodowany pasami wysokości jednego pola (pas figur w ręku, 9 rzędów planszy,
+        pas figur w ręku); skompresowany pas jest zapamiętywany do czasu przerysowania, więc kolejna
+        pozycja kompresuje tylko pasy ze zmienionymi polami i pasy figur w ręku.
+
+    Metody:
+        draw(board):
+            Rysuje pozycję na powierzchni diagramu i ją zwraca.
+        png(board):
+            Zwraca diagram pozycji jako dane PNG.
+        svg(board):
+            Zwraca diagram pozycji jako tekst SVG.
+    """
+    def __init__(self, cell_size=DIAGRAM_CELL) -> None:
+        self.cell_size = cell_size
+        self.size = (BOARD_SIZE * cell_size, (BOARD_SIZE + 2) * cell_size)
+        self.surface = None
+        self.squares = [
+            Button(col * cell_size, (row + 1) * cell_size, cell_size, cell_size,
+                   color=LIGHT_COLOR if (row + col) % 2 == 0 else DARK_COLOR, id=row * BOARD_SIZE + col)
+            for row in range(BOARD_SIZE) for col in range(BOARD_SIZE)
+        ]
+        self.hands = {
+            shogi.WHITE: Button(0, 0, self.size[0], cell_size, color=GRAY),
+            shogi.BLACK: Button(0, (BOARD_SIZE + 1) * cell_size, self.size[0], cell_size, color=GRAY),
+        }
+        self._drawn = {}
+        self._bands = [None] * (BOARD_SIZE + 2)  # Pasy PNG: (wiersze obrazu, fragment deflate); None - do zakodowania
+
+    def state(self, board):
+        """
+        Zwraca stan diagramu: kody figur pól (`piece_codes`) i, dla obu graczy, opis figur w ręku
+        wraz z informacją, czy gracz wykonuje ruch.
+        """
+        hands = {color: (hand_text(board, color), color == board.turn) for color in self.hands}
+        return piece_codes(board), hands
+
+    def turn_marker(self, button):
+        # Środek i promień znacznika przy lewej krawędzi pasa figur w ręku
+        return (button.x + self.cell_size // 2, button.centery), self.cell_size // 6
+
+    def draw(self, board):
+        if self.surface is None:
+            # Kanał alfa (nieprzezroczysty) pozwala kodować PNG bez przestawiania bajtów pikseli
+            self.surface = offscreen_surface(self.size, pygame.SRCALPHA)
+        codes, hands = self.state(board)
+        font_size = self.cell_size // 2
+
+        redrawn = False
+        for square in self.squares:
+            code = codes[square.id]
+            if self._drawn.get(square.id) == code:
+                continue  # Kod figury na polu nie zmienił się od poprzedniej pozycji
+            symbol, text_color, _ = DIAGRAM_STYLES[code] if code else (None, BLACK, False)
+            square.set_text(symbol)
+            square.draw(self.surface, text_color=text_color, font_size=font_size)
+            self._drawn[square.id] = code
+            self._bands[square.y // self.cell_size] = None
+            redrawn = True
+
+        for color, button in self.hands.items():
+            text, to_move = hands[color]
+            if self._drawn.get(('hand', color)) == hands[color]:
+                continue
+            button.set_text(text or None)
+            button.draw(self.surface, text_color=BLACK if color == shogi.BLACK else WHITE, font_size=font_size)
+            if to_move:
+                pygame.draw.circle(self.surface, TURN_COLOR, *self.turn_marker(button))
+            self._drawn[('hand', color)] = hands[color]
+            self._bands[button.y // self.cell_size] = None
+            redrawn = True
+
+        if redrawn:
+            # Siatka po przerysowanych polach; na pozostałych pasach jej piksele się nie zmieniają
+            self.draw_lines()
+        return self.surface
+
+    def draw_lines(self):
+        # Linie siatki jak w `GameWindow.draw_board_lines`
+        top, size = self.cell_size, BOARD_SIZE * self.cell_size
+        for i in range(BOARD_SIZE + 1):
+            offset = i * self.cell_size
+            pygame.draw.line(self.surface, LINE_COLOR, (0, top + offset), (size, top + offset), 1)
+            pygame.draw.line(self.surface, LINE_COLOR, (offset, top), (offset, top + size), 1)
+
+    def png(self, board):
+        """
+        Zwraca diagram pozycji jako dane PNG, kompresując tylko pasy przerysowane od poprzedniej pozycji.
+        """
+        self.draw(board)
+        width = self.size[0]
+        for band, encoded in enumerate(self._bands):
+            if encoded is None:
+                rows = png_rows(self.surface.subsurface((0, band * self.cell_size, width, self.cell_size)))
+                self._bands[band] = (rows, deflate_segment(rows))
+        checksum = 1  # Suma kontrolna Adler-32 wszystkich wierszy obrazu
+        for rows, _ in self._bands:
+            checksum = zlib.adler32(rows, checksum)
+        idat = ZLIB_HEADER + b''.join(segment for _, segment in self._bands) + DEFLATE_END + struct.pack('>I', checksum)
+        return png_image(self.size, idat)
+
+    def svg(self, board):
+        codes, hands = self.state(board)
+        font_size = self.cell_size // 2
+        used = sorted({DIAGRAM_STYLES[code] for code in codes if code})
+        parts = [_svg_background(self.cell_size), '<defs>']
+        parts += [_svg_piece(style, font_size) for style in used]
+        parts.append('</defs>')
+        for square in self.squares:
+            code = codes[square.id]
+            if code:
+                parts.append(f'<use href="#{_svg_id(DIAGRAM_STYLES[code])}" x="{square.centerx}" y="{square.centery}"/>')
+        for color, button in self.hands.items():
+            text, to_move = hands[color]
+            if text:
+                fill = hex_color(BLACK if color == shogi.BLACK else WHITE)
+                parts.append(f'<text x="{button.centerx}" y="{button.centery}" fill="{fill}" '
+                             f'font-size="{font_size}" {_SVG_TEXT}>{text}</text>')
+            if to_move:
+                (x, y), radius = self.turn_marker(button)
+                parts.append(f'<circle cx="{x}" cy="{y}" r="{radius}" fill="{hex_color(TURN_COLOR)}"/>')
+        width, height = self.size
+        return (f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+                f'viewBox="0 0 {width} {height}">' + ''.join(parts) + '</svg>\n')
+
+
+_SVG_TEXT = 'font-family="Arial" font-weight="bold" text-anchor="middle" dominant-baseline="central"'
+
+
+def _svg_id(style):
+    symbol, color, outline = style
+    name = symbol.replace('+', 'x')
+    return f"p{name}{'b' if color == BLACK else 'w'}{'o' if outline else ''}"
+
+
+@lru_cache(maxsize=None)
+def _svg_piece(style, font_size):
+    # Definicja figury współdzielona przez wszystkie jej wystąpienia na diagramie
+    symbol, color, outline = style
+    stroke = (f' stroke="{hex_color(OUTLINE_COLOR)}" stroke-width="{2 * OUTLINE_WIDTH}" paint-order="stroke"'
+              if outline else '')
+    return (f'<text id="{_svg_id(style)}" fill="{hex_color(color)}" font-size="{font_size}"{stroke} '
+            f'{_SVG_TEXT}>{symbol}</text>')
+
+
+@lru_cache(maxsize=None)
+def _svg_background(cell_size):
+    # Tło diagramu (pola, siatka i pasy figur w ręku) jest takie samo dla każdej pozycji
+    parts = []
+    width = BOARD_SIZE * cell_size
+    for color, y in ((GRAY, 0), (GRAY, (BOARD_SIZE + 1) * cell_size)):
+        parts.append(f'<rect x="0" y="{y}" width="{width}" height="{cell_size}" fill="{hex_color(color)}"/>')
+    for row in range(BOARD_SIZE):
+        for col in range(BOARD_SIZE):
+            fill = hex_color(LIGHT_COLOR if (row + col) % 2 == 0 else DARK_COLOR)
+            parts.append(f'<rect x="{col * cell_size}" y="{(row + 1) * cell_size}" width="{cell_size}" '
+                         f'height="{cell_size}" fill="{fill}" stroke="{hex_color(LINE_COLOR)}"/>')
+    return ''.join(parts)
+
+
+def export_plies(moves, plies, output_dir, stem, fmt='png', cell_size=DIAGRAM_CELL):
+    """
+    Eksportuje diagramy wybranych pozycji (rosnąco) jednej gry; zadanie wykonywane w procesie roboczym.
+
+    Returns:
+        list: Ścieżki zapisanych diagramów.
+    """
+    diagram = BoardDiagram(cell_size)
+    board = shogi.Board()
+    played = 0
+    paths = []
+    for ply in plies:
+        for move in moves[played:ply]:
+            board.push(move)
+        played = ply
+        path = Path(output_dir) / f"{stem}_{ply:03}.{fmt}"
+        if fmt == 'svg':
+            path.write_text(diagram.svg(board))
+        else:
+            path.write_bytes(diagram.png(board))
+        paths.append(path)
+    return paths
+
+
+def export_diagrams(path, output_dir, plies=None, fmt='png', cell_size=DIAGRAM_CELL, workers=None):
+    """
+    Eksportuje diagramy pozycji zapisanej gry.
+
+    Args:
+        path (str or Path): Zapis gry (`.json` lub `.shg`).
+        output_dir (str or Path): Katalog na diagramy `<nazwa gry>_<półruch>.<format>`.
+        plies (iterable or None): Numery półruchów (0 - pozycja początkowa); None - wszystkie pozycje.
+        fmt (str): "png" albo "svg".
+        cell_size (int): Rozmiar pola w pikselach.
+        workers (int or None): Liczba procesów roboczych; 1 - eksport w bieżącym procesie.
+
+    Returns:
+        list: Ścieżki zapisanych diagramów w kolejności półruchów.
+
+    Raises:
+        DiagramError: Gdy formatu nie obsługuje eksport albo zapisu gry nie można wczytać.
+    """
+    if fmt not in DIAGRAM_FORMATS:
+        raise DiagramError(f"unknown format {fmt}")
+    path = Path(path)
+    try:
+        _, _, moves = read_record(path)
+    except (OSError, RecordError, ValueError, TypeError, KeyError, AttributeError) as e:
+        raise DiagramError(f"{path}: {e}")
+    output_dir = Path(output_dir)
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    plies = range(len(moves) + 1) if plies is None else sorted({ply for ply in plies if 0 <= ply <= len(moves)})
+    chunks = [plies[i:i + CHUNK_PLIES] for i in range(0, len(plies), CHUNK_PLIES)]
+    workers = min(workers or os.cpu_count() or 1, len(chunks))
+    if workers <= 1:
+        return [image for chunk in chunks for image in export_plies(moves, chunk, output_dir, path.stem, fmt, cell_size)]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        # Każda porcja jest odtwarzana od początku gry tylko do swojej pierwszej pozycji
+        futures = [executor.submit(export_plies, moves, chunk, output_dir, path.stem, fmt, cell_size)
+                   for chunk in chunks]
+        return [image for future in futures for image in future.result()]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Eksport diagramów pozycji zapisanych gier Shogi (PNG lub SVG).")
+    parser.add_argument("paths", nargs="+", help="Pliki zapisów gier (np. z katalogów Top10 i History).")
+    parser.add_argument("-o", "--output", default="diagrams", help="Katalog na diagramy.")
+    parser.add_argument("-f", "--format", choices=DIAGRAM_FORMATS, default="png", help="Format diagramów.")
+    parser.add_argument("--plies", nargs="*", type=int, help="Numery półruchów; domyślnie wszystkie.")
+    parser.add_argument("--cell-size", type=int, default=DIAGRAM_CELL, help="Rozmiar pola w pikselach.")
+    parser.add_argument("-w", "--workers", type=int, default=os.cpu_count(), help="Liczba procesów roboczych.")
+    args = parser.parse_args(argv)
+
+    status = 0
+    for path in args.paths:
+        try:
+            images = export_diagrams(path, args.output, args.plies, args.format, args.cell_size, args.workers)
+        except DiagramError as e:
+            print(e, file=sys.stderr)
+            status = 1
+            continue
+        print(f"{path}: {len(images)} diagrams in {args.output}")
+    return status
+
+
+if __name__ == "__main__":
+    sys.exit(main())
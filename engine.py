@@ -0,0 +1,325 @@
+import copy
+import time
+import shogi
+from positions import position_key
+
+
+# Wartości figur (w setnych części piona)
+PIECE_VALUES = {
+    shogi.PAWN: 100,
+    shogi.LANCE: 300,
+    shogi.KNIGHT: 400,
+    shogi.SILVER: 500,
+    shogi.GOLD: 600,
+    shogi.BISHOP: 800,
+    shogi.ROOK: 1000,
+    shogi.KING: 0,
+    shogi.PROM_PAWN: 550,
+    shogi.PROM_LANCE: 550,
+    shogi.PROM_KNIGHT: 550,
+    shogi.PROM_SILVER: 600,
+    shogi.PROM_BISHOP: 1100,
+    shogi.PROM_ROOK: 1300,
+}
+HAND_BONUS = 1.1  # Figura w ręce jest warta więcej, bo można ją dostawić w dowolne miejsce
+
+# Ustawienia wyszukiwania
+MATE_SCORE = 100000
+INFINITY = 10 * MATE_SCORE
+MAX_DEPTH = 4  # Maksymalna głębokość iteracyjnego pogłębiania
+TIME_LIMIT = 2.0  # Domyślny czas na ruch w sekundach
+TT_SIZE = 200000  # Maksymalna liczba wpisów w tablicy transpozycji
+QUIESCENCE_DEPTH = 4  # Maksymalna głębokość przeszukiwania samych bić
+CHECK_EVERY = 256  # Co ile węzłów sprawdzać limit czasu
+
+# Rodzaje wpisów w tablicy transpozycji
+EXACT, LOWER, UPPER = 0, 1, 2
+
+
+class SearchTimeout(Exception):
+    def __init__(self) -> None:
+        super().__init__("Search time limit exceeded")
+
+
+class SearchResult:
+    """
+    Klasa przechowująca wynik wyszukiwania najlepszego ruchu.
+
+    Atrybuty:
+        move (shogi.Move or None): Najlepszy znaleziony ruch (None, jeśli brak legalnych ruchów).
+        score (int): Ocena pozycji z punktu widzenia gracza na ruchu.
+        depth (int): Głębokość ostatniej ukończonej iteracji.
+        nodes (int): Liczba odwiedzonych węzłów.
+        elapsed (float): Czas wyszukiwania w sekundach.
+        pv (list): Główny wariant (lista ruchów `shogi.Move`).
+    """
+    def __init__(self, move=None, score=0, depth=0, nodes=0, elapsed=0.0, pv=None) -> None:
+        self.move = move
+        self.score = score
+        self.depth = depth
+        self.nodes = nodes
+        self.elapsed = elapsed
+        self.pv = pv if pv else []
+
+    @property
+    def nps(self):
+        """Liczba węzłów na sekundę."""
+        return int(self.nodes / self.elapsed) if self.elapsed > 0 else 0
+
+    def __repr__(self):
+        pv = ' '.join(move.usi() for move in self.pv)
+        return f"depth {self.depth} score {self.score} nodes {self.nodes} nps {self.nps} pv {pv}"
+
+
+def evaluate(board):
+    """
+    Ocenia pozycję materiałowo z punktu widzenia gracza na ruchu.
+
+    Args:
+        board (shogi.Board): Oceniana pozycja.
+
+    Returns:
+        int: Ocena pozycji (dodatnia, gdy gracz na ruchu ma przewagę).
+    """
+    score = 0
+    black = board.occupied[shogi.BLACK]
+    for square, piece_type in enumerate(board.pieces):
+        if piece_type:
+            value = PIECE_VALUES[piece_type]
+            score += value if black & shogi.BB_SQUARES[square] else -value
+
+    for color, sign in ((shogi.BLACK, 1), (shogi.WHITE, -1)):
+        for piece_type, count in board.pieces_in_hand[color].items():
+            score += sign * int(PIECE_VALUES[piece_type] * HAND_BONUS) * count
+
+    return score if board.turn == shogi.BLACK else -score
+
+
+class Engine:
+    """
+    Silnik komputerowego przeciwnika oparty na `shogi.Board`.
+
+    Wykorzystuje algorytm negamax z cięciami alfa-beta, iteracyjne pogłębianie z limitem
+    czasu na ruch, tablicę transpozycji kluczowaną haszem Zobrista oraz porządkowanie
+    ruchów (ruch z tablicy transpozycji, bicia MVV-LVA, ruchy "killer", heurystyka historii).
+
+    Atrybuty:
+        max_depth (int): Maksymalna głębokość wyszukiwania.
+        time_limit (float): Czas na ruch w sekundach.
+        tt (dict): Tablica transpozycji {hasz: (głębokość, ocena, rodzaj, najlepszy ruch)}.
+        killers (list): Dwa ruchy "killer" dla każdej głębokości.
+        history (dict): Heurystyka historii {(skąd, dokąd, dostawiana figura): waga}.
+        nodes (int): Liczba węzłów odwiedzonych w bieżącym wyszukiwaniu.
+        stop_check (callable or None): Funkcja zwracająca True, gdy wyszukiwanie ma zostać przerwane.
+
+    Metody:
+        search(board, time_limit=None, on_info=None):
+            Zwraca `SearchResult` z najlepszym ruchem dla gracza na ruchu.
+
+    Uwagi:
+        Wyszukiwanie działa na kopii planszy, więc przekazany obiekt `board` nie jest modyfikowany.
+        Funkcja `stop_check` pozwala przerwać wyszukiwanie z zewnątrz (np. z innego procesu).
+    """
+    def __init__(self, max_depth=MAX_DEPTH, time_limit=TIME_LIMIT, stop_check=None) -> None:
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.stop_check = stop_check
+        self.tt = {}
+        self.killers = []
+        self.history = {}
+        self.nodes = 0
+        self.deadline = None
+        self.stopped = False
+
+    def stop(self):
+        """
+        Przerywa trwające wyszukiwanie; zwrócony zostanie wynik ostatniej ukończonej iteracji.
+        """
+        self.stopped = True
+
+    def search(self, board, time_limit=None, on_info=None):
+        """
+        Szuka najlepszego ruchu metodą iteracyjnego pogłębiania.
+
+        Args:
+            board (shogi.Board): Pozycja, dla której szukany jest ruch.
+            time_limit (float or None): Czas na ruch; None oznacza `self.time_limit`.
+            on_info (callable or None): Funkcja wywoływana z `SearchResult` po każdej ukończonej iteracji.
+
+        Returns:
+            SearchResult: Wynik ostatniej ukończonej iteracji.
+        """
+        board = copy.deepcopy(board)
+        time_limit = self.time_limit if time_limit is None else time_limit
+        start = time.perf_counter()
+        self.deadline = start + time_limit
+        self.nodes = 0
+        self.stopped = False
+        self.killers = [[None, None] for _ in range(self.max_depth + QUIESCENCE_DEPTH + 1)]
+        self.history.clear()
+        if len(self.tt) > TT_SIZE:
+            self.tt.clear()
+
+        result = SearchResult()
+        for depth in range(1, self.max_depth + 1):
+            try:
+                score = self.negamax(board, depth, -INFINITY, INFINITY, 0)
+            except SearchTimeout:
+                break
+
+            pv = self.principal_variation(board, depth)
+            result = SearchResult(pv[0] if pv else None, score, depth, self.nodes, time.perf_counter() - start, pv)
+            if on_info:
+                on_info(result)
+            if not pv or abs(score) >= MATE_SCORE - self.max_depth:
+                break  # Brak ruchów albo znaleziony mat
+
+        if result.move is None:
+            # Nawet pierwsza iteracja nie zdążyła się zakończyć
+            moves = list(board.legal_moves)
+            result.move = moves[0] if moves else None
+        result.nodes = self.nodes
+        result.elapsed = time.perf_counter() - start
+        return result
+
+    def principal_variation(self, board, depth):
+        """
+        Odczytuje główny wariant z tablicy transpozycji.
+        """
+        pv = []
+        for _ in range(depth):
+            entry = self.tt.get(position_key(board))
+            if not entry or entry[3] is None or entry[3] not in board.legal_moves:
+                break
+            pv.append(entry[3])
+            board.push(entry[3])
+        for _ in pv:
+            board.pop()
+        return pv
+
+    def _check_time(self):
+        self.nodes += 1
+        if self.nodes % CHECK_EVERY == 0:
+            if self.stop_check and self.stop_check():
+                self.stopped = True
+            if self.stopped or time.perf_counter() > self.deadline:
+                raise SearchTimeout()
+
+    def order_moves(self, board, moves, tt_move, ply):
+        """
+        Sortuje ruchy: ruch z tablicy transpozycji, bicia (MVV-LVA), ruchy "killer", historia.
+        """
+        killers = self.killers[ply] if ply < len(self.killers) else ()
+
+        def key(move):
+            if move == tt_move:
+                return 10 * INFINITY
+            if not move.drop_piece_type:
+                captured = board.pieces[move.to_square]
+                if captured:
+                    attacker = board.pieces[move.from_square]
+                    return INFINITY + 16 * PIECE_VALUES[captured] - PIECE_VALUES[attacker]
+            if move in killers:
+                return INFINITY // 2
+            return self.history.get((move.from_square, move.to_square, move.drop_piece_type), 0)
+
+        return sorted(moves, key=key, reverse=True)
+
+    def negamax(self, board, depth, alpha, beta, ply):
+        """
+        Przeszukiwanie negamax z cięciami alfa-beta.
+
+        Returns:
+            int: Ocena pozycji z punktu widzenia gracza na ruchu.
+        """
+        self._check_time()
+
+        if ply and board.is_fourfold_repetition():
+            return 0
+        if depth <= 0:
+            return self.quiescence(board, alpha, beta, ply, QUIESCENCE_DEPTH)
+
+        key = position_key(board)
+        entry = self.tt.get(key)
+        tt_move = None
+        if entry:
+            entry_depth, entry_score, entry_flag, tt_move = entry
+            if ply and entry_depth >= depth:
+                if entry_flag == EXACT:
+                    return entry_score
+                if entry_flag == LOWER and entry_score >= beta:
+                    return entry_score
+                if entry_flag == UPPER and entry_score <= alpha:
+                    return entry_score
+
+        original_alpha = alpha
+        best_score = -INFINITY
+        best_move = None
+        for move in self.order_moves(board, list(board.pseudo_legal_moves), tt_move, ply):
+            board.push(move)
+            if board.was_suicide() or board.was_check_by_dropping_pawn(move):
+                board.pop()
+                continue
+            try:
+                score = -self.negamax(board, depth - 1, -beta, -alpha, ply + 1)
+            finally:
+                board.pop()
+
+            if score > best_score:
+                best_score, best_move = score, move
+            if score > alpha:
+                alpha = score
+            if alpha >= beta:
+                if move.drop_piece_type or not board.pieces[move.to_square]:
+                    # Ciche ruchy powodujące cięcie
+                    killers = self.killers[ply]
+                    if move != killers[0]:
+                        killers[1], killers[0] = killers[0], move
+                    history_key = (move.from_square, move.to_square, move.drop_piece_type)
+                    self.history[history_key] = self.history.get(history_key, 0) + depth * depth
+                break
+
+        if best_move is None:
+            # Brak legalnych ruchów oznacza przegraną (mat lub pat)
+            return -MATE_SCORE + ply
+
+        if best_score <= original_alpha:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.tt[key] = (depth, best_score, flag, best_move)
+        return best_score
+
+    def quiescence(self, board, alpha, beta, ply, depth):
+        """
+        Przeszukiwanie samych bić, aby uniknąć oceny pozycji w trakcie wymiany.
+        """
+        self._check_time()
+
+        stand_pat = evaluate(board)
+        if stand_pat >= beta or depth == 0:
+            return stand_pat
+        alpha = max(alpha, stand_pat)
+
+        captures = [
+            move for move in board.generate_pseudo_legal_moves(
+                pawns_drop=False, lances_drop=False, knights_drop=False, silvers_drop=False,
+                golds_drop=False, bishops_drop=False, rooks_drop=False)
+            if board.pieces[move.to_square]
+        ]
+        for move in self.order_moves(board, captures, None, ply):
+            board.push(move)
+            if board.was_suicide():
+                board.pop()
+                continue
+            try:
+                score = -self.quiescence(board, -beta, -alpha, ply + 1, depth - 1)
+            finally:
+                board.pop()
+
+            if score >= beta:
+                return score
+            alpha = max(alpha, score)
+        return alpha
@@ -0,0 +1,202 @@
+"""
+Dziennik zapisu z wyprzedzeniem (write-ahead log) dla trwającej partii.
+
+Każdy wykonany i cofnięty ruch jest dopisywany do dziennika (2 bajty na wpis, kodowanie ruchów
+jak w `records.py`). Wpisy są buforowane i utrwalane (`fsync`) partiami, co `JOURNAL_FLUSH_EVERY`
+wpisów lub najpóźniej po `JOURNAL_FLUSH_INTERVAL` sekundach (`flush_due` w pętli klatek).
+Po awarii lub zamknięciu okna partię można wznowić przy kolejnym uruchomieniu aplikacji.
+"""
+import datetime
+import os
+import struct
+import time
+from pathlib import Path
+from records import encode_move, decode_move, atomic_write, DATE_FORMAT
+
+
+JOURNAL_PATH = 'current_game.wal'
+JOURNAL_MAGIC = b"SHGJ"
+# magic, rok, miesiąc, dzień, godzina, minuta, sekunda, kolor silnika (NO_ENGINE - gra dwóch graczy)
+JOURNAL_HEADER = struct.Struct("<4sHBBBBBB")
+JOURNAL_ENTRY = struct.Struct("<H")
+JOURNAL_ELAPSED = struct.Struct("<I")
+JOURNAL_FLUSH_EVERY = 8  # Liczba wpisów w jednej partii zapisu
+JOURNAL_FLUSH_INTERVAL = 5.0  # Maksymalny czas (s), przez jaki wpisy czekają w buforze
+NO_ENGINE = 0xFF
+
+# Wpisy specjalne; kody ruchów mieszczą się w 15 bitach
+POP = 0x8000  # Cofnięcie ruchu
+TIME_MARK = 0x8001  # Po nim czas gry w sekundach (uint32)
+
+
+class JournalError(Exception):
+    def __init__(self, error) -> None:
+        super().__init__(f"Invalid game journal: {error}")
+
+
+class JournalState:
+    """
+    Stan partii odtworzony z dziennika.
+
+    Atrybuty:
+        date (str): Data rozpoczęcia partii.
+        elapsed (int): Czas gry w sekundach w chwili ostatniego zapisu.
+        moves (list): Ruchy `shogi.Move` na stosie w chwili ostatniego zapisu.
+        engine_color (int or None): Kolor silnika (None w grze dwóch graczy).
+    """
+    def __init__(self, date, elapsed, moves, engine_color) -> None:
+        self.date = date
+        self.elapsed = elapsed
+        self.moves = moves
+        self.engine_color = engine_color
+
+
+class GameJournal:
+    """
+    Dziennik ruchów trwającej partii.
+
+    Atrybuty:
+        path (Path): Ścieżka do pliku dziennika.
+
+    Metody:
+        start(engine_color=None, moves=(), elapsed=0, date=None):
+            Rozpoczyna nowy dziennik (zastępuje poprzedni).
+        push(move, elapsed):
+            Dopisuje wykonany ruch.
+        pop(elapsed):
+            Dopisuje cofnięcie ruchu.
+        flush(elapsed=None):
+            Utrwala zbuforowane wpisy.
+        flush_due(elapsed):
+            Utrwala zbuforowane wpisy, jeśli od ostatniego zapisu minęło `JOURNAL_FLUSH_INTERVAL` sekund.
+        discard():
+            Usuwa dziennik (np. po zapisaniu zakończonej partii).
+        read():
+            Odtwarza stan partii z pliku dziennika.
+    """
+    def __init__(self, path=JOURNAL_PATH) -> None:
+        self.path = Path(path)
+        self._buffer = bytearray()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+    def exists(self):
+        return self.path.exists()
+
+    def start(self, engine_color=None, moves=(), elapsed=0, date=None):
+        """
+        Rozpoczyna nowy dziennik, zastępując poprzedni jednym zapisem atomowym.
+
+        Args:
+            engine_color (int or None): Kolor silnika (None w grze dwóch graczy).
+            moves (iterable): Ruchy już wykonane (przy wznawianiu partii).
+            elapsed (int): Czas gry w sekundach (przy wznawianiu partii).
+            date (str or None): Data rozpoczęcia partii; domyślnie bieżąca.
+        """
+        moment = datetime.datetime.strptime(date, DATE_FORMAT) if date else datetime.datetime.now()
+        data = bytearray(JOURNAL_HEADER.pack(
+            JOURNAL_MAGIC, moment.year, moment.month, moment.day, moment.hour, moment.minute, moment.second,
+            NO_ENGINE if engine_color is None else engine_color))
+        for move in moves:
+            data += JOURNAL_ENTRY.pack(encode_move(move))
+        data += JOURNAL_ENTRY.pack(TIME_MARK) + JOURNAL_ELAPSED.pack(int(elapsed))
+        self._buffer.clear()
+        self._pending = 0
+        self._last_flush = time.monotonic()
+        atomic_write(self.path, bytes(data))
+
+    def push(self, move, elapsed):
+        self._append(JOURNAL_ENTRY.pack(encode_move(move)), elapsed)
+
+    def pop(self, elapsed):
+        self._append(JOURNAL_ENTRY.pack(POP), elapsed)
+
+    def _append(self, entry, elapsed):
+        self._buffer += entry
+        self._pending += 1
+        if self._pending >= JOURNAL_FLUSH_EVERY or time.monotonic() - self._last_flush >= JOURNAL_FLUSH_INTERVAL:
+            self.flush(elapsed)
+
+    def flush(self, elapsed=None):
+        """
+        Dopisuje zbuforowane wpisy (i czas gry) do pliku i wykonuje `fsync`.
+
+        Zwykle wystarcza jedno wywołanie `os.write`; po niepełnym zapisie reszta bufora jest dopisywana
+        kolejnymi wywołaniami, a bufor jest opróżniany tylko o zapisane bajty.
+
+        Raises:
+            JournalError: Gdy system nie zapisał żadnego bajtu.
+            OSError: Gdy zapis się nie powiódł (np. brak miejsca na dysku).
+        """
+        if elapsed is not None:
+            self._buffer += JOURNAL_ENTRY.pack(TIME_MARK) + JOURNAL_ELAPSED.pack(int(elapsed))
+        self._last_flush = time.monotonic()
+        if not self._buffer:
+            return
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT | getattr(os, 'O_BINARY', 0), 0o644)
+        try:
+            while self._buffer:
+                written = os.write(fd, self._buffer)
+                if not written:
+                    raise JournalError(f"short write to {self.path}")
+                del self._buffer[:written]  # Niezapisaną resztę dopisuje kolejne wywołanie `os.write`
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+        self._pending = 0
+
+    def flush_due(self, elapsed):
+        """
+        Utrwala zbuforowane wpisy po upływie `JOURNAL_FLUSH_INTERVAL` od ostatniego zapisu.
+
+        Wywoływana w każdej klatce, więc ruchy są utrwalane w tym czasie także bez kolejnych wpisów.
+
+        Returns:
+            bool: True, jeśli wpisy zostały zapisane.
+        """
+        if not self._buffer or time.monotonic() - self._last_flush < JOURNAL_FLUSH_INTERVAL:
+            return False
+        self.flush(elapsed)
+        return True
+
+    def discard(self):
+        self._buffer.clear()
+        self._pending = 0
+        self.path.unlink(missing_ok=True)
+
+    def read(self):
+        """
+        Odtwarza stan partii z dziennika. Niedokończony wpis na końcu pliku jest pomijany.
+
+        Returns:
+            JournalState: Data, czas gry, ruchy na stosie i kolor silnika.
+
+        Raises:
+            JournalError: Gdy plik nie jest dziennikiem partii.
+        """
+        data = memoryview(self.path.read_bytes())
+        if len(data) < JOURNAL_HEADER.size:
+            raise JournalError("truncated header")
+        magic, year, month, day, hour, minute, second, engine_color = JOURNAL_HEADER.unpack_from(data)
+        if magic != JOURNAL_MAGIC:
+            raise JournalError("bad magic")
+        date = datetime.datetime(year, month, day, hour, minute, second).strftime(DATE_FORMAT)
+
+        moves = []
+        elapsed = 0
+        position = JOURNAL_HEADER.size
+        while position + JOURNAL_ENTRY.size <= len(data):
+            (code,) = JOURNAL_ENTRY.unpack_from(data, position)
+            position += JOURNAL_ENTRY.size
+            if code == POP:
+                if moves:
+                    moves.pop()
+            elif code == TIME_MARK:
+                if position + JOURNAL_ELAPSED.size > len(data):
+                    break
+                (elapsed,) = JOURNAL_ELAPSED.unpack_from(data, position)
+                position += JOURNAL_ELAPSED.size
+            else:
+                moves.append(decode_move(code))
+
+        return JournalState(date, elapsed, moves, None if engine_color == NO_ENGINE else engine_color)
@@ -0,0 +1,132 @@
+import heapq
+import json
+from records import atomic_write
+
+
+LEADERBOARD_SUFFIX = '.top'  # Ranking zapisany obok archiwum partii (np. `games.db.top`)
+TOP_LIMIT = 10  # Domyślna liczba najlepszych gier
+
+
+class LeaderboardError(Exception):
+    def __init__(self, error) -> None:
+        super().__init__(f"Invalid leaderboard: {error}")
+
+
+def leaderboard_path(archive):
+    """
+    Zwraca ścieżkę pliku rankingu dla archiwum partii.
+    """
+    return archive.path.with_name(archive.path.name + LEADERBOARD_SUFFIX)
+
+
+class Leaderboard:
+    """
+    Trwały ranking N najdłuższych partii z archiwum (`archive.GameArchive`).
+
+    Ranking jest kopcem minimalnym par (czas gry, -identyfikator partii), zapisanym w pliku
+    `<archiwum>.top` obok archiwum. Dodanie partii kosztuje O(log N) i wskazuje co najwyżej
+    jedną partię, która wypada z rankingu; partie pozostają w archiwum, więc żaden plik nie
+    jest przenoszony ani przemianowywany.
+
+    Atrybuty:
+        archive (GameArchive): Archiwum partii.
+        size (int): Liczba partii w rankingu.
+        path (Path): Plik z zapisem rankingu.
+
+    Metody:
+        add(game_id, game_time=None):
+            Dodaje partię i zwraca listę identyfikatorów partii, które wypadły z rankingu.
+        ranking():
+            Zwraca identyfikatory partii od najdłuższej gry.
+        rebuild():
+            Tworzy ranking od nowa na podstawie indeksu archiwum.
+
+    Uwagi:
+        - Przy równym czasie gry wyżej jest partia dopisana do archiwum wcześniej.
+        - Brakujący plik rankingu jest odtwarzany z indeksu archiwum (bez odczytu partii).
+        - Odczyt (konstruktor, `ranking`) nie zapisuje plików, więc menu może go używać bez skutków
+          ubocznych; plik rankingu zapisują tylko `add` (po zakończeniu partii) i `rebuild`.
+        - Partie dopisane do archiwum po ostatnim zapisie rankingu (np. przerwany zapis) są
+          dołączane przy odczycie (`ranking`) i przy najbliższym `add`.
+        - Zmniejszenie `size` nie wymaga przebudowy; nadmiarowe partie wypadają przy najbliższym `add`.
+    """
+    def __init__(self, archive, size=TOP_LIMIT) -> None:
+        self.archive = archive
+        self.size = size
+        self.path = leaderboard_path(archive)
+        self._heap = []  # Wpisy [czas gry, -identyfikator partii]
+        self._covered = 0  # Liczba partii archiwum uwzględnionych w rankingu
+        if self.path.exists():
+            self.load()
+
+    def __len__(self):
+        return len(self._heap)
+
+    def __contains__(self, game_id):
+        return any(-entry[1] == game_id for entry in self._heap)
+
+    def load(self):
+        try:
+            with self.path.open("r") as fp:
+                data = json.load(fp)
+            self._covered = data["covered"]
+            self._heap = [list(entry) for entry in data["entries"]]
+        except (json.JSONDecodeError, KeyError, TypeError) as e:
+            raise LeaderboardError(e)
+        if self._covered > len(self.archive):
+            # Ranking innego (zastąpionego) archiwum - odtwarzany od nowa
+            self._heap = []
+            self._covered = 0
+        heapq.heapify(self._heap)
+
+    def save(self):
+        atomic_write(self.path, json.dumps({"covered": self._covered, "entries": self._heap}))
+
+    def rebuild(self):
+        """
+        Tworzy ranking z indeksu archiwum (jednorazowo, np. po zaimportowaniu starszych zapisów).
+        """
+        self._heap = []
+        self._covered = 0
+        self._catch_up()
+        self.save()
+
+    def _catch_up(self):
+        for game_id in range(self._covered, len(self.archive)):
+            self._push(game_id, self.archive.game_time(game_id))
+        self._covered = len(self.archive)
+        return self._trim()
+
+    def _push(self, game_id, game_time):
+        heapq.heappush(self._heap, [int(game_time), -game_id])
+
+    def _trim(self):
+        evicted = []
+        while len(self._heap) > self.size:
+            evicted.append(-heapq.heappop(self._heap)[1])
+        return evicted
+
+    def add(self, game_id, game_time=None):
+        """
+        Dodaje partię z archiwum do rankingu.
+
+        Args:
+            game_id (int): Identyfikator partii w archiwum.
+            game_time (int or None): Czas gry w sekundach; domyślnie odczytywany z indeksu archiwum.
+
+        Returns:
+            list: Identyfikatory partii, które wypadły z rankingu (także nowa partia, jeśli jest za krótka).
+        """
+        if game_id >= self._covered:
+            # Partie pominięte od ostatniego zapisu rankingu oraz nowa partia
+            for missing in range(self._covered, game_id):
+                self._push(missing, self.archive.game_time(missing))
+            self._push(game_id, self.archive.game_time(game_id) if game_time is None else game_time)
+            self._covered = game_id + 1
+        evicted = self._trim()
+        self.save()
+        return evicted
+
+    def ranking(self):
+        self._catch_up()  # Tylko w pamięci; ranking jest zapisywany przy `add`
+        return [-entry[1] for entry in sorted(self._heap, reverse=True)]
@@ -1,12 +1,27 @@
+import argparse
 from app import App
+from profiler import PROFILER
 import pygame
 
-def main():
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Gra Shogi.")
+    parser.add_argument("--profile", action="store_true", help="Pomiar czasu klatek z nakładką FPS (także SHOGI_PROFILE=1).")
+    parser.add_argument("--trace", help="Zapisz przebieg sesji w formacie Chrome Trace (JSON).")
+    parser.add_argument("--cprofile", help="Zapisz profil sesji cProfile (pstats).")
+    args = parser.parse_args(argv)
+
+    PROFILER.configure_from_env()
+    if args.profile or args.trace or args.cprofile:
+        PROFILER.configure(True, args.trace or PROFILER.trace_path, args.cprofile or PROFILER.cprofile_path)
+
     pygame.init()
-    app = App()
-    app.run()
-    pygame.quit()
+    try:
+        app = App()
+        app.run()
+    finally:
+        PROFILER.close()
+        pygame.quit()
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,46 @@
+"""
+Rysowanie okien aplikacji bez ekranu (na zwykłej powierzchni `pygame.Surface`).
+
+Okna `GameWindow`, `AnaliseWindow` i `MainWindow` rysują na powierzchni przekazanej jako `screen`,
+więc do rysowania poza ekranem wystarczy powierzchnia z `offscreen_surface`; nie jest potrzebne
+`pygame.display.set_mode` ani menedżer okien. Obrazy pozycji zapisanej gry eksportuje `diagrams.py`.
+"""
+import pygame
+from chess import GameWindow, AnaliseWindow, MainWindow, SCREEN_WIDTH, SCREEN_HEIGHT
+
+
+IMAGE_SIZE = (SCREEN_WIDTH, SCREEN_HEIGHT)
+
+
+def offscreen_surface(size=IMAGE_SIZE, flags=0):
+    """
+    Tworzy powierzchnię do rysowania bez okna. Inicjalizuje tylko moduł czcionek Pygame.
+
+    Args:
+        size (tuple): Rozmiar powierzchni w pikselach.
+        flags (int): Flagi `pygame.Surface` (np. `pygame.SRCALPHA`).
+    """
+    if not pygame.font.get_init():
+        pygame.font.init()
+    return pygame.Surface(size, flags)
+
+
+def render(window):
+    """
+    Rysuje jedną klatkę okna na jego powierzchni i ją zwraca.
+
+    Args:
+        window (GameWindow, AnaliseWindow or MainWindow): Okno rysujące na dowolnej powierzchni.
+
+    Returns:
+        pygame.Surface: Powierzchnia okna po narysowaniu klatki.
+    """
+    if isinstance(window, AnaliseWindow):
+        window.update()
+    elif isinstance(window, GameWindow):
+        window.update_window()
+    elif isinstance(window, MainWindow):
+        window.draw_myself()
+    else:
+        raise TypeError(f"Cannot render {type(window).__name__}")
+    return window.screen
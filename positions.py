@@ -0,0 +1,136 @@
+"""
+Klucz pozycji (hasz Zobrista) utrzymywany przy każdym ruchu i wykrywanie powtórzeń (sennichite).
+
+Biblioteka `shogi` aktualizuje przyrostowo hasz ustawienia figur i licznik pozycji
+`Board.transpositions` w `push`/`pop`, ale pełny klucz pozycji (z kolejnością ruchu i figurami
+w ręce) oblicza od nowa przy każdym `zobrist_hash()`, także w `is_fourfold_repetition()`.
+`PositionBoard` zapamiętuje klucz obliczony przez bibliotekę w `push`, więc sprawdzenie powtórzenia
+i klucz dla pamięci podręcznych pozycji (`MoveCache`, tablica transpozycji silnika) to odczyt atrybutu.
+
+`game_status` wyznacza stan gry (mat, powtórzenie, pat, zwycięzca) jednym przejściem po legalnych
+ruchach; okno gry zapamiętuje wynik po każdym ruchu zamiast pytać planszę w każdej klatce.
+"""
+import shogi
+
+
+SENNICHITE_COUNT = 4  # Pozycja powtórzona tyle razy kończy grę
+
+# Stany gry (`GameStatus.result`)
+IN_PROGRESS = 'in progress'
+CHECKMATE = 'checkmate'
+REPETITION = 'repetition'
+STALEMATE = 'stalemate'
+
+
+class PositionBoard(shogi.Board):
+    """
+    Plansza Shogi zapamiętująca klucz bieżącej pozycji między ruchami.
+
+    Klucz jest obliczany najwyżej raz na pozycję: `push` zapamiętuje wartość, którą biblioteka
+    oblicza do aktualizacji `transpositions`, a `pop` korzysta z zapamiętanego klucza przy
+    odejmowaniu pozycji z licznika. Kolejne odczyty (`zobrist_hash()`, `position_key`,
+    `is_fourfold_repetition()`) nie liczą haszu od nowa.
+
+    Atrybuty:
+        position_key (int): Hasz Zobrista bieżącej pozycji (równy `zobrist_hash()`).
+        transpositions (Counter): Licznik wystąpień pozycji w partii, {klucz: liczba} (z biblioteki `shogi`).
+
+    Metody:
+        repetitions():
+            Zwraca liczbę wystąpień bieżącej pozycji.
+
+    Uwagi:
+        Planszę należy zmieniać przez `push`, `pop`, `set_sfen`, `reset` lub `clear`; bezpośrednie
+        ustawianie figur (`set_piece_at`) lub `turn` nie unieważnia zapamiętanego klucza.
+    """
+    _position_key = None  # Klucz bieżącej pozycji; None - do obliczenia przy najbliższym odczycie
+
+    def zobrist_hash(self, array=None):
+        if array is not None:
+            return super().zobrist_hash(array)
+        if self._position_key is None:
+            self._position_key = super().zobrist_hash()
+        return self._position_key
+
+    @property
+    def position_key(self):
+        return self.zobrist_hash()
+
+    def reset(self):
+        super().reset()
+        self._position_key = None
+
+    def clear(self):
+        super().clear()
+        self._position_key = None
+
+    def set_sfen(self, sfen):
+        super().set_sfen(sfen)
+        self._position_key = None
+
+    def push(self, move):
+        # Biblioteka oblicza klucz nowej pozycji na końcu `push` (licznik `transpositions`)
+        self._position_key = None
+        super().push(move)
+
+    def pop(self):
+        # Biblioteka odejmuje z licznika klucz pozycji przed cofnięciem ruchu - jest już zapamiętany
+        move = super().pop()
+        self._position_key = None
+        return move
+
+    def repetitions(self):
+        return self.transpositions[self.zobrist_hash()]
+
+
+def position_key(board):
+    """
+    Zwraca klucz pozycji planszy: zapamiętany dla `PositionBoard`, obliczany dla `shogi.Board`.
+    """
+    if isinstance(board, PositionBoard):
+        return board.position_key
+    return board.zobrist_hash()
+
+
+class GameStatus:
+    """
+    Stan gry w danej pozycji.
+
+    Atrybuty:
+        result (str): IN_PROGRESS, CHECKMATE, REPETITION albo STALEMATE.
+        winner (int or None): Zwycięzca po macie (shogi.BLACK lub shogi.WHITE), w pozostałych przypadkach None.
+    """
+    __slots__ = ('result', 'winner')
+
+    def __init__(self, result=IN_PROGRESS, winner=None) -> None:
+        self.result = result
+        self.winner = winner
+
+    @property
+    def over(self):
+        return self.result != IN_PROGRESS
+
+    def __eq__(self, other) -> bool:
+        return isinstance(other, GameStatus) and (self.result, self.winner) == (other.result, other.winner)
+
+    def __repr__(self):
+        return f"GameStatus({self.result!r}, {self.winner!r})"
+
+
+def game_status(board):
+    """
+    Wyznacza stan gry w pozycji planszy (kolejność jak w `shogi.Board`: mat, powtórzenie, pat).
+
+    Legalne ruchy są generowane najwyżej do pierwszego znalezionego.
+
+    Returns:
+        GameStatus: Stan gry.
+    """
+    has_moves = any(True for _ in board.generate_legal_moves())
+    if not has_moves and board.is_check():
+        return GameStatus(CHECKMATE, board.turn ^ 1)
+    if board.is_fourfold_repetition():
+        return GameStatus(REPETITION)
+    if not has_moves:
+        return GameStatus(STALEMATE)
+    return GameStatus()
@@ -0,0 +1,254 @@
+"""
+Pomiar czasu klatek i etapów rysowania (profilowanie aplikacji).
+
+Profilowanie włącza zmienna środowiskowa `SHOGI_PROFILE=1` albo flaga `--profile` w `main.py`.
+Czasy etapów (np. `draw_pieces`, `get_legal_moves`) z ostatnich `RING_SIZE` klatek są przechowywane
+w buforach cyklicznych i wyświetlane w nakładce (FPS, czas klatki p50/p99, podział na etapy).
+Sesję można wyeksportować do formatu Chrome Trace (`SHOGI_TRACE=plik.json`, `--trace`) lub
+cProfile (`SHOGI_CPROFILE=plik.prof`, `--cprofile`).
+
+Przykład:
+    SHOGI_PROFILE=1 SHOGI_TRACE=trace.json python main.py
+"""
+import cProfile
+import functools
+import json
+import os
+import threading
+import time
+from collections import deque
+from pathlib import Path
+import pygame
+
+
+PROFILE_ENV = 'SHOGI_PROFILE'
+TRACE_ENV = 'SHOGI_TRACE'
+CPROFILE_ENV = 'SHOGI_CPROFILE'
+RING_SIZE = 600  # Liczba ostatnich klatek w statystykach (10 s przy 60 FPS)
+TRACE_LIMIT = 1_000_000  # Maksymalna liczba zdarzeń w eksporcie Chrome Trace
+OVERLAY_POS = (4, 4)
+OVERLAY_FONT_SIZE = 14
+OVERLAY_COLOR = (255, 255, 255)
+OVERLAY_BACKGROUND = (0, 0, 0)
+
+
+def percentile(values, fraction):
+    """
+    Zwraca percentyl (metoda najbliższej pozycji) z niepustej sekwencji wartości.
+    """
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class FrameProfiler:
+    """
+    Pomiar czasu klatek i nazwanych etapów w buforach cyklicznych.
+
+    Atrybuty:
+        enabled (bool): Czy pomiary są zbierane; wyłączony profiler kosztuje jedno sprawdzenie flagi.
+        frame_times (deque): Czas pracy (s) ostatnich klatek: obsługa zdarzeń i rysowanie.
+        frame_intervals (deque): Odstępy (s) między początkami kolejnych klatek, do obliczenia FPS.
+        phases (dict): Nazwa etapu -> deque z łącznym czasem etapu (s) w ostatnich klatkach.
+        trace_path (Path or None): Plik eksportu Chrome Trace.
+        cprofile_path (Path or None): Plik eksportu cProfile (`pstats`).
+
+    Metody:
+        configure(enabled=True, trace_path=None, cprofile_path=None):
+            Włącza lub wyłącza profilowanie.
+        begin_frame(), end_frame():
+            Wyznaczają granice klatki.
+        phase(name):
+            Menedżer kontekstu mierzący czas etapu.
+        stats():
+            Zwraca FPS, czas klatki p50/p99 i średnie czasy etapów.
+        draw_overlay(surface):
+            Rysuje nakładkę ze statystykami i zwraca zajęty obszar.
+        close():
+            Zapisuje eksporty sesji.
+
+    Uwagi:
+        - Czas etapu zawiera czas etapów zagnieżdżonych (np. `update_window` zawiera `draw_pieces`).
+        - Pomiary są zbierane tylko w wątku głównym; etapy wywołane w innych wątkach są pomijane.
+    """
+    def __init__(self, size=RING_SIZE) -> None:
+        self.enabled = False
+        self.size = size
+        self.frame_times = deque(maxlen=size)
+        self.frame_intervals = deque(maxlen=size)
+        self.phases = {}
+        self.trace_path = None
+        self.cprofile_path = None
+        self._trace = None
+        self._cprofile = None
+        self._frame_phases = {}
+        self._frame_start = None
+        self._origin = time.perf_counter()
+        self._thread = threading.main_thread()
+        self._font = None
+        self._overlay_area = None
+
+    def configure(self, enabled=True, trace_path=None, cprofile_path=None):
+        """
+        Włącza profilowanie (opcjonalnie z eksportem sesji) albo je wyłącza.
+
+        Args:
+            enabled (bool): Czy zbierać pomiary.
+            trace_path (str or None): Plik eksportu Chrome Trace (JSON).
+            cprofile_path (str or None): Plik eksportu cProfile.
+        """
+        self.enabled = enabled or bool(trace_path) or bool(cprofile_path)
+        self.trace_path = Path(trace_path) if trace_path else None
+        self.cprofile_path = Path(cprofile_path) if cprofile_path else None
+        self._trace = [] if self.trace_path else None
+        if self.cprofile_path and self._cprofile is None:
+            self._cprofile = cProfile.Profile()
+            self._cprofile.enable()
+
+    def configure_from_env(self, environ=os.environ):
+        self.configure(environ.get(PROFILE_ENV, '') not in ('', '0'),
+                       environ.get(TRACE_ENV) or None, environ.get(CPROFILE_ENV) or None)
+
+    def begin_frame(self):
+        if not self.enabled:
+            return
+        now = time.perf_counter()
+        if self._frame_start is not None:
+            self.frame_intervals.append(now - self._frame_start)
+        self._frame_start = now
+        self._frame_phases = {}
+
+    def end_frame(self):
+        if not self.enabled or self._frame_start is None:
+            return
+        now = time.perf_counter()
+        self.frame_times.append(now - self._frame_start)
+        self._record_trace('frame', self._frame_start, now)
+        for name in self.phases.keys() | self._frame_phases.keys():
+            if name not in self.phases:
+                self.phases[name] = deque(maxlen=self.size)
+            self.phases[name].append(self._frame_phases.get(name, 0.0))
+
+    def add(self, name, start, end):
+        """
+        Dodaje pomiar etapu `name` trwającego od `start` do `end` (`time.perf_counter`).
+        """
+        if threading.current_thread() is not self._thread:
+            return
+        self._frame_phases[name] = self._frame_phases.get(name, 0.0) + end - start
+        self._record_trace(name, start, end)
+
+    def _record_trace(self, name, start, end):
+        if self._trace is not None and len(self._trace) < TRACE_LIMIT:
+            self._trace.append({"name": name, "ph": "X", "pid": os.getpid(), "tid": 0,
+                                "ts": (start - self._origin) * 1e6, "dur": (end - start) * 1e6})
+
+    def phase(self, name):
+        """
+        Zwraca menedżer kontekstu mierzący czas etapu `name`.
+        """
+        return _Phase(self, name)
+
+    def stats(self):
+        """
+        Zwraca statystyki z ostatnich klatek.
+
+        Returns:
+            dict: {"fps", "p50", "p99" (czas klatki w ms), "phases": {nazwa: średni czas w ms}}.
+        """
+        intervals = sum(self.frame_intervals)
+        fps = len(self.frame_intervals) / intervals if intervals else 0.0
+        frame_times = list(self.frame_times)
+        return {
+            "fps": fps,
+            "p50": percentile(frame_times, 0.5) * 1000 if frame_times else 0.0,
+            "p99": percentile(frame_times, 0.99) * 1000 if frame_times else 0.0,
+            "phases": {name: sum(times) / len(times) * 1000 for name, times in self.phases.items() if times},
+        }
+
+    def overlay_lines(self):
+        stats = self.stats()
+        lines = [f"{stats['fps']:5.1f} FPS  p50 {stats['p50']:.2f} ms  p99 {stats['p99']:.2f} ms"]
+        for name, mean in sorted(stats["phases"].items(), key=lambda item: item[1], reverse=True):
+            lines.append(f"{name}: {mean:.3f} ms")
+        return lines
+
+    def draw_overlay(self, surface):
+        """
+        Rysuje nakładkę ze statystykami w lewym górnym rogu powierzchni.
+
+        Returns:
+            pygame.Rect or None: Obszar nakładki (do `pygame.display.update`), None gdy profilowanie jest wyłączone.
+        """
+        if not self.enabled:
+            return None
+        if self._font is None:
+            self._font = pygame.font.SysFont('Consolas', OVERLAY_FONT_SIZE)
+            pygame.register_quit(self._release_font)
+        surfaces = [self._font.render(line, True, OVERLAY_COLOR) for line in self.overlay_lines()]
+        area = pygame.Rect(OVERLAY_POS, (max(s.get_width() for s in surfaces) + 8,
+                                         sum(s.get_height() for s in surfaces) + 8))
+        if self._overlay_area:
+            area.union_ip(self._overlay_area)  # Zasłania tekst poprzedniej, większej nakładki
+        self._overlay_area = area
+        surface.fill(OVERLAY_BACKGROUND, area)
+        y = area.y + 4
+        for text_surface in surfaces:
+            surface.blit(text_surface, (area.x + 4, y))
+            y += text_surface.get_height()
+        return area
+
+    def _release_font(self):
+        self._font = None
+        self._overlay_area = None
+
+    def close(self):
+        """
+        Zapisuje eksport Chrome Trace i cProfile (jeśli zostały włączone).
+        """
+        if self._cprofile is not None:
+            self._cprofile.disable()
+            self._cprofile.dump_stats(self.cprofile_path)
+            self._cprofile = None
+        if self._trace is not None:
+            with self.trace_path.open("w") as fp:
+                json.dump({"traceEvents": self._trace, "displayTimeUnit": "ms"}, fp)
+            self._trace = None
+
+
+class _Phase:
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name) -> None:
+        self.profiler = profiler
+        self.name = name
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info):
+        if self.profiler.enabled:
+            self.profiler.add(self.name, self.start, time.perf_counter())
+
+
+PROFILER = FrameProfiler()
+
+
+def profiled(name=None):
+    """
+    Dekorator mierzący czas wywołań funkcji jako etap `name` (domyślnie nazwa funkcji).
+    """
+    def decorator(func):
+        phase_name = name or func.__name__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            if not PROFILER.enabled:
+                return func(*args, **kwargs)
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                PROFILER.add(phase_name, start, time.perf_counter())
+        return wrapper
+    return decorator
@@ -0,0 +1,488 @@
+import argparse
+import datetime
+import itertools
+import json
+import os
+import re
+import struct
+import sys
+from pathlib import Path
+import shogi
+
+
+class RecordError(Exception):
+    def __init__(self, error) -> None:
+        super().__init__(f"Invalid game record: {error}")
+
+
+REQUIRED_KEYS = ["date", "time", "moves"]
+
+
+def atomic_write(path, data):
+    """
+    Zapisuje plik w całości albo wcale: najpierw do pliku tymczasowego, potem `os.replace`.
+
+    Args:
+        path (str or Path): Ścieżka do pliku docelowego.
+        data (bytes or str): Zawartość pliku.
+    """
+    path = Path(path)
+    temp_path = path.with_name(f".{path.name}.tmp")
+    if isinstance(data, str):
+        data = data.encode()
+    try:
+        with temp_path.open("wb") as fp:
+            fp.write(data)
+            fp.flush()
+            os.fsync(fp.fileno())
+        os.replace(temp_path, path)
+    except BaseException:
+        temp_path.unlink(missing_ok=True)
+        raise
+
+
+def move_to_dict(move):
+    """
+    Zamienia ruch na słownik w formacie plików JSON aplikacji.
+    """
+    return {
+        "from": move.from_square,
+        "to": move.to_square,
+        "promo": move.promotion,
+        "dropped_type": move.drop_piece_type
+    }
+
+
+def move_from_dict(data):
+    """
+    Tworzy ruch `shogi.Move` ze słownika w formacie plików JSON aplikacji.
+    """
+    return shogi.Move(
+        from_square=data.get("from"),
+        to_square=data.get("to"),
+        promotion=data.get("promo"),
+        drop_piece_type=data.get("dropped_type")
+    )
+
+
+def read_json_record(path):
+    """
+    Wczytuje zapis gry z pliku JSON bez udziału Pygame.
+
+    Args:
+        path (str or Path): Ścieżka do pliku z zapisem gry.
+
+    Returns:
+        tuple: (data, czas gry w sekundach, lista ruchów `shogi.Move`).
+
+    Raises:
+        RecordError: Gdy plik nie jest poprawnym zapisem gry.
+    """
+    try:
+        with Path(path).open("r") as fp:
+            data = json.load(fp)
+    except json.JSONDecodeError as e:
+        raise RecordError(e)
+
+    for key in REQUIRED_KEYS:
+        if key not in data:
+            raise RecordError(f"missing key {key}")
+
+    return data["date"], data["time"], [move_from_dict(move) for move in data["moves"]]
+
+
+# Zwarty format binarny: nagłówek + 2 bajty na ruch
+BINARY_SUFFIX = ".shg"
+BINARY_MAGIC = b"SHG1"
+# magic, rok, miesiąc, dzień, godzina, minuta, sekunda, czas gry (s), liczba ruchów
+BINARY_HEADER = struct.Struct("<4sHBBBBBII")
+BINARY_MOVE = struct.Struct("<H")
+DATE_FORMAT = "%Y-%m-%d %H:%M:%S"
+DROP_OFFSET = 80  # Pole "skąd" 81..87 oznacza dostawienie figury typu 1..7
+PROMOTION_BIT = 1 << 14
+
+
+def encode_move(move):
+    """
+    Pakuje ruch w 15 bitów: skąd (7 bitów), dokąd (7 bitów), promocja (1 bit).
+
+    Dla dostawień pole "skąd" zawiera `DROP_OFFSET + typ figury`.
+    """
+    origin = DROP_OFFSET + move.drop_piece_type if move.drop_piece_type else move.from_square
+    return origin | move.to_square << 7 | (PROMOTION_BIT if move.promotion else 0)
+
+
+def decode_move(code):
+    """
+    Odtwarza ruch `shogi.Move` z wartości zwróconej przez `encode_move`.
+    """
+    origin, to_square, promotion = code & 0x7F, code >> 7 & 0x7F, bool(code & PROMOTION_BIT)
+    if origin > DROP_OFFSET:
+        return shogi.Move(None, to_square, False, origin - DROP_OFFSET)
+    return shogi.Move(origin, to_square, promotion)
+
+
+def encode_record(date, game_time, moves):
+    """
+    Zwraca zapis gry w formacie binarnym.
+    """
+    moves = list(moves)
+    moment = datetime.datetime.strptime(date, DATE_FORMAT)
+    header = BINARY_HEADER.pack(
+        BINARY_MAGIC, moment.year, moment.month, moment.day, moment.hour, moment.minute,
+        moment.second, int(game_time), len(moves))
+    return header + b"".join(BINARY_MOVE.pack(encode_move(move)) for move in moves)
+
+
+def decode_record(data):
+    """
+    Odczytuje zapis gry w formacie binarnym.
+
+    Args:
+        data (bytes or memoryview): Zawartość pliku.
+
+    Returns:
+        tuple: (data, czas gry w sekundach, lista ruchów `shogi.Move`).
+
+    Raises:
+        RecordError: Gdy dane nie są poprawnym zapisem binarnym.
+    """
+    view = memoryview(data)
+    date, game_time, count = decode_header(view)
+    body = view[BINARY_HEADER.size:]
+    if len(body) != count * BINARY_MOVE.size:
+        raise RecordError("truncated moves")
+
+    moves = [decode_move(code) for (code,) in BINARY_MOVE.iter_unpack(body)]
+    return date, game_time, moves
+
+
+def decode_header(data):
+    """
+    Odczytuje nagłówek zapisu binarnego.
+
+    Returns:
+        tuple: (data, czas gry w sekundach, liczba ruchów).
+    """
+    if len(data) < BINARY_HEADER.size:
+        raise RecordError("truncated header")
+    magic, year, month, day, hour, minute, second, game_time, count = BINARY_HEADER.unpack_from(data)
+    if magic != BINARY_MAGIC:
+        raise RecordError("bad magic")
+    date = datetime.datetime(year, month, day, hour, minute, second).strftime(DATE_FORMAT)
+    return date, game_time, count
+
+
+def write_binary_record(path, date, game_time, moves):
+    atomic_write(path, encode_record(date, game_time, moves))
+
+
+def read_binary_record(path):
+    return decode_record(Path(path).read_bytes())
+
+
+def read_record(path):
+    """
+    Wczytuje zapis gry w formacie JSON lub binarnym (według rozszerzenia pliku).
+    """
+    if Path(path).suffix == BINARY_SUFFIX:
+        return read_binary_record(path)
+    return read_json_record(path)
+
+
+def write_json_record(path, date, game_time, moves):
+    data = {
+        "date": date,
+        "time": int(game_time),
+        "moves": [move_to_dict(move) for move in moves]
+    }
+    atomic_write(path, json.dumps(data, indent=4))
+
+
+# Strumieniowe wczytywanie zapisów
+STREAM_CHUNK_SIZE = 65536  # Rozmiar bloku czytanego z pliku (znaki JSON lub bajty)
+STREAM_MOVES = 64  # Liczba ruchów wczytywanych naraz przez `MoveStream.load`
+_JSON_DECODER = json.JSONDecoder()
+_JSON_WHITESPACE = re.compile(r"\s*")
+
+
+class _JsonReader:
+    """
+    Czyta kolejne wartości JSON z pliku blokami, bez wczytywania całego pliku.
+    """
+    def __init__(self, fp) -> None:
+        self.fp = fp
+        self.buffer = ""
+        self.pos = 0
+        self.eof = False
+
+    def _fill(self):
+        chunk = self.fp.read(STREAM_CHUNK_SIZE)
+        if not chunk:
+            self.eof = True
+            return False
+        self.buffer = self.buffer[self.pos:] + chunk
+        self.pos = 0
+        return True
+
+    def peek(self):
+        while True:
+            self.pos = _JSON_WHITESPACE.match(self.buffer, self.pos).end()
+            if self.pos < len(self.buffer):
+                return self.buffer[self.pos]
+            if not self._fill():
+                return ""
+
+    def expect(self, *chars):
+        char = self.peek()
+        if char not in chars:
+            raise RecordError(f"expected {' or '.join(chars)} at offset {self.pos}")
+        self.pos += 1
+        return char
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = _JSON_DECODER.raw_decode(self.buffer, self.pos)
+            except json.JSONDecodeError as e:
+                if self.eof:
+                    raise RecordError(e)
+            else:
+                # Liczba na końcu bloku mogła zostać ucięta
+                if end < len(self.buffer) or self.eof:
+                    self.pos = end
+                    return value
+            self._fill()
+
+
+def _json_stream(path):
+    """
+    Otwiera zapis JSON i czyta pola aż do listy ruchów.
+
+    Returns:
+        tuple: (data, czas gry, iterator ruchów, None - liczba ruchów nie jest znana).
+    """
+    fp = Path(path).open("r")
+    try:
+        reader = _JsonReader(fp)
+        header = {}
+
+        def rest():
+            # Pola po liście ruchów
+            while reader.expect(",", "}") == ",":
+                key = reader.value()
+                reader.expect(":")
+                header[key] = reader.value()
+
+        def moves():
+            reader.expect("[")
+            if reader.peek() == "]":
+                reader.pos += 1
+                return
+            while True:
+                yield move_from_dict(reader.value())
+                if reader.expect(",", "]") == "]":
+                    return
+
+        reader.expect("{")
+        separator = "," if reader.peek() != "}" else reader.expect("}")
+        while separator == "," and "moves" not in header:
+            key = reader.value()
+            reader.expect(":")
+            if key == "moves":
+                header["moves"] = None
+            else:
+                header[key] = reader.value()
+                separator = reader.expect(",", "}")
+
+        if "moves" not in header:
+            raise RecordError("missing key moves")
+        if "date" in header and "time" in header:
+            return header["date"], header["time"], _closing(fp, moves(), rest), None
+
+        # Data lub czas zapisane po ruchach - ruchy trzeba wczytać od razu
+        move_list = list(moves())
+        rest()
+        fp.close()
+        for key in REQUIRED_KEYS:
+            if key not in header:
+                raise RecordError(f"missing key {key}")
+        return header["date"], header["time"], iter(move_list), len(move_list)
+    except BaseException:
+        fp.close()
+        raise
+
+
+def _closing(fp, moves, rest=None):
+    try:
+        yield from moves
+        if rest:
+            rest()
+    finally:
+        fp.close()
+
+
+def _binary_stream(path):
+    """
+    Otwiera zapis binarny i czyta ruchy blokami przez `memoryview`.
+
+    Returns:
+        tuple: (data, czas gry, iterator ruchów, liczba ruchów).
+    """
+    fp = Path(path).open("rb")
+    try:
+        date, game_time, count = decode_header(fp.read(BINARY_HEADER.size))
+        if fp.seek(0, os.SEEK_END) != BINARY_HEADER.size + count * BINARY_MOVE.size:
+            raise RecordError("truncated moves")
+        fp.seek(BINARY_HEADER.size)
+    except BaseException:
+        fp.close()
+        raise
+
+    def moves():
+        chunk_size = STREAM_CHUNK_SIZE - STREAM_CHUNK_SIZE % BINARY_MOVE.size
+        while chunk := fp.read(chunk_size):
+            for (code,) in BINARY_MOVE.iter_unpack(memoryview(chunk)):
+                yield decode_move(code)
+
+    return date, game_time, _closing(fp, moves()), count
+
+
+def iter_record(path):
+    """
+    Strumieniowo wczytuje zapis gry w formacie JSON lub binarnym.
+
+    Ruchy są odczytywane z pliku w miarę przeglądania iteratora, więc w pamięci nie jest
+    przechowywana cała partia.
+
+    Returns:
+        tuple: (data, czas gry w sekundach, iterator ruchów `shogi.Move`).
+
+    Raises:
+        RecordError: Gdy nagłówek pliku nie jest poprawny.
+    """
+    date, game_time, moves, _ = _open_stream(path)
+    return date, game_time, moves
+
+
+def _open_stream(path):
+    if Path(path).suffix == BINARY_SUFFIX:
+        return _binary_stream(path)
+    return _json_stream(path)
+
+
+class MoveStream:
+    """
+    Leniwa lista ruchów zapisanej gry.
+
+    Ruchy są wczytywane z pliku dopiero przy pierwszym odwołaniu (lub partiami przez `load`)
+    i zapamiętywane, więc gra może być wyświetlana zanim zostanie wczytana w całości.
+
+    Atrybuty:
+        date (str): Data gry.
+        time (int): Czas gry w sekundach.
+        count (int or None): Liczba ruchów z nagłówka (None, jeśli nie jest znana, np. dla JSON).
+        complete (bool): Czy wszystkie ruchy zostały już wczytane.
+
+    Metody:
+        load(limit=None):
+            Wczytuje do `limit` kolejnych ruchów (wszystkie, gdy None). Zwraca True, jeśli zostały jeszcze ruchy.
+        available:
+            Liczba ruchów znanych bez czytania pliku (z nagłówka albo już wczytanych).
+    """
+    def __init__(self, date, time, moves, count=None) -> None:
+        self.date = date
+        self.time = time
+        self.count = count
+        self.complete = False
+        self._source = iter(moves)
+        self._moves = []
+
+    def load(self, limit=None):
+        if self.complete:
+            return False
+        before = len(self._moves)
+        self._moves.extend(itertools.islice(self._source, limit))
+        if limit is None or len(self._moves) - before < limit:
+            self.complete = True
+        return not self.complete
+
+    @property
+    def available(self):
+        return self.count if self.count is not None else len(self._moves)
+
+    def _load_until(self, index):
+        while len(self._moves) <= index and self.load(max(STREAM_MOVES, index + 1 - len(self._moves))):
+            pass
+
+    def __len__(self):
+        if self.count is not None:
+            return self.count
+        self.load()
+        return len(self._moves)
+
+    def __bool__(self):
+        self._load_until(0)  # Bez wczytywania całej gry, jak zrobiłby to __len__
+        return bool(self._moves)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            if index.stop is None or index.stop < 0 or (index.start or 0) < 0:
+                self.load()
+            else:
+                self._load_until(index.stop - 1)
+        elif index < 0:
+            self.load()
+        else:
+            self._load_until(index)
+        return self._moves[index]
+
+    def __iter__(self):
+        index = 0
+        while True:
+            try:
+                yield self[index]
+            except IndexError:
+                return
+            index += 1
+
+    def __eq__(self, other):
+        try:
+            return list(self) == list(other)
+        except TypeError:
+            return NotImplemented
+
+
+def open_record(path):
+    """
+    Otwiera zapis gry (JSON lub binarny) jako leniwą listę ruchów `MoveStream`.
+
+    Raises:
+        RecordError: Gdy nagłówek pliku nie jest poprawny.
+    """
+    return MoveStream(*_open_stream(path))
+
+
+def convert_record(source, target):
+    """
+    Konwertuje zapis gry między formatem JSON a binarnym (według rozszerzeń plików).
+    """
+    date, game_time, moves = read_record(source)
+    if Path(target).suffix == BINARY_SUFFIX:
+        write_binary_record(target, date, game_time, moves)
+    else:
+        write_json_record(target, date, game_time, moves)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Konwersja zapisów gier między formatem JSON a binarnym (.shg).")
+    parser.add_argument("source", help="Plik źródłowy (.json lub .shg).")
+    parser.add_argument("target", help="Plik docelowy (.json lub .shg).")
+    args = parser.parse_args(argv)
+    convert_record(args.source, args.target)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,202 @@
+import copy
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, CancelledError
+import pygame
+from engine import Engine, MAX_DEPTH, TIME_LIMIT
+from positions import PositionBoard
+
+
+# Zdarzenia Pygame wysyłane przez usługę wyszukiwania
+ENGINE_INFO = pygame.USEREVENT + 1  # Postęp wyszukiwania (głębokość, węzły, wariant)
+ENGINE_RESULT = pygame.USEREVENT + 2  # Wynik wyszukiwania (najlepszy ruch)
+ENGINE_EVENTS = [ENGINE_INFO, ENGINE_RESULT]
+
+# Stan procesu roboczego
+_info_queue = None
+_active_search = None
+_stop_search = None
+
+
+class SearchServiceError(Exception):
+    def __init__(self, error) -> None:
+        super().__init__(f"Search service error: {error}")
+
+
+class TimeControl:
+    """
+    Kontrola czasu gry komputera: czas całkowity, dodatek za ruch i planowana liczba ruchów.
+
+    Atrybuty:
+        remaining (float): Pozostały czas w sekundach.
+        increment (float): Czas dodawany po każdym ruchu.
+        moves_to_go (int): Liczba ruchów, na które dzielony jest pozostały czas.
+    """
+    def __init__(self, total, increment=0.0, moves_to_go=30) -> None:
+        self.remaining = total
+        self.increment = increment
+        self.moves_to_go = moves_to_go
+
+    def budget(self):
+        """
+        Zwraca czas przeznaczony na najbliższy ruch.
+        """
+        budget = self.remaining / self.moves_to_go + self.increment
+        return max(0.05, min(budget, self.remaining / 2))
+
+    def spend(self, seconds):
+        """
+        Odejmuje zużyty czas i dodaje dodatek za ruch.
+        """
+        self.remaining = max(0.0, self.remaining - seconds) + self.increment
+
+
+def _init_worker(info_queue, active_search, stop_search):
+    global _info_queue, _active_search, _stop_search
+    _info_queue = info_queue
+    _active_search = active_search
+    _stop_search = stop_search
+
+
+def _should_stop(search_id):
+    return _active_search.value != search_id or _stop_search.value == search_id
+
+
+def _run_search(search_id, sfen, moves, max_depth, time_limit):
+    """
+    Wykonuje wyszukiwanie w procesie roboczym i zwraca wynik w postaci prostych typów.
+    """
+    board = PositionBoard(sfen)
+    for usi in moves:
+        board.push_usi(usi)
+
+    def on_info(info):
+        _info_queue.put((search_id, info.depth, info.score, info.nodes, info.nps, [move.usi() for move in info.pv]))
+
+    engine = Engine(max_depth, time_limit, stop_check=lambda: _should_stop(search_id))
+    result = engine.search(board, on_info=on_info)
+    move = result.move.usi() if result.move else None
+    return search_id, move, result.depth, result.score, result.nodes, result.nps, result.elapsed, [m.usi() for m in result.pv]
+
+
+class SearchService:
+    """
+    Asynchroniczna usługa wyszukiwania ruchów w puli procesów.
+
+    Wyszukiwanie działa w osobnym procesie (wątki nie pomogą ze względu na GIL), dzięki czemu
+    pętla Pygame nie jest blokowana. Postęp i wynik są przekazywane przez kolejkę zdarzeń Pygame
+    jako zdarzenia `ENGINE_INFO` (atrybuty: search_id, depth, score, nodes, nps, pv) oraz
+    `ENGINE_RESULT` (dodatkowo: move, elapsed).
+
+    Atrybuty:
+        max_depth (int): Maksymalna głębokość wyszukiwania.
+        time_limit (float): Domyślny czas na ruch w sekundach.
+        time_control (TimeControl or None): Kontrola czasu; jeśli ustawiona, wyznacza czas na ruch.
+        search_id (int): Identyfikator ostatnio rozpoczętego wyszukiwania.
+
+    Metody:
+        start(board):
+            Rozpoczyna wyszukiwanie dla pozycji i zwraca jego identyfikator.
+        stop():
+            Kończy wyszukiwanie natychmiast, zwracając najlepszy dotąd znaleziony ruch.
+        cancel():
+            Przerywa wyszukiwanie bez zwracania wyniku.
+        is_thinking():
+            Sprawdza, czy trwa wyszukiwanie.
+        shutdown():
+            Zamyka pulę procesów.
+
+    Uwagi:
+        Zdarzenia mogą być wysyłane z wątków pomocniczych; `pygame.event.post` jest bezpieczne wątkowo.
+    """
+    def __init__(self, max_depth=MAX_DEPTH, time_limit=TIME_LIMIT, time_control=None, workers=1) -> None:
+        self.max_depth = max_depth
+        self.time_limit = time_limit
+        self.time_control = time_control
+        self.search_id = 0
+        self._future = None
+
+        context = multiprocessing.get_context("spawn")  # Bez kopiowania stanu SDL do procesów potomnych
+        self._info_queue = context.Queue()
+        self._active_search = context.Value('i', 0)
+        self._stop_search = context.Value('i', 0)
+        self._executor = ProcessPoolExecutor(
+            max_workers=workers, mp_context=context, initializer=_init_worker,
+            initargs=(self._info_queue, self._active_search, self._stop_search))
+
+        self._listener = threading.Thread(target=self._forward_info, daemon=True)
+        self._listener.start()
+
+    def start(self, board, time_limit=None):
+        """
+        Rozpoczyna wyszukiwanie najlepszego ruchu; poprzednie wyszukiwanie jest anulowane.
+
+        Args:
+            board (shogi.Board): Pozycja wraz z historią ruchów (do wykrywania powtórzeń).
+            time_limit (float or None): Czas na ruch; domyślnie z kontroli czasu lub `self.time_limit`.
+
+        Returns:
+            int: Identyfikator wyszukiwania.
+        """
+        self.cancel()
+        if time_limit is None:
+            time_limit = self.time_control.budget() if self.time_control else self.time_limit
+
+        # Pozycja początkowa i ruchy, aby proces roboczy odtworzył historię powtórzeń
+        root = copy.deepcopy(board)
+        while root.move_stack:
+            root.pop()
+        moves = [move.usi() for move in board.move_stack]
+
+        self.search_id += 1
+        self._active_search.value = self.search_id
+        try:
+            self._future = self._executor.submit(
+                _run_search, self.search_id, root.sfen(), moves, self.max_depth, time_limit)
+        except RuntimeError as e:
+            raise SearchServiceError(e)
+        self._future.add_done_callback(self._post_result)
+        return self.search_id
+
+    def stop(self):
+        self._stop_search.value = self.search_id
+
+    def cancel(self):
+        self._active_search.value = 0
+
+    def is_thinking(self):
+        return self._future is not None and not self._future.done() and self._active_search.value == self.search_id
+
+    def shutdown(self):
+        self.cancel()
+        self._executor.shutdown(wait=True, cancel_futures=True)
+        self._info_queue.put(None)  # Zakończ wątek przekazujący postęp
+
+    def _post_result(self, future):
+        try:
+            search_id, move, depth, score, nodes, nps, elapsed, pv = future.result()
+        except CancelledError:
+            return
+        except Exception:
+            # Błąd procesu roboczego - okno gry nie może czekać w nieskończoność
+            search_id, move, depth, score, nodes, nps, elapsed, pv = self.search_id, None, 0, 0, 0, 0, 0.0, []
+        if search_id != self._active_search.value:
+            return  # Wyszukiwanie anulowane
+        if self.time_control:
+            self.time_control.spend(elapsed)
+        self._post(ENGINE_RESULT, search_id=search_id, move=move, depth=depth, score=score,
+                   nodes=nodes, nps=nps, elapsed=elapsed, pv=pv)
+
+    def _forward_info(self):
+        while True:
+            info = self._info_queue.get()
+            if info is None:
+                return
+            search_id, depth, score, nodes, nps, pv = info
+            if search_id == self._active_search.value:
+                self._post(ENGINE_INFO, search_id=search_id, depth=depth, score=score, nodes=nodes, nps=nps, pv=pv)
+
+    def _post(self, event_type, **attributes):
+        # Kolejka zdarzeń działa także bez okna (aplikacja `headless`); zdarzenia są pomijane dopiero po `pygame.quit()`
+        if pygame.get_init():
+            pygame.event.post(pygame.event.Event(event_type, attributes))
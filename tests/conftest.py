@@ -0,0 +1,23 @@
+import pygame
+import pytest
+
+
+@pytest.fixture(scope="session", autouse=True)
+def pygame_session():
+    """
+    Inicjalizuje Pygame raz dla wszystkich testów i zamyka je na końcu sesji.
+
+    Testy nie wywołują `pygame.quit()`: zamknięcie unieważnia powierzchnię ekranu (`display Surface quit`)
+    używaną przez kolejne pliki testów.
+    """
+    pygame.init()
+    yield
+    pygame.quit()
+
+
+@pytest.fixture
+def quit_hooks(monkeypatch):
+    """Zbiera funkcje rejestrowane przez `pygame.register_quit`, aby test mógł je wywołać bez zamykania Pygame."""
+    hooks = []
+    monkeypatch.setattr(pygame, "register_quit", hooks.append)
+    return hooks
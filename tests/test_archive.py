@@ -0,0 +1,49 @@
+import shogi
+from archive import GameArchive, import_games, INDEX_ENTRY
+
+
+def make_moves(usi_moves):
+    return [shogi.Move.from_usi(usi) for usi in usi_moves]
+
+
+def test_append_and_read(tmp_path):
+    """Partie są dostępne po identyfikatorze, także po ponownym otwarciu archiwum."""
+    path = tmp_path / "games.db"
+    with GameArchive(path) as archive:
+        first = archive.append("2025-01-12 12:00:00", 60, make_moves(["7g7f", "3c3d"]))
+        second = archive.append("2025-02-01 08:30:00", 300, make_moves(["2g2f", "8c8d", "B*5e"]))
+        assert (first, second) == (0, 1)
+        assert archive.read(1) == ("2025-02-01 08:30:00", 300, make_moves(["2g2f", "8c8d", "B*5e"]))
+
+    with GameArchive(path) as archive:
+        assert len(archive) == 2
+        assert archive.metadata(0) == {"date": "2025-01-12 12:00:00", "time": 60, "moves": 2}
+        assert archive.ids_by_time() == [1, 0]
+        assert archive.ids_by_date("2025-01") == [0]
+        assert archive.read(0)[2] == make_moves(["7g7f", "3c3d"])
+
+
+def test_recovery_after_interrupted_append(tmp_path):
+    """Niedokończony wpis jest odcinany, a brakujący indeks odtwarzany z pliku danych."""
+    path = tmp_path / "games.db"
+    with GameArchive(path) as archive:
+        archive.append("2025-01-12 12:00:00", 60, make_moves(["7g7f"]))
+        size = path.stat().st_size
+
+    with path.open("ab") as fp:
+        fp.write(b"\x40\x00\x00\x00SHG1")  # Wpis przerwany w trakcie zapisu
+    with GameArchive(path) as archive:
+        assert len(archive) == 1
+    assert path.stat().st_size == size
+
+    archive.index_path.unlink()
+    with GameArchive(path) as archive:
+        assert len(archive) == 1
+        assert archive.index_path.stat().st_size == INDEX_ENTRY.size
+
+
+def test_import_saved_games(tmp_path):
+    """Import zapisanych plików JSON do archiwum."""
+    with GameArchive(tmp_path / "games.db") as archive:
+        assert import_games(archive, ["Top10"]) == []
+        assert len(archive) > 0
@@ -0,0 +1,101 @@
+import threading
+import time
+import pytest
+import pygame
+from chess import GlyphCache, AssetManager, BLACK, WHITE
+
+
+@pytest.fixture
+def cache():
+    """Fixture tworzący małą pamięć podręczną napisów."""
+    return GlyphCache(max_size=2)
+
+
+def test_render_returns_cached_surface(cache):
+    """Ten sam klucz zwraca tę samą powierzchnię bez ponownego renderowania."""
+    first = cache.render('P', font_size=40, color=BLACK)
+    second = cache.render('P', font_size=40, color=BLACK)
+    assert first is second
+    assert len(cache.glyphs) == 1
+
+
+def test_outline_is_separate_key(cache):
+    """Napis z obwódką jest większy i przechowywany pod innym kluczem."""
+    plain = cache.render('K', font_size=40, color=WHITE)
+    outlined = cache.render('K', font_size=40, color=WHITE, outline=True)
+    assert plain is not outlined
+    assert outlined.get_width() == plain.get_width() + 2
+
+
+def test_lru_eviction(cache):
+    """Najdawniej użyty napis jest usuwany po przekroczeniu limitu."""
+    cache.render('a')
+    cache.render('b')
+    cache.render('a')
+    cache.render('c')
+    texts = [key[0] for key in cache.glyphs]
+    assert texts == ['a', 'c']
+
+
+def test_cleared_on_quit(cache, quit_hooks):
+    """Zamknięcie Pygame czyści czcionki, które przestają być ważne."""
+    cache.render('x')
+    assert quit_hooks == [cache.clear]
+    for hook in quit_hooks:
+        hook()
+    assert not cache.fonts
+    assert not cache.glyphs
+
+
+def test_assets_loaded_once(quit_hooks):
+    """Obraz tła jest wczytywany z dysku tylko raz, a skalowane wersje są zapamiętywane."""
+    pygame.display.set_mode((960, 720))
+    assets = AssetManager()
+    assets.preload()
+
+    scaled = assets.scaled("pictures/background.jpg", (960, 720))
+    assert scaled.get_size() == (960, 720)
+    assert assets.scaled("pictures/background.jpg", (960, 720)) is scaled
+    assert assets.image("pictures/background.jpg") is assets.image("./pictures/background.jpg")
+    for hook in quit_hooks:  # Zamknięcie Pygame
+        hook()
+    assert not assets.images
+
+
+def test_first_use_waits_only_for_its_image(tmp_path, monkeypatch):
+    """Pierwsze użycie obrazu nie czeka na wczytywane w tle pliki, o które nie prosi."""
+    for name in ["a.png", "b.png"]:
+        pygame.image.save(pygame.Surface((4, 4)), str(tmp_path / name))
+    release = threading.Event()
+    load = pygame.image.load
+
+    def slow_load(path):
+        if path.endswith("a.png"):
+            assert release.wait(5)  # Wątek w tle utyka na pierwszym pliku
+        return load(path)
+
+    monkeypatch.setattr(pygame.image, "load", slow_load)
+    assets = AssetManager()
+    assets.preload(tmp_path, "*.png")
+    start = time.perf_counter()
+    assert assets.image(tmp_path / "b.png").get_size() == (4, 4)
+    assert time.perf_counter() - start < 1  # Bez czekania na a.png
+    release.set()
+    assert assets.image(tmp_path / "a.png").get_size() == (4, 4)
+
+
+def test_images_converted_after_display_is_created(monkeypatch):
+    """Obraz użyty przed utworzeniem ekranu jest konwertowany przy pierwszym użyciu po `set_mode`."""
+    screen = pygame.display.set_mode((960, 720))
+    monkeypatch.setattr(pygame.display, "get_surface", lambda: None)  # Ekran jeszcze nie istnieje
+    assets = AssetManager()
+    early = assets.scaled("pictures/background.jpg", (96, 72))
+    assert not assets.images
+    assert assets.scaled("pictures/background.jpg", (96, 72)) is early
+
+    monkeypatch.undo()  # Utworzenie ekranu
+    converted = assets.scaled("pictures/background.jpg", (96, 72))
+    assert converted is not early
+    assert converted.get_bitsize() == screen.get_bitsize()
+    assert "pictures/background.jpg" in assets.images
+    assert assets.scaled("pictures/background.jpg", (96, 72)) is converted
@@ -0,0 +1,109 @@
+import csv
+import json
+import shogi
+import batch_analysis
+from archive import GameArchive
+from batch_analysis import analyse_moves, analyse_games, write_report, main
+from records import move_to_dict, write_binary_record
+
+
+def write_game(path, usi_moves):
+    data = {
+        "date": "2025-01-12 12:00:00",
+        "time": 60,
+        "moves": [move_to_dict(shogi.Move.from_usi(usi)) for usi in usi_moves]
+    }
+    path.write_text(json.dumps(data))
+
+
+def test_analyse_moves_statistics():
+    """Statystyki obejmują bicia, dostawienia, promocje i szachy."""
+    moves = [shogi.Move.from_usi(usi) for usi in ["7g7f", "3c3d", "8h2b+", "3a2b", "B*4e"]]
+    stats = analyse_moves(moves)
+    assert stats["plies"] == 5
+    assert stats["captures"] == 2
+    assert stats["drops"] == 1
+    assert stats["promotions"] == 1
+    assert stats["result"] == "unfinished"
+
+
+def test_analyse_games_report(tmp_path):
+    """Raport zawiera wiersz dla każdego pliku, także uszkodzonego."""
+    write_game(tmp_path / "game1.json", ["7g7f", "3c3d"])
+    (tmp_path / "broken.json").write_text("INVALID JSON")
+
+    rows = analyse_games([tmp_path], workers=1)
+    by_file = {row["file"]: row for row in rows}
+    assert by_file[str(tmp_path / "game1.json")]["plies"] == 2
+    assert by_file[str(tmp_path / "broken.json")]["error"]
+
+    output = tmp_path / "report.csv"
+    write_report(rows, output)
+    with output.open() as fp:
+        assert len(list(csv.DictReader(fp))) == 2
+
+
+def test_analyse_games_reads_binary_records(tmp_path):
+    """Pliki w formacie binarnym są analizowane tak samo jak JSON."""
+    moves = [shogi.Move.from_usi(usi) for usi in ["7g7f", "3c3d"]]
+    write_binary_record(tmp_path / "game1.shg", "2025-01-12 12:00:00", 60, moves)
+
+    rows = analyse_games([tmp_path], workers=1)
+    assert rows[0]["plies"] == 2
+    assert rows[0]["time"] == 60
+
+
+def test_analyse_games_reads_archives(tmp_path):
+    """Partie z archiwum są analizowane strumieniowo, każda w osobnym wierszu."""
+    with GameArchive(tmp_path / "games.db") as archive:
+        archive.append("2025-01-12 12:00:00", 60, [shogi.Move.from_usi(usi) for usi in ["7g7f", "3c3d"]])
+        archive.append("2025-01-13 12:00:00", 90, [shogi.Move.from_usi("2g2f")])
+
+    rows = analyse_games([tmp_path / "games.db"], workers=1)
+    assert [row["plies"] for row in rows] == [2, 1]
+    assert rows[1]["file"].endswith("games.db#1")
+
+
+def write_archive(path, count):
+    with GameArchive(path) as archive:
+        for index in range(count):
+            moves = [shogi.Move.from_usi(usi) for usi in ["7g7f", "3c3d", "2g2f"][:index % 3 + 1]]
+            archive.append("2025-01-12 12:00:00", 60 + index, moves)
+
+
+def test_analyse_archive_in_parallel_chunks(tmp_path, monkeypatch):
+    """Zakresy identyfikatorów archiwum trafiają do puli procesów, a kolejność wierszy jest zachowana."""
+    write_archive(tmp_path / "games.db", 7)
+    monkeypatch.setattr(batch_analysis, "CHUNK_SIZE", 2)
+
+    rows = analyse_games([tmp_path / "games.db"], workers=2)
+    assert [row["file"] for row in rows] == [f"{tmp_path / 'games.db'}#{game_id}" for game_id in range(7)]
+    assert [row["plies"] for row in rows] == [index % 3 + 1 for index in range(7)]
+    assert [row["time"] for row in rows] == [60 + index for index in range(7)]
+
+
+def test_analyse_archive_reports_broken_game(tmp_path, monkeypatch):
+    """Błąd jednej partii z archiwum daje wiersz z opisem błędu i nie przerywa analizy."""
+    write_archive(tmp_path / "games.db", 3)
+    analyse = batch_analysis.analyse_moves
+
+    def failing(moves):
+        moves = list(moves)
+        if len(moves) == 2:
+            raise TypeError("uszkodzony ruch")
+        return analyse(moves)
+
+    monkeypatch.setattr(batch_analysis, "analyse_moves", failing)
+    rows = analyse_games([tmp_path / "games.db"], workers=1)
+    assert [row["error"] for row in rows] == ["", "uszkodzony ruch", ""]
+    assert rows[2]["plies"] == 3
+
+
+def test_main_analyses_default_archive(tmp_path, monkeypatch):
+    """Bez podanych ścieżek analizowane jest archiwum partii aplikacji."""
+    monkeypatch.chdir(tmp_path)
+    write_archive(tmp_path / "games.db", 2)
+
+    assert main(["-o", "report.json", "-w", "1"]) == 0
+    rows = json.loads((tmp_path / "report.json").read_text())
+    assert [row["file"] for row in rows] == ["games.db#0", "games.db#1"]
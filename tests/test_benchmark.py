@@ -0,0 +1,34 @@
+import json
+import pytest
+from benchmark import compare, main, run_benchmarks, BenchmarkError
+
+
+def stats(median):
+    return {"min": median, "median": median, "mean": median, "stdev": 0.0, "rounds": 5}
+
+
+def test_compare_flags_regressions_and_improvements():
+    baseline = {"a": stats(1.0), "b": stats(1.0), "c": stats(1.0), "gone": stats(1.0)}
+    current = {"a": stats(1.1), "b": stats(1.5), "c": stats(0.5), "added": stats(1.0)}
+    statuses = {row[0]: row[4] for row in compare(baseline, current, threshold=0.2)}
+    assert statuses == {"a": "ok", "b": "regression", "c": "improvement", "gone": "missing", "added": "new"}
+
+
+def test_run_and_compare_command(tmp_path):
+    data = run_benchmarks(["draw_pieces", "leaderboard"], sizes=[10], min_time=0)
+    assert set(data["benchmarks"]) == {"draw_pieces", "update_leaderboard[10]", "leaderboard_rebuild[10]"}
+    assert all(result["rounds"] >= 5 for result in data["benchmarks"].values())
+
+    baseline = tmp_path / "baseline.json"
+    baseline.write_text(json.dumps(data))
+    assert main(["compare", str(baseline), str(baseline)]) == 0
+
+    slower = {"benchmarks": {name: stats(result["median"] * 2) for name, result in data["benchmarks"].items()}}
+    current = tmp_path / "current.json"
+    current.write_text(json.dumps(slower))
+    assert main(["compare", str(baseline), str(current)]) == 1
+
+
+def test_unknown_benchmark():
+    with pytest.raises(BenchmarkError):
+        run_benchmarks(["no_such_case"], sizes=[])
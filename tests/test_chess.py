@@ -1,15 +1,19 @@
 import pytest
 import pygame
+import shogi
+from unittest.mock import MagicMock
 from app import App
+from archive import GameArchive
+from journal import GameJournal
 from chess import MainWindow, GameWindow, AnaliseWindow
 
 
 @pytest.fixture
-def app_instance():
-    """Fixture tworzący instancję klasy App."""
+def app_instance(tmp_path):
+    """Fixture tworzący instancję klasy App z archiwum i dziennikiem w katalogu tymczasowym."""
     pygame.init()
     screen = pygame.display.set_mode((960, 720))  # Rozmiar okna
-    app = App()
+    app = App(archive_path=tmp_path / "games.db", journal_path=tmp_path / "game.wal", legacy_dirs=())
     app.screen = screen  # Przypisanie ekranu Pygame
     return app
 
@@ -66,8 +70,69 @@ def test_update_analise_window(app_instance):
     # Brak błędów wskazuje, że metoda `update` działa poprawnie
 
 
-@pytest.fixture(autouse=True)
-def teardown():
-    """Zamyka Pygame po zakończeniu testów."""
-    yield
-    pygame.quit()
\ No newline at end of file
+def test_wait_events_idle_and_active(app_instance):
+    """Menu czeka na zdarzenia; biegnący czas gry przełącza pętlę na stałe tempo klatek."""
+    ticks = []
+    app_instance.clock = MagicMock(tick=lambda fps=0: ticks.append(fps))
+    app_instance.current_window = "main"
+    pygame.event.clear()
+    pygame.event.post(pygame.event.Event(pygame.USEREVENT))
+    events = app_instance.wait_events()
+    assert [event.type for event in events] == [pygame.USEREVENT]
+    assert ticks == [0]  # Brak taktowania - pętla spała w `pygame.event.wait`
+
+    app_instance.current_window = "game"
+    app_instance.game = GameWindow(app_instance.screen)
+    assert not app_instance.game.needs_frames()  # Przed pierwszym ruchem zegar stoi
+    app_instance.game.start_time = 0
+    app_instance.wait_events()
+    assert ticks[-1] == app_instance.game.target_fps
+
+
+def test_menu_opens_games_from_archive(tmp_path):
+    """Nowe archiwum importuje dawne zapisy JSON; przyciski menu otwierają partie z archiwum."""
+    pygame.init()
+    app = App(archive_path=tmp_path / "games.db", journal_path=tmp_path / "game.wal", legacy_dirs=("Top10",),
+              screen=pygame.Surface((960, 720)))
+    main_window = app.main_window
+    assert len(main_window.game_buttons) == min(len(app.archive), 10)
+
+    button = main_window.game_buttons[0]
+    analise = main_window.open_saved_games(button.center)
+    assert analise.game.time == app.archive.game_time(main_window.game_ids[0])
+    assert not (tmp_path / "History").exists()
+    app.archive.close()
+
+
+def test_menu_buttons_use_game_metadata(tmp_path):
+    """Przyciski menu są opisane czasem gry i liczbą ruchów z indeksu archiwum, od najdłuższej partii."""
+    pygame.init()
+    archive = GameArchive(tmp_path / "games.db")
+    archive.append("2025-01-12 12:00:00", 65, [shogi.Move.from_usi("7g7f")])
+    archive.append("2025-01-13 12:00:00", 600, [shogi.Move.from_usi("7g7f"), shogi.Move.from_usi("3c3d")])
+    main_window = MainWindow(pygame.Surface((960, 720)), archive=archive)
+
+    assert [button.text for button in main_window.game_buttons] == ["TOP 1  10:00  2 moves", "TOP 2  01:05  1 move"]
+    assert main_window.game_ids == [1, 0]
+    archive.close()
+
+
+def test_resume_rewrites_journal_once(tmp_path, monkeypatch):
+    """Wznowienie partii zastępuje dziennik jednym zapisem, który już zawiera wznowione ruchy."""
+    pygame.init()
+    path = tmp_path / "game.wal"
+    journal = GameJournal(path)
+    journal.start()
+    for usi in ["7g7f", "3c3d"]:
+        journal.push(shogi.Move.from_usi(usi), elapsed=5)
+    journal.flush(elapsed=5)
+
+    starts = []
+    start = GameJournal.start
+    monkeypatch.setattr(GameJournal, "start", lambda self, *args: starts.append(args) or start(self, *args))
+    app = App(archive_path=tmp_path / "games.db", journal_path=path, legacy_dirs=(), screen=pygame.Surface((960, 720)))
+    assert app.current_window == "game"
+    assert len(starts) == 1
+    assert GameJournal(path).read().moves == [shogi.Move.from_usi("7g7f"), shogi.Move.from_usi("3c3d")]
+    app.archive.close()
+
@@ -0,0 +1,81 @@
+import xml.etree.ElementTree as ET
+import pygame
+import pytest
+import shogi
+import diagrams
+from diagrams import BoardDiagram, export_diagrams, encode_png, hand_text, DiagramError, DIAGRAM_CELL
+from records import write_json_record
+from chess import Button
+
+
+@pytest.fixture
+def saved_game(tmp_path):
+    board = shogi.Board()
+    for usi in ["7g7f", "3c3d", "8h2b+", "3a2b", "B*4e"]:
+        board.push_usi(usi)
+    path = tmp_path / "game.json"
+    write_json_record(path, "2025-01-01 12:00:00", 60, board.move_stack)
+    return path
+
+
+def test_png_diagrams_for_every_ply(saved_game, tmp_path):
+    images = export_diagrams(saved_game, tmp_path / "png", workers=1)
+    assert [image.name for image in images] == [f"game_{ply:03}.png" for ply in range(6)]
+    image = pygame.image.load(str(images[3]))
+    assert image.get_size() == (9 * DIAGRAM_CELL, 11 * DIAGRAM_CELL)
+    assert image.get_at((2, DIAGRAM_CELL + 2)).a == 255
+
+
+def test_incremental_diagram_matches_fresh_drawing():
+    board = shogi.Board()
+    diagram = BoardDiagram()
+    diagram.draw(board)
+    for usi in ["7g7f", "3c3d", "8h2b+"]:
+        board.push_usi(usi)
+        diagram.draw(board)
+    fresh = BoardDiagram().draw(board)
+    assert pygame.image.tobytes(diagram.surface, "RGBA") == pygame.image.tobytes(fresh, "RGBA")
+    assert encode_png(fresh).startswith(b"\x89PNG")
+
+
+def test_incremental_png_redraws_only_changed_squares(monkeypatch, tmp_path):
+    """Po ruchu przerysowywane są tylko pola ze zmienionym kodem figury i pasy figur w ręku."""
+    board = shogi.Board()
+    diagram = BoardDiagram()
+    diagram.png(board)
+    drawn = []
+    draw = Button.draw
+    monkeypatch.setattr(Button, "draw", lambda self, *args, **kwargs: drawn.append(self) or draw(self, *args, **kwargs))
+    board.push_usi("7g7f")
+    data = diagram.png(board)
+    assert sorted(button.id for button in drawn if button.id is not None) == sorted(
+        shogi.SQUARE_NAMES.index(name) for name in ("7g", "7f"))
+    assert len(drawn) == 4  # Dwa pola i dwa pasy figur w ręku (znacznik strony na ruchu)
+
+    path = tmp_path / "diagram.png"
+    path.write_bytes(data)
+    fresh = BoardDiagram().draw(board)
+    assert pygame.image.tobytes(pygame.image.load(str(path)), "RGBA") == pygame.image.tobytes(fresh, "RGBA")
+
+
+def test_svg_diagrams(saved_game, tmp_path):
+    images = export_diagrams(saved_game, tmp_path / "svg", plies=[4, 0, 42], fmt="svg", workers=1)
+    assert [image.name for image in images] == ["game_000.svg", "game_004.svg"]
+    root = ET.fromstring(images[1].read_text())
+    uses = root.findall("{http://www.w3.org/2000/svg}use")
+    assert len(uses) == 40 - 2  # Oba gońce zbite
+    assert hand_text(shogi.Board(shogi.Board().sfen().replace(" - ", " B2p ")), shogi.BLACK) == "b x 1"
+
+
+def test_worker_pool_preserves_order(saved_game, tmp_path, monkeypatch):
+    monkeypatch.setattr(diagrams, "CHUNK_PLIES", 2)
+    images = export_diagrams(saved_game, tmp_path / "pool", workers=2)
+    assert [image.name for image in images] == [f"game_{ply:03}.png" for ply in range(6)]
+    assert all(image.exists() for image in images)
+
+
+def test_invalid_input(saved_game, tmp_path):
+    with pytest.raises(DiagramError):
+        export_diagrams(tmp_path / "missing.json", tmp_path)
+    with pytest.raises(DiagramError):
+        export_diagrams(saved_game, tmp_path, fmt="gif")
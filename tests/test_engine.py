@@ -0,0 +1,35 @@
+import shogi
+from engine import Engine, evaluate, MATE_SCORE
+
+
+def test_evaluate_start_position_is_even():
+    """Pozycja początkowa jest materiałowo równa."""
+    assert evaluate(shogi.Board()) == 0
+
+
+def test_finds_mate_in_one():
+    """Silnik znajduje mata jednym ruchem (dostawienie złotego generała)."""
+    board = shogi.Board('4k4/9/4P4/9/9/9/9/9/4K4 b G 1')
+    result = Engine(max_depth=3, time_limit=10).search(board)
+    assert result.move.usi() == "G*5b"
+    assert result.score >= MATE_SCORE - 3
+
+
+def test_search_does_not_modify_board():
+    """Wyszukiwanie działa na kopii planszy i raportuje liczbę węzłów na sekundę."""
+    board = shogi.Board()
+    infos = []
+    result = Engine(max_depth=2, time_limit=10).search(board, on_info=infos.append)
+
+    assert board == shogi.Board()
+    assert result.move in board.legal_moves
+    assert [info.depth for info in infos] == [1, 2]
+    assert result.nodes > 0 and result.nps > 0
+
+
+def test_respects_time_limit():
+    """Wyszukiwanie kończy się w limicie czasu i zwraca legalny ruch."""
+    board = shogi.Board()
+    result = Engine(max_depth=50, time_limit=0.2).search(board)
+    assert result.move in board.legal_moves
+    assert result.elapsed < 1.0
@@ -6,6 +6,9 @@ from unittest.mock import MagicMock, patch, mock_open
 from pathlib import Path
 from chess import GameWindow, Game, LoadGameError, Button
 from shogi import Move, Board
+from leaderboard import Leaderboard
+from archive import GameArchive
+from journal import GameJournal
 
 
 # Ustawienia planszy
@@ -45,11 +48,9 @@ screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
 
 
 @pytest.fixture(scope="module")
-def pygame_setup():
-    """Inicjalizuje Pygame przed uruchomieniem testów."""
-    pygame.init()
+def pygame_setup(pygame_session):
+    """Inicjalizuje Pygame przed uruchomieniem testów (zamyka je `pygame_session` na końcu sesji)."""
     yield
-    pygame.quit()
 
 
 @pytest.fixture
@@ -138,6 +139,19 @@ def test_load_game_missing_keys(game_window):
             game_window.load_game("game.json")
 
 
+def test_save_and_load_binary_game(game_window, tmp_path):
+    """Partia zapisana w formacie binarnym wczytuje się z tymi samymi ruchami."""
+    for usi in ["7g7f", "3c3d", "8h2b+"]:
+        game_window.board.push_usi(usi)
+    game_window.elapsed_time = 42
+    game_window.save_game(tmp_path, binary=True)
+
+    (path,) = tmp_path.glob("*.shg")
+    game_window.load_game(path)
+    assert game_window.game.moves == game_window.board.move_stack
+    assert game_window.game.time == 42
+
+
 def test_create_margin_buttons(game_window):
     """Testuje poprawne tworzenie przycisków marginesu."""
     game_window.create_margin_buttons()
@@ -169,30 +183,60 @@ def test_create_margin_buttons(game_window):
     assert back_button.height == RECT_SIZE[1]
 
 
-def test_rename_files(game_window):
-    """Testuje poprawne działanie funkcji rename_files."""
-    mock_files = [Path(f"game_{i}.json") for i in range(5)]
-    with patch("pathlib.Path.iterdir", return_value=mock_files):
-        with patch("pathlib.Path.mkdir") as mocked_mkdir:
-            with patch("pathlib.Path.rename") as mocked_rename:
-                # Mockowanie metod prywatnych
-                game_window._normalize_file_names = MagicMock()
-                game_window._load_and_sort_games = MagicMock(return_value=[
-                    MagicMock(get_filename=lambda: f"game_{i}.json", time=120 - i) for i in range(5)
-                ])
-                game_window._assign_top_filenames = MagicMock()
-
-                game_window.rename_files()
+def test_journal_records_moves_and_resumes(pygame_setup, tmp_path):
+    """Ruchy i cofnięcia trafiają do dziennika, z którego nowe okno wznawia partię."""
+    journal = GameJournal(tmp_path / "game.wal")
+    journal.start()
+    game_window = GameWindow(screen, journal=journal)
+    for usi in ["7g7f", "3c3d", "2g2f"]:
+        game_window.push_move(Move.from_usi(usi))
+    game_window.pop_move()
+    journal.flush(elapsed=30)
+
+    resumed = GameWindow(screen)
+    resumed.resume(journal.read())
+    assert resumed.board.move_stack == game_window.board.move_stack
+    assert 29 <= resumed.current_elapsed() <= 31
+
+
+def test_update_leaderboard(game_window, tmp_path):
+    """Nowa partia z archiwum trafia do rankingu; partia, która z niego wypadła, pozostaje w archiwum."""
+    archive = GameArchive(tmp_path / "games.db")
+    for game_time in [300, 100, 200]:
+        archive.append("2025-01-12 12:00:00", game_time, [])
+    Leaderboard(archive, size=3)
+
+    game_window.archive = archive
+    game_window.elapsed_time = 250
+    game_id = archive.append("2025-01-12 12:00:00", 250, [])
+    with patch("chess.Game") as mocked_game:
+        assert game_window.update_leaderboard(game_id, top_limit=3) == [1]
+        mocked_game.assert_not_called()  # Pozostałe partie nie są wczytywane
+
+    assert Leaderboard(archive, size=3).ranking() == [0, 3, 2]
+    assert len(archive) == 4
+    archive.close()
+
+
+def test_finished_game_saved_only_to_archive(pygame_setup, tmp_path, monkeypatch):
+    """Zakończona partia jest zapisywana w archiwum i rankingu, bez pliku JSON."""
+    monkeypatch.chdir(tmp_path)
+    archive = GameArchive(tmp_path / "games.db")
+    window = GameWindow(screen, archive=archive)
+    for usi in ["7g7f", "3c3d"]:
+        window.board.push_usi(usi)
+    window.elapsed_time = 42
+    window.if_game_over()
+
+    assert archive.read(0) == (archive.metadata(0)["date"], 42, list(window.board.move_stack))
+    assert Leaderboard(archive).ranking() == [0]
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["games.db", "games.db.idx", "games.db.top"]
+    archive.close()
 
-                # Sprawdzenie, czy funkcje były wywołane
-                mocked_mkdir.assert_any_call(parents=True, exist_ok=True)
-                game_window._normalize_file_names.assert_called_once()
-                game_window._load_and_sort_games.assert_called_once()
-                game_window._assign_top_filenames.assert_called_once()
 
 import pytest
 from unittest.mock import MagicMock
-from chess import AnaliseWindow, Game
+from chess import AnaliseWindow, Game, ReplayCursor, REPLAY_SNAPSHOT_EVERY
 import shogi
 
 
@@ -229,9 +273,10 @@ def test_make_move(mock_analise_window):
     mock_analise_window.make_move()
 
     # Po wykonaniu ruchu
-    assert len(mock_analise_window.game.moves) == 1  # Jeden ruch pozostał
+    assert len(mock_analise_window.game.moves) == 2  # Zapis gry nie jest modyfikowany
     assert len(mock_analise_window.done_moves) == 1  # Jeden ruch w done_moves
     assert mock_analise_window.done_moves[-1].usi() == "7g7f"  # Ostatni wykonany ruch
+    assert mock_analise_window.board.move_stack[-1].usi() == "7g7f"
 
 
 def test_make_move_no_moves(mock_analise_window):
@@ -252,14 +297,15 @@ def test_back_move(mock_analise_window):
 
     # Przed cofnięciem ruchu
     assert len(mock_analise_window.done_moves) == 1
-    assert len(mock_analise_window.game.moves) == 1
+    assert mock_analise_window.cursor.ply == 1
 
     mock_analise_window.back_move()
 
     # Po cofnięciu ruchu
     assert len(mock_analise_window.done_moves) == 0
-    assert len(mock_analise_window.game.moves) == 2  # Ruch wrócił na początek
-    assert mock_analise_window.game.moves[0].usi() == "7g7f"  # Pierwszy ruch przywrócony
+    assert len(mock_analise_window.game.moves) == 2  # Ruchy gry bez zmian
+    assert mock_analise_window.game.moves[0].usi() == "7g7f"
+    assert mock_analise_window.board == shogi.Board()
 
 
 def test_back_move_no_moves(mock_analise_window):
@@ -269,4 +315,217 @@ def test_back_move_no_moves(mock_analise_window):
     mock_analise_window.back_move()
 
     # Nie powinno być zmian
-    assert len(mock_analise_window.game.moves) == 2  # Ruchy pozostały bez zmian
\ No newline at end of file
+    assert len(mock_analise_window.game.moves) == 2  # Ruchy pozostały bez zmian
+
+@pytest.fixture
+def incremental_window(pygame_setup):
+    """Fixture tworzący instancję GameWindow w trybie renderowania przyrostowego."""
+    return GameWindow(screen, incremental=True)
+
+
+def test_incremental_first_frame_is_full(incremental_window):
+    """Pierwsza klatka przerysowuje cały ekran."""
+    incremental_window.update_window()
+    assert incremental_window.dirty_rects == [screen.get_rect()]
+
+
+def test_incremental_idle_frame_is_empty(incremental_window):
+    """Klatka bez zmian nie przerysowuje niczego."""
+    incremental_window.update_window()
+    incremental_window.update_window()
+    assert incremental_window.dirty_rects == []
+
+
+def test_incremental_move_matches_full_redraw(incremental_window):
+    """Po ruchu przerysowane są tylko zmienione pola, a obraz jest taki jak po pełnym odświeżeniu."""
+    incremental_window.update_window()
+    incremental_window.board.push(Move.from_usi("7g7f"))
+    incremental_window.update_window()
+
+    assert 0 < len(incremental_window.dirty_rects) < 81
+    assert all(rect.width == CELL_SIZE for rect in incremental_window.dirty_rects)
+    incremental_frame = pygame.image.tostring(screen, "RGB")
+
+    incremental_window.invalidate()
+    incremental_window.update_window()
+    assert pygame.image.tostring(screen, "RGB") == incremental_frame
+
+
+def test_legal_moves_cached_across_undo_redo(incremental_window):
+    """Legalne ruchy pozycji są generowane raz, także po cofnięciu i ponowieniu ruchu."""
+    window = incremental_window
+    pawn = window.squares[60]  # 7g
+    assert [square.id for square in window.get_legal_moves(pawn)] == [51]
+
+    window.make_move(pawn, window.squares[51])
+    window.undo_last_move()
+    window.redo_last_move()
+    window.undo_last_move()
+    assert len(window.move_cache.positions) == 1
+
+    with patch.object(Board, "generate_legal_moves", side_effect=AssertionError):
+        assert [square.id for square in window.get_legal_moves(pawn)] == [51]
+
+
+def test_jump_uses_snapshots():
+    """Skok do dowolnego półruchu daje tę samą pozycję co kolejne kroki i nie wymaga więcej niż N ruchów."""
+    usi_moves = ["7g7f", "3c3d", "8h2b+", "3a2b"] + ["2h1h", "8b9b", "1h2h", "9b8b"] * 10
+    moves = [shogi.Move.from_usi(usi) for usi in usi_moves]
+    cursor = ReplayCursor(moves, snapshot_every=8)
+
+    cursor.jump(len(moves))
+    final_sfen = cursor.board.sfen()
+    cursor.jump(3)
+    assert cursor.ply == 3
+    assert cursor.board.move_stack[-1].usi() == "8h2b+"
+
+    pushes = []
+    original_push = shogi.Board.push
+    with patch.object(shogi.Board, "push", autospec=True, side_effect=lambda board, move: (pushes.append(move), original_push(board, move))):
+        cursor.jump(37)
+    assert len(pushes) <= 8
+
+    cursor.jump(len(moves))
+    assert cursor.board.sfen() == final_sfen
+
+
+def test_timeline_drag_jumps_to_ply(mock_analise_window):
+    """Kliknięcie i przeciągnięcie suwaka osi czasu przechodzi do wskazanego półruchu."""
+    from chess import analise_loop
+    window = mock_analise_window
+    timeline = window.timeline
+
+    analise_loop(window, pygame.event.Event(pygame.MOUSEBUTTONDOWN, {"pos": (timeline.right - 1, timeline.centery)}))
+    assert window.cursor.ply == 2
+    analise_loop(window, pygame.event.Event(pygame.MOUSEMOTION, {"pos": (timeline.left, timeline.centery)}))
+    assert window.cursor.ply == 0
+    analise_loop(window, pygame.event.Event(pygame.MOUSEBUTTONUP, {"pos": (timeline.left, timeline.centery)}))
+    analise_loop(window, pygame.event.Event(pygame.MOUSEMOTION, {"pos": (timeline.right - 1, timeline.centery)}))
+    assert window.cursor.ply == 0
+    assert window.board == shogi.Board()
+
+
+def test_analise_window_streams_saved_game(pygame_setup):
+    """Okno analizy pokazuje pierwszą pozycję przed wczytaniem całej gry i doczytuje ruchy w kolejnych klatkach."""
+    from records import read_record
+    window = AnaliseWindow(screen, incremental=True)
+    window.load_game("Top10/TOP 1.json")
+    moves = read_record("Top10/TOP 1.json")[2]
+
+    window.update()
+    assert window.board == shogi.Board()
+    assert 0 < len(window.cursor) < len(moves)
+
+    while window.needs_frames():
+        window.update()
+    assert len(window.cursor) == len(moves)
+    assert max(window.cursor.snapshots) == len(moves) - len(moves) % REPLAY_SNAPSHOT_EVERY
+
+    # Pierwszy skok korzysta z pozycji zapamiętanych przy wczytywaniu, bez odtwarzania całej gry
+    pushes = []
+    original_push = shogi.Board.push
+    with patch.object(shogi.Board, "push", autospec=True, side_effect=lambda board, move: (pushes.append(move), original_push(board, move))):
+        window.jump_to(len(moves))
+    assert len(pushes) <= REPLAY_SNAPSHOT_EVERY
+    assert window.done_moves == moves
+
+
+def test_archived_game_snapshots_prepared_on_load(pygame_setup, tmp_path):
+    """Partia z archiwum (lista ruchów) ma pozycje suwaka zapamiętane od razu po wczytaniu."""
+    usi_moves = ["7g7f", "3c3d", "8h2b+", "3a2b"] + ["2h1h", "8b9b", "1h2h", "9b8b"] * 10
+    archive = GameArchive(tmp_path / "games.db")
+    game_id = archive.append("2025-01-12 12:00:00", 60, [shogi.Move.from_usi(usi) for usi in usi_moves])
+    window = AnaliseWindow(screen)
+    window.load_archived(archive, game_id)
+    assert sorted(window.cursor.snapshots) == list(range(0, len(usi_moves) + 1, REPLAY_SNAPSHOT_EVERY))
+    assert not window.needs_frames()
+    archive.close()
+
+
+def test_promotion_prompt_does_not_block(pygame_setup):
+    """Ruch do strefy promocji otwiera nakładkę; ruch jest wykonywany dopiero po wyborze w kolejnym zdarzeniu."""
+    from chess import game_loop, PROMPT_RECT
+    window = GameWindow(screen, incremental=True)
+    window.board = shogi.Board("4k4/9/9/4P4/9/9/9/9/4K4 b - 1")
+    window.update_window()
+
+    click = lambda pos: pygame.event.Event(pygame.MOUSEBUTTONDOWN, {"pos": pos})
+    game_loop(window, click(window.squares[31].center))  # Pion na 5d
+    assert game_loop(window, click(window.squares[22].center)) == ('game', window)  # Ruch na 5c
+    assert window.promotion_prompt and not window.board.move_stack
+
+    window.update_window()
+    assert PROMPT_RECT in window.dirty_rects
+    window.update_window()
+    assert window.dirty_rects == []  # Nakładka nie jest przerysowywana bez zmian
+
+    game_loop(window, click(window.squares[0].center))  # Kliknięcie poza nakładką jest ignorowane
+    assert window.promotion_prompt
+    game_loop(window, click(window.promote_button.center))
+    assert window.promotion_prompt is None
+    assert window.board.piece_at(22).piece_type == shogi.PROM_PAWN
+
+
+def test_message_expires_without_blocking(game_window, monkeypatch):
+    """Komunikat znika po `timex` ms w kolejnej klatce; nic nie czeka w `pygame.time.wait`."""
+    ticks = [1000]
+    monkeypatch.setattr(pygame.time, "get_ticks", lambda: ticks[0])
+    monkeypatch.setattr(pygame.time, "wait", MagicMock(side_effect=AssertionError("blocking wait")))
+    game_window.board = Board()
+
+    game_window.set_message("No moves to undo!", timex=500)
+    game_window.update_window()
+    assert game_window.message == "No moves to undo!"
+    ticks[0] += 500
+    game_window.update_window()
+    assert game_window.message is None
+
+    game_window.game_over = True
+    game_window.set_message("BLACK WON!", color=BLACK, timex=None)
+    ticks[0] += 10000
+    game_window.update_window()
+    assert not game_window.finished()  # Komunikat do odwołania
+    game_window.set_message(None)
+    assert game_window.finished()
+
+
+def test_game_status_evaluated_once_per_move(game_window, monkeypatch):
+    """Stan gry jest wyznaczany przy ruchu i cofnięciu; rysowanie klatki nie generuje legalnych ruchów."""
+    from positions import PositionBoard, GameStatus, CHECKMATE
+    import shogi
+    game_window.board = PositionBoard("4k4/9/4G4/9/9/9/9/9/4K4 b G 1")
+    game_window.push_move(Move.from_usi("G*5b"))
+    assert game_window.status == GameStatus(CHECKMATE, shogi.BLACK)
+
+    monkeypatch.setattr(game_window.board, "generate_legal_moves",
+                        MagicMock(side_effect=AssertionError("legal moves generated per frame")))
+    game_window.update_window()
+    assert game_window.status.over
+    monkeypatch.undo()
+
+    game_window.pop_move()
+    assert not game_window.status.over
+
+
+def test_board_view_matches_buttons_and_board(game_window):
+    """Pole pod kursorem, kody figur i pole króla w szachu zgadzają się z przyciskami i planszą."""
+    from chess import piece_codes, WHITE_CODE
+    import shogi
+    for pos in [(0, 0), (79, 80), (80, 79), (719, 719), (400, 333)]:
+        expected = next(square for square in game_window.squares if square.clicked(pos))
+        assert game_window.clicked_square(pos) is expected
+    assert game_window.clicked_square((720, 10)) is None
+    assert game_window.clicked_square((-1, 10)) is None
+
+    for usi in ["7g7f", "3c3d", "8h2b+"]:
+        game_window.push_move(Move.from_usi(usi))
+    codes = game_window.update_piece_codes()
+    for square in shogi.SQUARES:
+        piece = game_window.board.piece_at(square)
+        assert codes[square] == (piece.piece_type + piece.color * WHITE_CODE if piece else 0)
+    assert codes == piece_codes(game_window.board)
+
+    game_window.board = Board("4k4/9/4G4/9/9/9/9/9/4K4 w G 1")
+    game_window.board.push_usi("5a4a")
+    game_window.board.push_usi("G*4b")
+    assert game_window.get_king_square_in_check() is game_window.squares[shogi.SQUARE_NAMES.index("4a")]
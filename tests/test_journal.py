@@ -0,0 +1,81 @@
+import os
+import pytest
+import shogi
+import journal as journal_module
+from journal import GameJournal, JournalError, JOURNAL_FLUSH_EVERY, JOURNAL_FLUSH_INTERVAL
+
+
+def test_journal_round_trip(tmp_path):
+    """Ruchy i cofnięcia są odtwarzane z dziennika razem z czasem gry i kolorem silnika."""
+    journal = GameJournal(tmp_path / "game.wal")
+    journal.start(engine_color=shogi.WHITE)
+    for usi in ["7g7f", "3c3d", "8h2b+"]:
+        journal.push(shogi.Move.from_usi(usi), elapsed=10)
+    journal.pop(elapsed=12)
+    journal.flush(elapsed=15)
+
+    state = GameJournal(tmp_path / "game.wal").read()
+    assert state.moves == [shogi.Move.from_usi("7g7f"), shogi.Move.from_usi("3c3d")]
+    assert state.elapsed == 15
+    assert state.engine_color == shogi.WHITE
+
+
+def test_journal_flushes_in_batches(tmp_path):
+    """Wpisy trafiają na dysk partiami; ucięty ostatni wpis jest pomijany."""
+    path = tmp_path / "game.wal"
+    journal = GameJournal(path)
+    journal.start()
+    size = path.stat().st_size
+    for _ in range(JOURNAL_FLUSH_EVERY - 1):
+        journal.push(shogi.Move.from_usi("7g7f"), elapsed=1)
+    assert path.stat().st_size == size
+    journal.push(shogi.Move.from_usi("7g7f"), elapsed=1)
+    assert path.stat().st_size > size
+
+    with path.open("ab") as fp:
+        fp.write(b"\x01")  # Przerwany zapis
+    assert len(journal.read().moves) == JOURNAL_FLUSH_EVERY
+    assert journal.read().engine_color is None
+
+    journal.discard()
+    assert not path.exists()
+
+
+def test_journal_flush_completes_short_writes(tmp_path, monkeypatch):
+    """Niepełny zapis `os.write` nie gubi wpisów: reszta bufora jest dopisywana."""
+    path = tmp_path / "game.wal"
+    journal = GameJournal(path)
+    journal.start()
+    write = os.write
+    monkeypatch.setattr(os, "write", lambda fd, data: write(fd, bytes(data[:3])))
+    moves = [shogi.Move.from_usi(usi) for usi in ["7g7f", "3c3d", "8h2b+"]]
+    for move in moves:
+        journal.push(move, elapsed=1)
+    journal.flush(elapsed=5)
+    assert journal.read().moves == moves and journal.read().elapsed == 5
+
+    monkeypatch.setattr(os, "write", lambda fd, data: 0)
+    journal.push(moves[0], elapsed=6)
+    with pytest.raises(JournalError):
+        journal.flush()
+    monkeypatch.undo()
+    journal.flush()  # Wpis pozostał w buforze
+    assert journal.read().moves == moves + moves[:1]
+
+
+def test_flush_due_without_new_entries(tmp_path, monkeypatch):
+    """Zbuforowany ruch trafia na dysk po upływie interwału, także bez kolejnych wpisów."""
+    now = [100.0]
+    monkeypatch.setattr(journal_module.time, "monotonic", lambda: now[0])
+    path = tmp_path / "game.wal"
+    journal = GameJournal(path)
+    journal.start()
+    journal.push(shogi.Move.from_usi("7g7f"), elapsed=1)
+    assert journal.flush_due(elapsed=2) is False
+    assert journal.read().moves == []
+
+    now[0] += JOURNAL_FLUSH_INTERVAL
+    assert journal.flush_due(elapsed=7) is True
+    assert journal.read().moves == [shogi.Move.from_usi("7g7f")]
+    assert journal.read().elapsed == 7
+    assert journal.flush_due(elapsed=8) is False  # Pusty bufor - brak zapisu
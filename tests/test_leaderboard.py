@@ -0,0 +1,62 @@
+import json
+from archive import GameArchive
+from leaderboard import Leaderboard, leaderboard_path
+
+
+def make_archive(path, times):
+    archive = GameArchive(path)
+    for game_time in times:
+        archive.append("2025-01-12 12:00:00", game_time, [])
+    return archive
+
+
+def test_rebuild_from_archive(tmp_path):
+    """Brakujący ranking jest odtwarzany z indeksu archiwum."""
+    with make_archive(tmp_path / "games.db", [500, 700, 100]) as archive:
+        leaderboard = Leaderboard(archive, size=2)
+        assert leaderboard.ranking() == [1, 0]
+        assert 2 not in leaderboard
+
+
+def test_add_evicts_shortest_game(tmp_path):
+    """Po przekroczeniu rozmiaru z rankingu wypada najkrótsza partia; ranking jest trwały."""
+    with make_archive(tmp_path / "games.db", []) as archive:
+        leaderboard = Leaderboard(archive, size=2)
+        for game_time, evicted in [(100, []), (300, []), (200, [0]), (50, [3])]:
+            game_id = archive.append("2025-01-12 12:00:00", game_time, [])
+            assert leaderboard.add(game_id) == evicted
+
+        reloaded = Leaderboard(archive, size=2)
+        assert reloaded.ranking() == [1, 2]
+        game_id = archive.append("2025-01-12 12:00:00", 200, [])
+        assert reloaded.add(game_id) == [game_id]  # Przy równym czasie wyżej jest starsza partia
+
+
+def test_catch_up_with_archive(tmp_path):
+    """Partie dopisane do archiwum po zapisie rankingu są dołączane przy wczytaniu."""
+    with make_archive(tmp_path / "games.db", [100]) as archive:
+        Leaderboard(archive, size=2).add(0)
+        archive.append("2025-01-12 12:00:00", 300, [])
+        assert Leaderboard(archive, size=2).ranking() == [1, 0]
+        assert json.loads(leaderboard_path(archive).read_text())["covered"] == 1
+
+
+def test_smaller_size_trims_on_next_add(tmp_path):
+    """Zmiana rozmiaru rankingu nie wymaga przebudowy."""
+    with make_archive(tmp_path / "games.db", [100, 200, 300]) as archive:
+        Leaderboard(archive, size=3).add(2)
+        game_id = archive.append("2025-01-12 12:00:00", 250, [])
+        assert sorted(Leaderboard(archive, size=1).add(game_id)) == [0, 1, 3]
+
+
+def test_reading_does_not_write(tmp_path):
+    """Odczyt rankingu nie tworzy ani nie nadpisuje pliku rankingu."""
+    with make_archive(tmp_path / "games.db", [100, 200]) as archive:
+        assert Leaderboard(archive).ranking() == [1, 0]
+        assert not leaderboard_path(archive).exists()
+
+        Leaderboard(archive).add(1)
+        content = leaderboard_path(archive).read_bytes()
+        archive.append("2025-01-12 12:00:00", 300, [])
+        assert Leaderboard(archive).ranking() == [2, 1, 0]
+        assert leaderboard_path(archive).read_bytes() == content
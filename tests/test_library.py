@@ -0,0 +1,61 @@
+import pytest
+import shogi
+from archive import GameArchive
+from chess import GameLibrary
+from leaderboard import leaderboard_path
+
+
+def append_game(archive, moves=2, time=120):
+    return archive.append("2025-01-12 12:00:00", time, [shogi.Move.from_usi("7g7f")] * moves)
+
+
+@pytest.fixture
+def library(tmp_path):
+    """Fixture tworzący indeks archiwum z dwiema zapisanymi partiami."""
+    archive = GameArchive(tmp_path / "games.db")
+    append_game(archive, moves=3, time=100)
+    append_game(archive, moves=5, time=120)
+    yield GameLibrary(archive)
+    archive.close()
+
+
+def test_refresh_only_when_changed(library):
+    """Lista partii jest budowana raz i nie jest odświeżana bez zmian w archiwum."""
+    assert library.refresh() is True
+    assert library.game_ids == [1, 0]
+    assert library.refresh() is False
+
+
+def test_notify_changed_after_save(library):
+    """Zgłoszenie zapisu partii wymusza odświeżenie listy."""
+    library.refresh()
+    game_id = append_game(library.archive, time=600)
+    GameLibrary.notify_changed(library.archive.path)
+    assert library.refresh() is True
+    assert library.game_ids[0] == game_id
+
+
+def test_metadata_cached(library, monkeypatch):
+    """Metadane partii są odczytywane z indeksu archiwum tylko raz."""
+    library.refresh()
+    assert library.metadata(1) == {"date": "2025-01-12 12:00:00", "time": 120, "moves": 5}
+
+    monkeypatch.setattr(library.archive, "metadata", lambda game_id: pytest.fail("indeks odczytany ponownie"))
+    assert library.metadata(1)["moves"] == 5
+
+
+def test_empty_archive(tmp_path):
+    """Puste archiwum daje pustą listę partii."""
+    with GameArchive(tmp_path / "games.db") as archive:
+        library = GameLibrary(archive)
+        assert library.refresh() is True
+        assert library.game_ids == []
+
+
+def test_refresh_is_read_only(library, tmp_path):
+    """Odświeżenie listy w menu nie tworzy pliku rankingu ani innych plików."""
+    files = sorted(tmp_path.iterdir())
+    assert library.refresh() is True
+    assert library.game_ids == [1, 0]
+    assert not leaderboard_path(library.archive).exists()
+    assert sorted(tmp_path.iterdir()) == files
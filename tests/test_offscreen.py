@@ -0,0 +1,20 @@
+from app import App
+from chess import GameWindow, MainWindow, AnaliseWindow
+from offscreen import offscreen_surface, render, IMAGE_SIZE
+
+
+def test_windows_render_offscreen():
+    surface = offscreen_surface()
+    assert surface.get_size() == IMAGE_SIZE
+    for window in (GameWindow(surface), GameWindow(surface, incremental=True), AnaliseWindow(surface), MainWindow(surface)):
+        assert render(window) is surface
+
+
+def test_headless_app(tmp_path):
+    surface = offscreen_surface()
+    app = App(screen=surface, archive_path=tmp_path / "games.db", journal_path=tmp_path / "game.wal")
+    assert app.headless and app.screen is surface
+    app.update()
+    app.current_window = "game"
+    app.game = app.new_game()
+    app.update()
@@ -0,0 +1,54 @@
+import copy
+import shogi
+from positions import PositionBoard, position_key
+
+
+SHUFFLE = ["5i4h", "5a4b", "4h5i", "4b5a"]  # Ruchy królów tam i z powrotem
+
+
+def test_position_key_follows_push_and_pop():
+    """Klucz pozycji jest równy haszowi Zobrista po każdym ruchu, cofnięciu i skopiowaniu planszy."""
+    board = PositionBoard()
+    reference = shogi.Board()
+    for usi in ["7g7f", "3c3d", "8h2b+", "3a2b", "B*5e"]:
+        board.push_usi(usi)
+        reference.push_usi(usi)
+        assert board.position_key == reference.zobrist_hash() == position_key(reference)
+    board.pop()
+    assert board.position_key == board.zobrist_hash()
+    assert copy.deepcopy(board).position_key == board.position_key
+
+    sfen = "lnsgkgsnl/1r5b1/ppppppppp/9/9/9/PPPPPPPPP/1B5R1/LNSGKGSNL w - 1"
+    assert PositionBoard(sfen).position_key == shogi.Board(sfen).zobrist_hash()
+
+
+def test_sennichite_after_fourth_repetition():
+    """Czwarte wystąpienie tej samej pozycji kończy grę; cofnięcie ruchu zmniejsza licznik."""
+    board = PositionBoard()
+    for _ in range(3):
+        for usi in SHUFFLE:
+            board.push_usi(usi)
+    assert board.repetitions() == 4
+    assert board.is_fourfold_repetition() and board.is_game_over()
+
+    board.pop()
+    board.pop()
+    board.pop()
+    board.pop()
+    assert board.repetitions() == 3
+    assert not board.is_fourfold_repetition()
+
+
+def test_position_key_computed_once_per_move(monkeypatch):
+    """Klucz jest liczony raz w `push` (dla licznika pozycji); `pop` go nie liczy, a po cofnięciu ruchu - pierwszy odczyt."""
+    board = PositionBoard()
+    calls = []
+    zobrist_hash = shogi.Board.zobrist_hash
+    monkeypatch.setattr(shogi.Board, "zobrist_hash", lambda self, array=None: calls.append(1) or zobrist_hash(self, array))
+    board.push_usi("7g7f")
+    assert board.position_key == board.zobrist_hash() and board.is_fourfold_repetition() is False
+    assert len(calls) == 1
+    board.pop()
+    assert len(calls) == 1
+    board.position_key
+    assert len(calls) == 2
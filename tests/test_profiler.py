@@ -0,0 +1,81 @@
+import json
+import pstats
+import pytest
+import pygame
+from profiler import FrameProfiler, PROFILER, profiled, percentile
+
+
+@pytest.fixture
+def profiler():
+    """Globalny profiler włączony na czas testu."""
+    PROFILER.configure(True)
+    yield PROFILER
+    PROFILER.configure(False)
+    PROFILER.phases.clear()
+
+
+def test_disabled_profiler_records_nothing():
+    profiler = FrameProfiler()
+    profiler.begin_frame()
+    with profiler.phase("draw"):
+        pass
+    profiler.end_frame()
+    assert not profiler.frame_times and not profiler.phases
+
+
+def test_phases_are_summed_per_frame_in_ring_buffer():
+    profiler = FrameProfiler(size=3)
+    profiler.configure(True)
+    for _ in range(5):
+        profiler.begin_frame()
+        profiler.add("draw_pieces", 0.0, 0.001)
+        profiler.add("draw_pieces", 0.0, 0.002)
+        profiler.end_frame()
+    assert len(profiler.frame_times) == 3
+    assert list(profiler.phases["draw_pieces"]) == pytest.approx([0.003] * 3)
+    stats = profiler.stats()
+    assert stats["phases"]["draw_pieces"] == pytest.approx(3.0)
+    assert stats["fps"] > 0
+
+
+def test_percentile():
+    values = list(range(1, 101))
+    assert percentile(values, 0.5) == 51
+    assert percentile(values, 0.99) == 100
+
+
+def test_profiled_decorator_records_phase(profiler):
+    @profiled("work")
+    def work(x):
+        return x * 2
+
+    profiler.begin_frame()
+    assert work(21) == 42
+    profiler.end_frame()
+    assert profiler.phases["work"][-1] > 0
+
+
+def test_chrome_trace_and_cprofile_export(tmp_path):
+    profiler = FrameProfiler()
+    profiler.configure(True, trace_path=tmp_path / "trace.json", cprofile_path=tmp_path / "session.prof")
+    profiler.begin_frame()
+    with profiler.phase("update_window"):
+        sum(range(1000))
+    profiler.end_frame()
+    profiler.close()
+
+    events = json.loads((tmp_path / "trace.json").read_text())["traceEvents"]
+    assert {event["name"] for event in events} == {"frame", "update_window"}
+    assert all(event["ph"] == "X" and event["dur"] >= 0 for event in events)
+    assert pstats.Stats(str(tmp_path / "session.prof")).total_calls > 0
+
+
+def test_overlay_shows_fps_and_phases(profiler):
+    pygame.init()
+    surface = pygame.Surface((400, 300))
+    profiler.begin_frame()
+    profiler.add("draw_pieces", 0.0, 0.001)
+    profiler.end_frame()
+    assert profiler.overlay_lines()[1].startswith("draw_pieces")
+    area = profiler.draw_overlay(surface)
+    assert area.width > 0 and area.height > 0
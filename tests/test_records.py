@@ -0,0 +1,91 @@
+import json
+import pytest
+import shogi
+from pathlib import Path
+from records import (encode_move, decode_move, encode_record, decode_record, convert_record,
+                     read_record, RecordError, BINARY_HEADER)
+
+
+def test_move_round_trip():
+    """Każdy ruch (zwykły, z promocją, dostawienie) mieści się w 2 bajtach i jest odtwarzany bez zmian."""
+    for usi in ["7g7f", "8h2b+", "B*4e", "P*5e", "R*1a", "9i9a"]:
+        move = shogi.Move.from_usi(usi)
+        code = encode_move(move)
+        assert 0 <= code < 1 << 16
+        assert decode_move(code) == move
+
+
+def test_record_size_and_errors():
+    """Nagłówek jest stały, ruch zajmuje 2 bajty; uszkodzone dane zgłaszają RecordError."""
+    moves = [shogi.Move.from_usi(usi) for usi in ["7g7f", "3c3d", "8h2b+", "3a2b", "B*4e"]]
+    data = encode_record("2025-01-12 12:00:00", 75, moves)
+    assert len(data) == BINARY_HEADER.size + 2 * len(moves)
+    assert decode_record(data) == ("2025-01-12 12:00:00", 75, moves)
+
+    with pytest.raises(RecordError):
+        decode_record(data[:-1])
+    with pytest.raises(RecordError):
+        decode_record(b"XXXX" + data[4:])
+
+
+def test_convert_saved_games(tmp_path):
+    """Konwersja JSON -> binarny -> JSON zachowuje zapisane partie."""
+    for source in sorted(Path("Top10").glob("*.json")):
+        binary = tmp_path / "game.shg"
+        restored = tmp_path / "game.json"
+        convert_record(source, binary)
+        convert_record(binary, restored)
+        assert read_record(binary) == read_record(source)
+        assert json.loads(restored.read_text()) == json.loads(source.read_text())
+
+
+def test_atomic_write_keeps_old_file_on_error(tmp_path, monkeypatch):
+    """Przerwany zapis nie zostawia uciętego pliku ani pliku tymczasowego."""
+    import os
+    from records import atomic_write
+
+    path = tmp_path / "game.json"
+    atomic_write(path, '{"ok": true}')
+
+    def failing_replace(*args):
+        raise OSError("disk full")
+    monkeypatch.setattr(os, "replace", failing_replace)
+    with pytest.raises(OSError):
+        atomic_write(path, '{"broken"')
+    assert path.read_text() == '{"ok": true}'
+    assert [f.name for f in tmp_path.iterdir()] == ["game.json"]
+
+
+def test_stream_reads_moves_lazily(tmp_path, monkeypatch):
+    """Strumień zwraca datę i czas od razu, a ruchy wczytuje dopiero przy odwołaniu."""
+    import records
+    from records import open_record, iter_record
+
+    monkeypatch.setattr(records, "STREAM_CHUNK_SIZE", 16)  # Wartości JSON dzielone między bloki
+    source = Path("Top10/TOP 1.json")
+    date, game_time, moves = read_record(source)
+
+    stream = open_record(source)
+    assert (stream.date, stream.time, stream.available) == (date, game_time, 0)
+    assert stream[1] == moves[1]
+    assert stream.available < len(moves)
+    assert list(stream) == moves
+
+    binary = tmp_path / "game.shg"
+    convert_record(source, binary)
+    stream = open_record(binary)
+    assert stream.available == len(moves)  # Liczba ruchów z nagłówka
+    assert list(iter_record(binary)[2]) == moves
+
+
+def test_stream_errors(tmp_path):
+    """Uszkodzony nagłówek jest zgłaszany przy otwarciu strumienia."""
+    from records import open_record
+
+    path = tmp_path / "game.json"
+    path.write_text('{"date": "2025-01-12 12:00:00", "time": 1}')
+    with pytest.raises(RecordError):
+        open_record(path)
+    path.write_text("INVALID JSON")
+    with pytest.raises(RecordError):
+        open_record(path)
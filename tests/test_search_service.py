@@ -0,0 +1,65 @@
+import pytest
+import pygame
+import shogi
+from app import App
+from offscreen import offscreen_surface
+from search_service import SearchService, TimeControl, ENGINE_INFO, ENGINE_RESULT
+
+
+@pytest.fixture
+def service():
+    """Fixture tworzący usługę wyszukiwania z płytkim wyszukiwaniem."""
+    service = SearchService(max_depth=2, time_limit=5)
+    yield service
+    service.shutdown()
+
+
+def wait_for_result(timeout=30000):
+    infos = []
+    while True:
+        event = pygame.event.wait(timeout)
+        if event.type == pygame.NOEVENT:
+            pytest.fail("brak wyniku wyszukiwania")
+        if event.type == ENGINE_INFO:
+            infos.append(event)
+        if event.type == ENGINE_RESULT:
+            return infos, event
+
+
+def test_result_arrives_through_event_queue(service):
+    """Postęp i wynik wyszukiwania trafiają do kolejki zdarzeń Pygame."""
+    board = shogi.Board()
+    board.push_usi("7g7f")
+    search_id = service.start(board)
+
+    infos, result = wait_for_result()
+    assert result.search_id == search_id
+    assert shogi.Move.from_usi(result.move) in board.legal_moves
+    assert [info.depth for info in infos] == [1, 2]
+    assert not service.is_thinking()
+
+
+def test_time_control_budget():
+    """Czas na ruch jest częścią pozostałego czasu powiększoną o dodatek."""
+    control = TimeControl(total=60, increment=1, moves_to_go=30)
+    assert control.budget() == pytest.approx(3.0)
+    control.spend(10)
+    assert control.remaining == pytest.approx(51.0)
+
+
+def test_headless_app_receives_engine_move(tmp_path):
+    """Aplikacja bez okna dostaje ruch silnika przez kolejkę zdarzeń i nie zostaje w stanie myślenia."""
+    app = App(screen=offscreen_surface(), archive_path=tmp_path / "games.db", journal_path=tmp_path / "game.wal")
+    app.search_service = SearchService(max_depth=1, time_limit=5)
+    try:
+        app.current_window = "game"
+        app.game = app.new_game(engine_color=shogi.BLACK)
+        app.game.engine_move()
+        assert app.game.thinking
+
+        _, result = wait_for_result()
+        app.operate_game_window(result)
+        assert not app.game.thinking
+        assert len(app.game.board.move_stack) == 1
+    finally:
+        app.search_service.shutdown()